@@ -0,0 +1,135 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Bars requested on a delta fetch: the last closed bar we hold (to check nothing was
+# repainted), the bar that was forming and the one that has just opened
+DELTA_COUNT = 3
+
+class CandleBuffer:
+    """Preallocated rates buffer for one (symbol, timeframe).
+
+    New bars are written after the last one, so handing out ``view`` slices never copies.
+    When the space runs out the most recent ``retain`` bars move into a freshly allocated
+    array rather than being shifted in place, which keeps views already handed out valid.
+    Only the last (still forming) bar is ever overwritten.
+    """
+
+    def __init__(self, rates: np.ndarray, retain: int):
+        self.retain = retain
+        self.data = np.zeros(retain * 2, dtype=rates.dtype)
+        self.start = 0
+        self.end = 0
+        self.append(rates[-retain:])
+
+    def __len__(self):
+        return self.end - self.start
+
+    def view(self, count: int) -> np.ndarray:
+        view = self.data[max(self.end - count, self.start):self.end]
+        view.flags.writeable = False
+        return view
+
+    def append(self, rates: np.ndarray):
+        if self.end + len(rates) > len(self.data):
+            keep = self.data[max(self.end - self.retain, self.start):self.end]
+            data = np.zeros(max(len(self.data), (len(keep) + len(rates)) * 2), dtype=self.data.dtype)
+            data[:len(keep)] = keep
+            self.data, self.start, self.end = data, 0, len(keep)
+
+        self.data[self.end:self.end + len(rates)] = rates
+        self.end += len(rates)
+
+    def replace_last(self, rates: np.ndarray):
+        self.end -= 1
+        self.append(rates)
+
+class CandleCache:
+    """Per (symbol, timeframe) candle buffers kept current with small delta fetches.
+
+    A delta fetch asks the terminal for the last few bars, checks the last closed bar we
+    hold is still there unchanged and writes the rest in place. If the overlap cannot be
+    found (a gap, e.g. after a disconnect) or the closed bar changed (the broker repainted
+    history) the buffer is reloaded in full.
+    """
+
+    def __init__(self, mt5_terminal):
+        self.mt5 = mt5_terminal
+        self.buffers: Dict[Tuple[str, int], CandleBuffer] = {}
+        self.locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "bars_fetched": 0, "reloads": 0}
+
+    def fetch(self, symbol: str, timeframe: int, count: int) -> Optional[np.ndarray]:
+        """The latest ``count`` bars, the last one forming, as a view of the buffer."""
+        key = (symbol, timeframe)
+        with self.lock:
+            key_lock = self.locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            buffer = self.buffers.get(key)
+            if buffer is None or buffer.retain < count or len(buffer) < 2 or not self._update(buffer, symbol, timeframe, count):
+                buffer = self._reload(key, count)
+            if buffer is None:
+                return None
+            return buffer.view(count)
+
+    def has(self, symbol: str, timeframe: int) -> bool:
+        return (symbol, timeframe) in self.buffers
+
+    def seed(self, symbol: str, timeframe: int, rates: np.ndarray, count: int):
+        """Start the buffer from closed bars held elsewhere, e.g. on disk, the next fetch brings it up to date.
+
+        The last seeded bar is fetched again like a forming bar. Fewer than ``count - 1`` bars
+        could not fill a fetch of ``count`` and are ignored.
+        """
+        if len(rates) < max(count - 1, 2):
+            return
+        key = (symbol, timeframe)
+        with self.lock:
+            if key not in self.buffers:
+                self.buffers[key] = CandleBuffer(rates, retain=count)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self.lock:
+            for key in list(self.buffers):
+                if symbol is None or key[0] == symbol:
+                    del self.buffers[key]
+
+    def _copy_rates(self, symbol, timeframe, count):
+        rates = self.mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+        self.stats["requests"] += 1
+        self.stats["bars_fetched"] += 0 if rates is None else len(rates)
+        return rates
+
+    def _reload(self, key, count) -> Optional[CandleBuffer]:
+        rates = self._copy_rates(key[0], key[1], count)
+        if rates is None or len(rates) == 0:
+            return None
+
+        self.stats["reloads"] += 1
+        buffer = CandleBuffer(rates, retain=max(count, self.buffers[key].retain if key in self.buffers else 0))
+        self.buffers[key] = buffer
+        return buffer
+
+    def _update(self, buffer: CandleBuffer, symbol, timeframe, count) -> bool:
+        """Bring ``buffer`` up to date, False if it has to be reloaded."""
+        anchor = buffer.data[buffer.end - 2]
+        request = DELTA_COUNT
+        while True:
+            rates = self._copy_rates(symbol, timeframe, request)
+            if rates is None or len(rates) == 0:
+                return False
+            if rates["time"][0] <= anchor["time"]:
+                break
+            if request >= count:
+                return False  # More new bars than we keep, a reload is as cheap
+            request = min(request * 4, count)
+
+        index = int(np.searchsorted(rates["time"], anchor["time"]))
+        if index + 1 >= len(rates) or rates[index] != anchor:
+            return False
+
+        buffer.replace_last(rates[index + 1:])
+        return True
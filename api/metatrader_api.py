@@ -1,21 +1,49 @@
-import pandas as pd
-import MetaTrader5 as mt5
 import pytz
 import logging
 import time
+from typing import TYPE_CHECKING, Optional
 
 import datetime as dt
 
+from api.candle_cache import CandleCache
+from api.symbol_cache import SymbolCache
+from core.metrics import Metrics
+from models.candles import Candles
 import constants.credentials as credentials
 import constants.defs as defs
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 class MT5:
     MAX_LOGIN_ATTEMPTS = 3  # Define the max number of login attempts
     RETRY_DELAY = 5  # Delay in seconds before retrying the login
 
-    def __init__(self) -> None:
+    def __init__(self, terminal=None, cache_candles: bool = True, metrics: Metrics = None, data_db=None) -> None:
         logging.basicConfig(level=logging.INFO) 
-        self.mt5 = mt5
+
+        # Any object exposing the MetaTrader5 module api can stand in for the terminal
+        if terminal is None and defs.SIMULATED_TERMINAL:
+            from api.simulated_terminal import SimulatedTerminal
+            terminal = SimulatedTerminal(realtime=True)
+
+        if terminal is None:
+            try:
+                import MetaTrader5 as terminal
+            except ImportError:  # The MetaTrader5 package is only published for Windows
+                raise ImportError("MetaTrader5 is not installed, pass a terminal such as SimulatedTerminal to MT5()")
+        self.mt5 = terminal
+
+        self.candle_cache = CandleCache(self.mt5) if cache_candles else None
+        self.symbol_cache = SymbolCache(self.mt5)
+        # Stage timings of everything that goes through the terminal, shared with the bot
+        self.metrics = metrics if metrics is not None else Metrics()
+        # Optional db.db.DataDB, closed candles stored on disk seed the candle cache on a cold start
+        self.data_db = data_db
+        # Optional api.shared_candles.SharedCandles opened with create=True, full fetches are published to other processes
+        self.shared_candles = None
+        # Optional api.resampler.Resampler, higher granularities of a symbol are built from its finest one
+        self.resampler = None
         
     def attempt_login(self) -> bool:
         """Attempts to log in to the MT5 account with retry logic."""
@@ -55,23 +83,8 @@ class MT5:
             return False
 
     def configure_df(self, hist_data):
-        hist_data_df = pd.DataFrame(hist_data)
-        hist_data_df.time = pd.to_datetime(hist_data_df.time, unit="s")
-        hist_data_df.rename(
-            columns={
-                "time": "Time",
-                "open": "Open",
-                "high": "High",
-                "close": "Close",
-                "low": "Low",
-                "tick_volume": "Volume",
-                "real_volume": "_Volume",
-                "spread": "Spread",
-            },
-            inplace=True,
-        )
-
-        return hist_data_df
+        with self.metrics.timed("configure_df_seconds"):
+            return Candles(hist_data).to_df()
 
     # Function to place a trade on MT5
     def place_order(
@@ -107,10 +120,12 @@ class MT5:
                 "comment": f"{comment}",
             }
             
-            print(f"palce_order: {request}")
+            log_message("metatrader_api.place_order(): %s", symbol, request)
 
             # Send the order to MT5
-            order_result = self.mt5.order_send(request)
+            with self.metrics.timed("order_send_seconds"):
+                order_result = self.mt5.order_send(request)
+            self.symbol_cache.invalidate_account()
 
             # Notify based on return outcomes
             if order_result[0] == 10009:
@@ -141,47 +156,47 @@ class MT5:
         # Implement a Pseudo Switch statement. Note that Python 3.10 implements match / case but have kept it this way for
         # backwards integration
         if timeframe == "M1":
-            return mt5.TIMEFRAME_M1
+            return self.mt5.TIMEFRAME_M1
         elif timeframe == "M2":
-            return mt5.TIMEFRAME_M2
+            return self.mt5.TIMEFRAME_M2
         elif timeframe == "M3":
-            return mt5.TIMEFRAME_M3
+            return self.mt5.TIMEFRAME_M3
         elif timeframe == "M4":
-            return mt5.TIMEFRAME_M4
+            return self.mt5.TIMEFRAME_M4
         elif timeframe == "M5":
-            return mt5.TIMEFRAME_M5
+            return self.mt5.TIMEFRAME_M5
         elif timeframe == "M6":
-            return mt5.TIMEFRAME_M6
+            return self.mt5.TIMEFRAME_M6
         elif timeframe == "M10":
-            return mt5.TIMEFRAME_M10
+            return self.mt5.TIMEFRAME_M10
         elif timeframe == "M12":
-            return mt5.TIMEFRAME_M12
+            return self.mt5.TIMEFRAME_M12
         elif timeframe == "M15":
-            return mt5.TIMEFRAME_M15
+            return self.mt5.TIMEFRAME_M15
         elif timeframe == "M20":
-            return mt5.TIMEFRAME_M20
+            return self.mt5.TIMEFRAME_M20
         elif timeframe == "M30":
-            return mt5.TIMEFRAME_M30
+            return self.mt5.TIMEFRAME_M30
         elif timeframe == "H1":
-            return mt5.TIMEFRAME_H1
+            return self.mt5.TIMEFRAME_H1
         elif timeframe == "H2":
-            return mt5.TIMEFRAME_H2
+            return self.mt5.TIMEFRAME_H2
         elif timeframe == "H3":
-            return mt5.TIMEFRAME_H3
+            return self.mt5.TIMEFRAME_H3
         elif timeframe == "H4":
-            return mt5.TIMEFRAME_H4
+            return self.mt5.TIMEFRAME_H4
         elif timeframe == "H6":
-            return mt5.TIMEFRAME_H6
+            return self.mt5.TIMEFRAME_H6
         elif timeframe == "H8":
-            return mt5.TIMEFRAME_H8
+            return self.mt5.TIMEFRAME_H8
         elif timeframe == "H12":
-            return mt5.TIMEFRAME_H12
-        elif timeframe == "D1":
-            return mt5.TIMEFRAME_D1
+            return self.mt5.TIMEFRAME_H12
+        elif timeframe in ("D", "D1"):  # The configuration names daily candles D
+            return self.mt5.TIMEFRAME_D1
         elif timeframe == "W1":
-            return mt5.TIMEFRAME_W1
+            return self.mt5.TIMEFRAME_W1
         elif timeframe == "MN1":
-            return mt5.TIMEFRAME_MN1
+            return self.mt5.TIMEFRAME_MN1
     
     # Function to cancel an order
     def cancel_order(self, order_number):
@@ -193,6 +208,7 @@ class MT5:
         }
         # Send order to MT5
         order_result = self.mt5.order_send(request)
+        self.symbol_cache.invalidate_account()
         return order_result
 
     # Function to modify an open position
@@ -202,7 +218,7 @@ class MT5:
             "action": self.mt5.TRADE_ACTION_SLTP,
             "symbol": symbol,
             "sl": new_stop_loss,
-            # "tp": new_take_profit,
+            "tp": new_take_profit,  # Omitting it would clear the take profit
             "position": order_number,
         }
         # Send order to MT5
@@ -218,14 +234,10 @@ class MT5:
         symbol: str,
         mt5_timeframe: str,
         log_to_error: callable,
-        count: int = 200,
-    ) -> pd.DataFrame:
+        count: int = defs.CANDLE_COUNT,
+    ) -> "pd.DataFrame":
         try:
-            # Set the correct timeframe for MT5 query
-            mt5_timeframe = self.set_query_timeframe(mt5_timeframe)
-            hist_data = self.mt5.copy_rates_from_pos(symbol, mt5_timeframe, 0, count)
-            if hist_data is None or len(hist_data) == 0:
-                raise ValueError(f"No data returned for {symbol} in {mt5_timeframe}")
+            hist_data = self.fetch_rates(symbol, mt5_timeframe, count)
             
             # Convert to DataFrame and configure it
             hist_data_df = self.configure_df(hist_data)
@@ -233,8 +245,69 @@ class MT5:
         except Exception as error:
             # Log detailed error message
             log_to_error(f"Error: fetch_candles failed for {symbol} in {mt5_timeframe}. Error: {error}")
+            import pandas as pd
+
             return pd.DataFrame()  # Return an empty DataFrame on failure
 
+    def fetch_candle_data(
+        self,
+        symbol: str,
+        mt5_timeframe: str,
+        log_to_error: callable,
+        count: int = defs.CANDLE_COUNT,
+    ) -> Optional[Candles]:
+        """fetch_candles without building a DataFrame, the candles wrap the rate array zero-copy."""
+        try:
+            return Candles(self.fetch_rates(symbol, mt5_timeframe, count))
+        except Exception as error:
+            log_to_error(f"Error: fetch_candle_data failed for {symbol} in {mt5_timeframe}. Error: {error}")
+            return None
+
+    def fetch_rates(self, symbol: str, mt5_timeframe: str, count: int = defs.CANDLE_COUNT):
+        """Latest ``count`` candles as the terminal's structured array, the last one still forming.
+
+        With the candle cache this is a read-only view of the cached buffer, not a copy.
+        """
+        base_granularity = self.resampler.base_of(symbol, mt5_timeframe) if self.resampler is not None else None
+        if base_granularity is not None:
+            hist_data = self.resample_rates(symbol, mt5_timeframe, base_granularity, count)
+        else:
+            # Set the correct timeframe for MT5 query
+            timeframe = self.set_query_timeframe(mt5_timeframe)
+            with self.metrics.timed("fetch_candles_seconds"):
+                if self.candle_cache is not None:
+                    if self.data_db is not None and not self.candle_cache.has(symbol, timeframe):
+                        # Only the candles since the last stored one then come from the terminal
+                        self.candle_cache.seed(symbol, timeframe, self.data_db.query_candles(symbol, mt5_timeframe, count=count), count)
+                    hist_data = self.candle_cache.fetch(symbol, timeframe, count)
+                else:
+                    hist_data = self.mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+
+        if hist_data is None or len(hist_data) == 0:
+            raise ValueError(f"No data returned for {symbol} in {mt5_timeframe}")
+
+        if self.shared_candles is not None and count >= self.shared_candles.capacity:
+            self.shared_candles.publish(symbol, mt5_timeframe, hist_data)
+
+        return hist_data
+
+    def resample_rates(self, symbol: str, mt5_timeframe: str, base_granularity: str, count: int):
+        """fetch_rates of a granularity built from ``base_granularity``, only the first call reads it from the terminal."""
+        base_rates = self.fetch_rates(symbol, base_granularity, self.resampler.base_count(symbol, mt5_timeframe))
+        with self.metrics.timed("resample_seconds"):
+            rates = self.resampler.fetch(symbol, mt5_timeframe, base_rates, count)
+        if rates is not None:
+            return rates
+
+        # Not seeded yet, or base bars went missing: restart from the terminal's own bars
+        self.metrics.inc("resample_seeds")
+        rates = self.query_historic_data(symbol, count, mt5_timeframe)
+        if rates is None or len(rates) == 0:
+            return rates
+        self.resampler.seed(symbol, mt5_timeframe, rates, count)
+        resampled = self.resampler.fetch(symbol, mt5_timeframe, base_rates, count)
+        return resampled if resampled is not None else rates
+
 
     # Function to query previous candlestick data from MT5
     def query_historic_data(self, symbol, number_of_candles, granularity):
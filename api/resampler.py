@@ -0,0 +1,143 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import constants.defs as defs
+from utils.utils import granularity_to_minutes
+
+# Granularities built from a finer one, week and month bars do not divide into fixed periods
+RESAMPLED_GRANULARITIES = ("M5", "M15", "M30", "H1", "H4", "D", "D1")
+
+def bucket_times(times: np.ndarray, seconds: int, offset: int = 0) -> np.ndarray:
+    """Open time of the bar of ``seconds`` each time falls in, bars start ``offset`` seconds after broker midnight."""
+    return times - (times - offset) % seconds
+
+def aggregate(rates: np.ndarray, seconds: int, offset: int = 0) -> np.ndarray:
+    """OHLCV bars of ``seconds`` from consecutive finer ``rates``, a bar per period that has any rates."""
+    if len(rates) == 0:
+        return rates[:0].copy()
+
+    buckets = bucket_times(rates["time"], seconds, offset)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(rates)])) - 1
+
+    bars = np.zeros(len(starts), dtype=rates.dtype)
+    bars["time"] = buckets[starts]
+    bars["open"] = rates["open"][starts]
+    bars["close"] = rates["close"][ends]
+    bars["high"] = np.maximum.reduceat(rates["high"], starts)
+    bars["low"] = np.minimum.reduceat(rates["low"], starts)
+    bars["tick_volume"] = np.add.reduceat(rates["tick_volume"], starts)
+    bars["spread"] = rates["spread"][starts]
+    bars["real_volume"] = np.add.reduceat(rates["real_volume"], starts)
+    return bars
+
+def merge_bar(bar: np.ndarray, part: np.ndarray) -> np.ndarray:
+    """``bar`` extended with ``part``, a later bar of the same period."""
+    merged = bar.copy()
+    merged["high"] = max(bar["high"], part["high"])
+    merged["low"] = min(bar["low"], part["low"])
+    merged["close"] = part["close"]
+    merged["tick_volume"] = bar["tick_volume"] + part["tick_volume"]
+    merged["real_volume"] = bar["real_volume"] + part["real_volume"]
+    return merged
+
+class ResampledSeries:
+    """Bars of one granularity kept current from the closed bars of a finer one.
+
+    ``bars`` holds every bar built from closed base bars, the last of which may still be
+    collecting more. The still forming base bar is only merged into the copy handed out.
+    """
+
+    def __init__(self, seconds: int, offset: int, retain: int):
+        self.seconds = seconds
+        self.offset = offset
+        self.retain = retain
+        self.bars: Optional[np.ndarray] = None
+        self.last_base_time: Optional[int] = None
+
+    def seed(self, rates: np.ndarray):
+        """Start from the terminal's own bars, the forming one is rebuilt from base bars."""
+        self.bars = rates[:-1].copy()
+        self.last_base_time = int(rates["time"][-1]) - 1
+
+    def update(self, base_rates: np.ndarray) -> bool:
+        """Fold in the base bars closed since the last update, False if some of them are missing from ``base_rates``."""
+        closed = base_rates[:-1]
+        if len(closed) == 0 or closed["time"][0] > self.last_base_time:
+            return False  # The run does not reach back to what was folded, bars in between may be missing
+
+        new = closed[int(np.searchsorted(closed["time"], self.last_base_time, side="right")):]
+        if len(new) == 0:
+            return True
+
+        bars = aggregate(new, self.seconds, self.offset)
+        if len(self.bars) and self.bars["time"][-1] == bars["time"][0]:
+            self.bars[-1] = merge_bar(self.bars[-1], bars[0])
+            bars = bars[1:]
+        self.bars = np.concatenate((self.bars[-self.retain:], bars)) if len(bars) else self.bars
+        self.last_base_time = int(new["time"][-1])
+        return True
+
+    def view(self, base_rates: np.ndarray, count: int) -> np.ndarray:
+        """The latest ``count`` bars, the last one including the forming base bar."""
+        forming = aggregate(base_rates[-1:], self.seconds, self.offset)[0]
+        if len(self.bars) and self.bars["time"][-1] == forming["time"]:
+            return np.concatenate((self.bars[-count:-1] if count > 1 else self.bars[:0], [merge_bar(self.bars[-1], forming)]))
+        return np.concatenate((self.bars[-(count - 1):] if count > 1 else self.bars[:0], [forming]))
+
+class Resampler:
+    """Builds the higher granularities of a symbol from its finest configured one.
+
+    Once seeded from one terminal query, a resampled series only needs the base bars, so
+    higher-timeframe strategies and confirmation checks read the base candle cache rather
+    than keeping their own series in the terminal. Bars open ``session_offset_minutes``
+    after broker midnight, matching how the broker's own H4 and daily bars are aligned.
+    """
+
+    def __init__(self, session_offset_minutes: int = 0):
+        self.offset = session_offset_minutes * 60
+        self.bases: Dict[str, str] = {}  # symbol -> base granularity
+        self.derived: Dict[str, List[str]] = {}  # symbol -> granularities built from the base
+        self.series: Dict[Tuple[str, str], ResampledSeries] = {}
+        self.lock = threading.Lock()
+
+    def register(self, symbol: str, granularities) -> Optional[str]:
+        """Resample the granularities of ``symbol`` that divide into whole base bars, returns the base granularity."""
+        granularities = sorted(set(granularities), key=granularity_to_minutes)
+        base = granularities[0]
+        base_minutes = granularity_to_minutes(base)
+        derived = [granularity for granularity in granularities[1:]
+                   if granularity in RESAMPLED_GRANULARITIES and granularity_to_minutes(granularity) % base_minutes == 0]
+        with self.lock:
+            if derived:
+                self.bases[symbol] = base
+                self.derived[symbol] = derived
+            else:
+                self.bases.pop(symbol, None)
+                self.derived.pop(symbol, None)
+        return base if derived else None
+
+    def base_of(self, symbol: str, granularity: str) -> Optional[str]:
+        """The granularity ``granularity`` is built from, None if the terminal provides it."""
+        return self.bases.get(symbol) if granularity in self.derived.get(symbol, ()) else None
+
+    def base_count(self, symbol: str, granularity: str) -> int:
+        """Base bars to fetch so the run always covers the whole forming bar of ``granularity``."""
+        ratio = granularity_to_minutes(granularity) // granularity_to_minutes(self.bases[symbol])
+        return max(ratio + 2, defs.CANDLE_COUNT + 1)
+
+    def fetch(self, symbol: str, granularity: str, base_rates: np.ndarray, count: int) -> Optional[np.ndarray]:
+        """The latest ``count`` bars of ``granularity``, None until seeded or after base bars went missing."""
+        with self.lock:
+            series = self.series.get((symbol, granularity))
+            if series is None or series.retain < count or not series.update(base_rates):
+                return None
+            return series.view(base_rates, count)
+
+    def seed(self, symbol: str, granularity: str, rates: np.ndarray, count: int):
+        series = ResampledSeries(granularity_to_minutes(granularity) * 60, self.offset, count)
+        series.seed(rates)
+        with self.lock:
+            self.series[(symbol, granularity)] = series
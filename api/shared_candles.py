@@ -0,0 +1,175 @@
+import os
+import re
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+import numpy as np
+
+import constants.defs as defs
+from db.bar_store import BAR_DTYPE, as_bars
+
+T = TypeVar("T")
+
+# Header words, padded to a cache line ahead of the records
+SEQUENCE, COUNT, CAPACITY = 0, 1, 2
+HEADER_BYTES = 64
+
+class TornRead(RuntimeError):
+    """The writer kept updating the segment for longer than a reader was willing to retry."""
+
+class CandleSegment:
+    """The latest candles of one (symbol, granularity) in a shared memory block.
+
+    One process writes, any number map it and read in place. Writes are guarded by a
+    sequence counter (a seqlock): it is odd while a write is in progress and moves on with
+    every write, so a reader that sees the same even value before and after reading knows
+    the bars it read were neither torn nor replaced. Candles are right aligned, the forming
+    candle is always the last record.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.memory = memory
+        self.owner = owner
+        self.header = np.ndarray((HEADER_BYTES // 8,), dtype=np.int64, buffer=memory.buf)
+        capacity = int(self.header[CAPACITY])
+        self.records = np.ndarray((capacity,), dtype=BAR_DTYPE, buffer=memory.buf, offset=HEADER_BYTES)
+        if not owner:
+            self.records.flags.writeable = False
+            self.header.flags.writeable = False
+
+    @classmethod
+    def create(cls, name: str, capacity: int) -> "CandleSegment":
+        size = HEADER_BYTES + capacity * BAR_DTYPE.itemsize
+        try:
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a writer that did not exit cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_BYTES // 8,), dtype=np.int64, buffer=memory.buf)
+        header[:] = 0
+        header[CAPACITY] = capacity
+        del header  # The segment maps its own view, no export may outlive close()
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "CandleSegment":
+        memory = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # Readers must not unlink the block when they exit, only the writer owns it
+            resource_tracker.unregister(memory._name, "shared_memory")
+        return cls(memory, owner=False)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.records)
+
+    @property
+    def sequence(self) -> int:
+        return int(self.header[SEQUENCE])
+
+    def write(self, rates: np.ndarray):
+        rates = as_bars(rates[-self.capacity:])
+        self.header[SEQUENCE] += 1  # Odd, readers retry
+        self.records[self.capacity - len(rates):] = rates
+        self.header[COUNT] = len(rates)
+        self.header[SEQUENCE] += 1
+
+    def read(self, consume: Callable[[np.ndarray], T], count: Optional[int] = None, retries: int = 1000) -> T:
+        """``consume`` a read-only view of the latest ``count`` candles, again if a write overlapped it.
+
+        ``consume`` may run more than once, so it must not have side effects, and it must not
+        keep the view: copy anything needed after it returns.
+        """
+        for _ in range(retries):
+            sequence = int(self.header[SEQUENCE])
+            if sequence & 1:
+                time.sleep(0)
+                continue
+
+            available = int(self.header[COUNT])
+            available = available if count is None else min(count, available)
+            result = consume(self.records[self.capacity - available:])
+            if int(self.header[SEQUENCE]) == sequence:
+                return result
+        raise TornRead(f"{self.memory.name} was being written for {retries} reads")
+
+    def close(self):
+        self.header = self.records = None
+        self.memory.close()
+
+    def unlink(self):
+        self.close()
+        if self.owner:
+            self.memory.unlink()
+
+class SharedCandles:
+    """Candle segments per (symbol, granularity) under a common name ``prefix``.
+
+    The process that talks to the terminal opens it with ``create=True`` and publishes
+    what it fetches, strategy processes open it with the same prefix and read the candles
+    in place, attaching to each segment the first time it is read.
+    """
+
+    def __init__(self, prefix: str, create: bool = False, capacity: int = defs.CANDLE_COUNT + 1):
+        self.prefix = prefix
+        self.create = create
+        self.capacity = capacity
+        self.segments: Dict[Tuple[str, str], CandleSegment] = {}
+
+    def name(self, symbol: str, granularity: str) -> str:
+        # Shared memory names allow few characters and, on macOS, only 31 of them
+        return re.sub(r"[^A-Za-z0-9_]", "_", f"{self.prefix}_{symbol}_{granularity}")[:31]
+
+    def segment(self, symbol: str, granularity: str) -> Optional[CandleSegment]:
+        key = (symbol, granularity)
+        segment = self.segments.get(key)
+        if segment is None:
+            try:
+                if self.create:
+                    segment = CandleSegment.create(self.name(symbol, granularity), self.capacity)
+                else:
+                    segment = CandleSegment.attach(self.name(symbol, granularity))
+            except FileNotFoundError:
+                return None  # Not published yet
+            self.segments[key] = segment
+        return segment
+
+    def publish(self, symbol: str, granularity: str, rates: np.ndarray):
+        self.segment(symbol, granularity).write(rates)
+
+    def read(self, symbol: str, granularity: str, consume: Callable[[np.ndarray], T], count: Optional[int] = None) -> Optional[T]:
+        """``consume`` the latest candles in place (see CandleSegment.read), None if nothing is published yet."""
+        segment = self.segment(symbol, granularity)
+        if segment is None:
+            return None
+        return segment.read(consume, count)
+
+    def closed_since(self, symbol: str, granularity: str, last_time: Optional[int]) -> Optional[np.ndarray]:
+        """Copy of the closed candles from ``last_time`` on, usually it and the one that has just closed.
+
+        The candle at ``last_time`` is included so the caller can tell the run follows on from
+        what it already has. Every closed candle is returned when ``last_time`` is None.
+        """
+        def copy_new(rates):
+            closed = rates[:-1]
+            start = 0 if last_time is None else int(np.searchsorted(closed["time"], last_time, side="left"))
+            return closed[start:].copy()
+
+        return self.read(symbol, granularity, copy_new)
+
+    def sequence(self, symbol: str, granularity: str) -> Optional[int]:
+        """Changes with every publish, readers can skip a pair whose sequence has not moved."""
+        segment = self.segment(symbol, granularity)
+        return None if segment is None else segment.sequence
+
+    def close(self):
+        for segment in self.segments.values():
+            if self.create:
+                segment.unlink()
+            else:
+                segment.close()
+        self.segments.clear()
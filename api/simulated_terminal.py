@@ -0,0 +1,792 @@
+import calendar
+import datetime as dt
+import threading
+import time
+import zlib
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Layout of the structured arrays returned by MetaTrader5.copy_rates_*
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("tick_volume", "<u8"),
+    ("spread", "<i4"),
+    ("real_volume", "<u8"),
+])
+
+TICKS_DTYPE = np.dtype([
+    ("time_msc", "<i8"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("last", "<f8"),
+    ("volume", "<u8"),
+])
+
+# Named tuples mirror the terminal objects; the first field keeps the same position
+# (retcode, ticket) because the api reads some of them by index
+SymbolInfo = namedtuple("SymbolInfo", [
+    "name", "digits", "point", "spread", "trade_tick_size", "trade_tick_value",
+    "trade_contract_size", "volume_min", "volume_max", "volume_step", "bid", "ask",
+    "last", "time", "visible",
+])
+Tick = namedtuple("Tick", ["time", "bid", "ask", "last", "volume", "time_msc", "flags", "volume_real"])
+AccountInfo = namedtuple("AccountInfo", [
+    "login", "balance", "equity", "profit", "margin", "margin_free", "leverage", "currency", "server",
+])
+OrderSendResult = namedtuple("OrderSendResult", [
+    "retcode", "deal", "order", "volume", "price", "bid", "ask", "comment", "request_id",
+    "retcode_external", "request",
+])
+TradeOrder = namedtuple("TradeOrder", [
+    "ticket", "time_setup", "type", "magic", "symbol", "volume_current", "price_open", "sl", "tp", "comment",
+])
+TradePosition = namedtuple("TradePosition", [
+    "ticket", "time", "type", "magic", "identifier", "volume", "price_open", "sl", "tp",
+    "price_current", "profit", "symbol", "comment",
+])
+TradeDeal = namedtuple("TradeDeal", [
+    "ticket", "order", "time", "time_msc", "type", "entry", "magic", "position_id", "volume",
+    "price", "profit", "symbol", "comment",
+])
+
+
+@dataclass
+class SimulatedSymbol:
+    name: str
+    start_price: float = 1.0
+    digits: int = 5
+    trade_tick_value: float = 1.0
+    trade_contract_size: float = 100000.0
+    volume_min: float = 0.01
+    volume_max: float = 100.0
+    volume_step: float = 0.01
+    spread: int = 10  # In points
+    volatility: float = 0.0004  # Standard deviation of the M1 log return
+
+    @property
+    def point(self) -> float:
+        return round(10 ** -self.digits, self.digits)
+
+
+@dataclass
+class _SymbolState:
+    spec: SimulatedSymbol
+    rates: np.ndarray
+    generated_blocks: int = 0
+    recorded: bool = False
+    ticks: Optional[np.ndarray] = None
+    aggregated: Dict[int, np.ndarray] = field(default_factory=dict)
+
+
+class SimulatedTerminal:
+    """Drop-in stand-in for the ``MetaTrader5`` module.
+
+    Bars are a deterministic random walk per symbol (or recorded M1 rates loaded with
+    ``load_rates``) and every higher timeframe is aggregated from the M1 series. The clock
+    is broker server time in epoch seconds, as the terminal reports it. In replay mode it
+    only moves through ``advance``/``set_time``; with ``realtime=True`` it follows the wall
+    clock shifted by ``utc_offset_hours``. Pending orders, stop losses and take profits are
+    matched against each M1 bar once it has closed.
+    """
+
+    # Constants as exposed by the MetaTrader5 package
+    TIMEFRAME_M1 = 1
+    TIMEFRAME_M2 = 2
+    TIMEFRAME_M3 = 3
+    TIMEFRAME_M4 = 4
+    TIMEFRAME_M5 = 5
+    TIMEFRAME_M6 = 6
+    TIMEFRAME_M10 = 10
+    TIMEFRAME_M12 = 12
+    TIMEFRAME_M15 = 15
+    TIMEFRAME_M20 = 20
+    TIMEFRAME_M30 = 30
+    TIMEFRAME_H1 = 16385
+    TIMEFRAME_H2 = 16386
+    TIMEFRAME_H3 = 16387
+    TIMEFRAME_H4 = 16388
+    TIMEFRAME_H6 = 16390
+    TIMEFRAME_H8 = 16392
+    TIMEFRAME_H12 = 16396
+    TIMEFRAME_D1 = 16408
+    TIMEFRAME_W1 = 32769
+    TIMEFRAME_MN1 = 49153
+
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    ORDER_TYPE_BUY_LIMIT = 2
+    ORDER_TYPE_SELL_LIMIT = 3
+    ORDER_TYPE_BUY_STOP = 4
+    ORDER_TYPE_SELL_STOP = 5
+
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+
+    DEAL_TYPE_BUY = 0
+    DEAL_TYPE_SELL = 1
+    DEAL_ENTRY_IN = 0
+    DEAL_ENTRY_OUT = 1
+
+    TRADE_ACTION_DEAL = 1
+    TRADE_ACTION_PENDING = 5
+    TRADE_ACTION_SLTP = 6
+    TRADE_ACTION_MODIFY = 7
+    TRADE_ACTION_REMOVE = 8
+
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    ORDER_FILLING_RETURN = 2
+    ORDER_TIME_GTC = 0
+
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_INVALID_PRICE = 10015
+    TRADE_RETCODE_INVALID_STOPS = 10016
+
+    BLOCK_MINUTES = 1440  # Bars are generated one broker day at a time
+    DEFAULT_START = dt.datetime(2024, 1, 2)
+
+    def __init__(
+        self,
+        symbols: Optional[List[SimulatedSymbol]] = None,
+        start_time: Optional[dt.datetime] = None,
+        history_days: int = 30,
+        seed: int = 0,
+        balance: float = 10000.0,
+        realtime: bool = False,
+        utc_offset_hours: float = 2,
+        skip_weekends: bool = True,
+    ) -> None:
+        self.seed = seed
+        self.realtime = realtime
+        self.utc_offset = int(utc_offset_hours * 3600)
+        self.skip_weekends = skip_weekends
+        self.timeframe_seconds = self._timeframes()
+        self.lock = threading.RLock()
+
+        if realtime:
+            self.clock = time.time() + self.utc_offset
+        else:
+            self.clock = float(self._to_epoch(start_time or self.DEFAULT_START))
+        self.origin = (int(self.clock) // 86400 - history_days) * 86400
+
+        self.symbols: Dict[str, _SymbolState] = {}
+        for spec in symbols or []:
+            self.add_symbol(spec)
+
+        self.balance = balance
+        self.login_id = 0
+        self.server = "Simulated"
+        self.connected = False
+        self.error = (1, "Success")
+
+        self.ticket = 0
+        self.orders: Dict[int, dict] = {}
+        self.positions: Dict[int, dict] = {}
+        self.deals: List[TradeDeal] = []
+        self.matched_until = int(self.clock) // 60 * 60
+
+    # ------------------------------------------------------------------ data setup
+    def add_symbol(self, spec: SimulatedSymbol):
+        with self.lock:
+            self.symbols[spec.name] = _SymbolState(spec=spec, rates=np.empty(0, dtype=RATES_DTYPE))
+
+    def load_rates(self, symbol: str, rates: np.ndarray, spec: Optional[SimulatedSymbol] = None):
+        """Replace the synthetic M1 series of ``symbol`` with recorded M1 rates."""
+        with self.lock:
+            state = self._symbol(symbol) if spec is None else None
+            spec = spec or state.spec
+            recorded = np.zeros(len(rates), dtype=RATES_DTYPE)
+            for name in RATES_DTYPE.names:
+                if name in rates.dtype.names:
+                    recorded[name] = rates[name]
+            self.symbols[symbol] = _SymbolState(spec=spec, rates=np.sort(recorded, order="time"), recorded=True)
+
+    def load_ticks(self, symbol: str, ticks: np.ndarray):
+        """Serve recorded ticks (``TICKS_DTYPE`` fields) from ``symbol_info_tick``."""
+        with self.lock:
+            state = self._symbol(symbol)
+            recorded = np.zeros(len(ticks), dtype=TICKS_DTYPE)
+            for name in TICKS_DTYPE.names:
+                if name in ticks.dtype.names:
+                    recorded[name] = ticks[name]
+            state.ticks = np.sort(recorded, order="time_msc")
+
+    # ------------------------------------------------------------------ clock
+    def time(self) -> float:
+        with self.lock:
+            self._sync()
+            return self.clock
+
+    def advance(self, seconds: float):
+        with self.lock:
+            self._set_clock(self.clock + seconds)
+
+    def set_time(self, when):
+        with self.lock:
+            self._set_clock(float(self._to_epoch(when)))
+
+    def _sync(self):
+        if self.realtime:
+            self._set_clock(time.time() + self.utc_offset)
+
+    def _set_clock(self, clock: float):
+        if clock < self.clock:
+            raise ValueError("SimulatedTerminal clock cannot move backwards")
+        self.clock = clock
+        self._match_orders()
+
+    @staticmethod
+    def _to_epoch(when) -> int:
+        if isinstance(when, dt.datetime):
+            if when.tzinfo is None:
+                return calendar.timegm(when.timetuple())
+            return int(when.timestamp())
+        return int(when)
+
+    # ------------------------------------------------------------------ terminal api
+    def initialize(self, path=None, login=None, password=None, server=None, timeout=None, portable=False) -> bool:
+        self.connected = True
+        if login is not None:
+            self.login_id = login
+        self.error = (1, "Success")
+        return True
+
+    def login(self, login, password=None, server=None, timeout=None) -> bool:
+        if not self.connected:
+            self.error = (-10004, "No IPC connection")
+            return False
+        self.login_id = login
+        self.server = server or self.server
+        return True
+
+    def shutdown(self):
+        self.connected = False
+
+    def last_error(self):
+        return self.error
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        with self.lock:
+            self._sync()
+            rates = self._closed_rates(symbol, timeframe)
+            if rates is None:
+                return None
+            end = max(len(rates) - start_pos, 0)
+            return rates[max(end - count, 0):end].copy()
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        with self.lock:
+            self._sync()
+            rates = self._closed_rates(symbol, timeframe)
+            if rates is None:
+                return None
+            end = int(np.searchsorted(rates["time"], self._to_epoch(date_from), side="right"))
+            return rates[max(end - count, 0):end].copy()
+
+    def copy_rates_range(self, symbol, timeframe, date_from, date_to):
+        with self.lock:
+            self._sync()
+            rates = self._closed_rates(symbol, timeframe)
+            if rates is None:
+                return None
+            start = int(np.searchsorted(rates["time"], self._to_epoch(date_from), side="left"))
+            end = int(np.searchsorted(rates["time"], self._to_epoch(date_to), side="right"))
+            return rates[start:end].copy()
+
+    def symbol_info(self, symbol):
+        with self.lock:
+            self._sync()
+            tick = self._tick(symbol)
+            if tick is None:
+                return None
+            spec = self.symbols[symbol].spec
+            return SymbolInfo(
+                name=spec.name,
+                digits=spec.digits,
+                point=spec.point,
+                spread=spec.spread,
+                trade_tick_size=spec.point,
+                trade_tick_value=spec.trade_tick_value,
+                trade_contract_size=spec.trade_contract_size,
+                volume_min=spec.volume_min,
+                volume_max=spec.volume_max,
+                volume_step=spec.volume_step,
+                bid=tick.bid,
+                ask=tick.ask,
+                last=tick.last,
+                time=tick.time,
+                visible=True,
+            )
+
+    def symbol_info_tick(self, symbol):
+        with self.lock:
+            self._sync()
+            return self._tick(symbol)
+
+    def account_info(self):
+        with self.lock:
+            self._sync()
+            profit = sum(position["profit"] for position in self.positions.values())
+            equity = self.balance + profit
+            return AccountInfo(
+                login=self.login_id,
+                balance=self.balance,
+                equity=equity,
+                profit=profit,
+                margin=0.0,
+                margin_free=equity,
+                leverage=100,
+                currency="USD",
+                server=self.server,
+            )
+
+    def orders_get(self, symbol=None, group=None, ticket=None):
+        with self.lock:
+            self._sync()
+            return tuple(
+                TradeOrder(**order) for order in self.orders.values()
+                if (symbol is None or order["symbol"] == symbol) and (ticket is None or order["ticket"] == ticket)
+            )
+
+    def positions_get(self, symbol=None, group=None, ticket=None):
+        with self.lock:
+            self._sync()
+            self._mark_positions()
+            return tuple(
+                TradePosition(**position) for position in self.positions.values()
+                if (symbol is None or position["symbol"] == symbol) and (ticket is None or position["ticket"] == ticket)
+            )
+
+    def history_deals_get(self, date_from=None, date_to=None, group=None, ticket=None, position=None):
+        with self.lock:
+            self._sync()
+            start = self._to_epoch(date_from) if date_from is not None else None
+            end = self._to_epoch(date_to) if date_to is not None else None
+            return tuple(
+                deal for deal in self.deals
+                if (start is None or deal.time >= start) and (end is None or deal.time <= end)
+                and (ticket is None or deal.ticket == ticket)
+                and (position is None or deal.position_id == position)
+            )
+
+    def order_send(self, request):
+        with self.lock:
+            self._sync()
+            action = request.get("action")
+            if action == self.TRADE_ACTION_PENDING:
+                return self._place_pending(request)
+            if action == self.TRADE_ACTION_DEAL:
+                return self._market_deal(request)
+            if action == self.TRADE_ACTION_SLTP:
+                position = self.positions.get(request.get("position"))
+                if position is None:
+                    return self._result(self.TRADE_RETCODE_INVALID, request)
+                position["sl"] = float(request.get("sl", 0.0))
+                position["tp"] = float(request.get("tp", 0.0))
+                return self._result(self.TRADE_RETCODE_DONE, request)
+            if action == self.TRADE_ACTION_MODIFY:
+                order = self.orders.get(request.get("order"))
+                if order is None:
+                    return self._result(self.TRADE_RETCODE_INVALID, request)
+                order["price_open"] = float(request.get("price", order["price_open"]))
+                order["sl"] = float(request.get("sl", 0.0))
+                order["tp"] = float(request.get("tp", 0.0))
+                return self._result(self.TRADE_RETCODE_DONE, request, order=order["ticket"])
+            if action == self.TRADE_ACTION_REMOVE:
+                order = self.orders.pop(request.get("order"), None)
+                if order is None:
+                    return self._result(self.TRADE_RETCODE_INVALID, request)
+                return self._result(self.TRADE_RETCODE_DONE, request, order=order["ticket"])
+
+            return self._result(self.TRADE_RETCODE_INVALID, request)
+
+    # ------------------------------------------------------------------ order handling
+    def _result(self, retcode, request, deal=0, order=0, volume=0.0, price=0.0):
+        tick = self._tick(request["symbol"]) if request.get("symbol") else None
+        return OrderSendResult(
+            retcode=retcode,
+            deal=deal,
+            order=order,
+            volume=volume,
+            price=price,
+            bid=tick.bid if tick else 0.0,
+            ask=tick.ask if tick else 0.0,
+            comment="Request executed" if retcode == self.TRADE_RETCODE_DONE else "Invalid request",
+            request_id=0,
+            retcode_external=0,
+            request=request,
+        )
+
+    def _next_ticket(self) -> int:
+        self.ticket += 1
+        return self.ticket
+
+    def _valid_volume(self, spec: SimulatedSymbol, volume) -> bool:
+        if volume is None or volume < spec.volume_min or volume > spec.volume_max:
+            return False
+        steps = volume / spec.volume_step
+        return abs(steps - round(steps)) < 1e-6
+
+    def _place_pending(self, request):
+        spec = self._symbol(request["symbol"]).spec
+        order_type = request.get("type")
+        price = request.get("price") or 0.0
+        if not self._valid_volume(spec, request.get("volume")):
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request)
+        if order_type not in (self.ORDER_TYPE_BUY_LIMIT, self.ORDER_TYPE_SELL_LIMIT,
+                              self.ORDER_TYPE_BUY_STOP, self.ORDER_TYPE_SELL_STOP) or price <= 0:
+            return self._result(self.TRADE_RETCODE_INVALID_PRICE, request)
+
+        ticket = self._next_ticket()
+        self.orders[ticket] = dict(
+            ticket=ticket,
+            time_setup=int(self.clock),
+            type=order_type,
+            magic=request.get("magic", 0),
+            symbol=request["symbol"],
+            volume_current=float(request["volume"]),
+            price_open=float(price),
+            sl=float(request.get("sl") or 0.0),
+            tp=float(request.get("tp") or 0.0),
+            comment=request.get("comment", ""),
+        )
+        return self._result(self.TRADE_RETCODE_DONE, request, order=ticket, volume=request["volume"], price=price)
+
+    def _market_deal(self, request):
+        spec = self._symbol(request["symbol"]).spec
+        tick = self._tick(request["symbol"])
+        is_buy = request.get("type") == self.ORDER_TYPE_BUY
+        price = tick.ask if is_buy else tick.bid
+
+        if request.get("position"):
+            position = self.positions.get(request["position"])
+            if position is None:
+                return self._result(self.TRADE_RETCODE_INVALID, request)
+            deal = self._close_position(position, price, int(self.clock))
+            return self._result(self.TRADE_RETCODE_DONE, request, deal=deal.ticket, volume=deal.volume, price=price)
+
+        if not self._valid_volume(spec, request.get("volume")):
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request)
+        order = dict(
+            ticket=self._next_ticket(),
+            type=request.get("type"),
+            magic=request.get("magic", 0),
+            symbol=request["symbol"],
+            volume_current=float(request["volume"]),
+            sl=float(request.get("sl") or 0.0),
+            tp=float(request.get("tp") or 0.0),
+            comment=request.get("comment", ""),
+        )
+        deal = self._open_position(order, is_buy, price, int(self.clock))
+        return self._result(self.TRADE_RETCODE_DONE, request, deal=deal.ticket, order=order["ticket"],
+                            volume=deal.volume, price=price)
+
+    def _open_position(self, order, is_buy, price, when) -> TradeDeal:
+        ticket = order["ticket"]
+        self.positions[ticket] = dict(
+            ticket=ticket,
+            time=when,
+            type=self.POSITION_TYPE_BUY if is_buy else self.POSITION_TYPE_SELL,
+            magic=order["magic"],
+            identifier=ticket,
+            volume=order["volume_current"],
+            price_open=price,
+            sl=order["sl"],
+            tp=order["tp"],
+            price_current=price,
+            profit=0.0,
+            symbol=order["symbol"],
+            comment=order["comment"],
+        )
+        return self._add_deal(self.positions[ticket], is_buy, self.DEAL_ENTRY_IN, price, 0.0, when)
+
+    def _close_position(self, position, price, when) -> TradeDeal:
+        is_buy = position["type"] == self.POSITION_TYPE_BUY
+        profit = self._profit(position, price)
+        self.balance += profit
+        del self.positions[position["ticket"]]
+        return self._add_deal(position, not is_buy, self.DEAL_ENTRY_OUT, price, profit, when)
+
+    def _add_deal(self, position, is_buy, entry, price, profit, when) -> TradeDeal:
+        deal = TradeDeal(
+            ticket=self._next_ticket(),
+            order=position["ticket"],
+            time=when,
+            time_msc=when * 1000,
+            type=self.DEAL_TYPE_BUY if is_buy else self.DEAL_TYPE_SELL,
+            entry=entry,
+            magic=position["magic"],
+            position_id=position["identifier"],
+            volume=position["volume"],
+            price=price,
+            profit=profit,
+            symbol=position["symbol"],
+            comment=position["comment"],
+        )
+        self.deals.append(deal)
+        return deal
+
+    def _profit(self, position, price) -> float:
+        spec = self.symbols[position["symbol"]].spec
+        direction = 1 if position["type"] == self.POSITION_TYPE_BUY else -1
+        ticks = (price - position["price_open"]) * direction / spec.point
+        return round(ticks * spec.trade_tick_value * position["volume"], 2)
+
+    def _mark_positions(self):
+        for position in self.positions.values():
+            tick = self._tick(position["symbol"])
+            price = tick.bid if position["type"] == self.POSITION_TYPE_BUY else tick.ask
+            position["price_current"] = price
+            position["profit"] = self._profit(position, price)
+
+    def _match_orders(self):
+        """Fill pending orders and hit stops against every M1 bar closed since the last match."""
+        closed_until = int(self.clock) // 60 * 60
+        if closed_until <= self.matched_until:
+            return
+
+        for symbol in {o["symbol"] for o in self.orders.values()} | {p["symbol"] for p in self.positions.values()}:
+            rates = self._base_rates(symbol)
+            start = np.searchsorted(rates["time"], self.matched_until, side="left")
+            end = np.searchsorted(rates["time"], closed_until, side="left")
+            bars = rates[start:end]
+            if len(bars) == 0:
+                continue
+            spread = self.symbols[symbol].spec.spread * self.symbols[symbol].spec.point
+
+            for order in [o for o in self.orders.values() if o["symbol"] == symbol]:
+                self._match_pending(order, bars, spread)
+            for position in [p for p in self.positions.values() if p["symbol"] == symbol]:
+                self._match_stops(position, bars, spread)
+
+        self.matched_until = closed_until
+
+    def _match_pending(self, order, bars, spread):
+        bars = bars[bars["time"] >= order["time_setup"] // 60 * 60 + 60]
+        if len(bars) == 0:
+            return
+        price = order["price_open"]
+        order_type = order["type"]
+        is_buy = order_type in (self.ORDER_TYPE_BUY_STOP, self.ORDER_TYPE_BUY_LIMIT)
+        if order_type == self.ORDER_TYPE_BUY_STOP:
+            hits = bars["high"] + spread >= price
+        elif order_type == self.ORDER_TYPE_SELL_STOP:
+            hits = bars["low"] <= price
+        elif order_type == self.ORDER_TYPE_BUY_LIMIT:
+            hits = bars["low"] + spread <= price
+        else:
+            hits = bars["high"] >= price
+        if not hits.any():
+            return
+
+        bar = bars[int(np.argmax(hits))]
+        open_price = bar["open"] + spread if is_buy else bar["open"]
+        if order_type == self.ORDER_TYPE_BUY_STOP:
+            fill = max(price, open_price)
+        elif order_type == self.ORDER_TYPE_SELL_STOP:
+            fill = min(price, open_price)
+        elif order_type == self.ORDER_TYPE_BUY_LIMIT:
+            fill = min(price, open_price)
+        else:
+            fill = max(price, open_price)
+
+        del self.orders[order["ticket"]]
+        self._open_position(order, is_buy, float(fill), int(bar["time"]))
+
+    def _match_stops(self, position, bars, spread):
+        bars = bars[bars["time"] >= position["time"] // 60 * 60 + 60]
+        if len(bars) == 0:
+            return
+        sl, tp = position["sl"], position["tp"]
+        if position["type"] == self.POSITION_TYPE_BUY:
+            sl_hits = bars["low"] <= sl if sl else np.zeros(len(bars), dtype=bool)
+            tp_hits = bars["high"] >= tp if tp else np.zeros(len(bars), dtype=bool)
+        else:
+            sl_hits = bars["high"] + spread >= sl if sl else np.zeros(len(bars), dtype=bool)
+            tp_hits = bars["low"] + spread <= tp if tp else np.zeros(len(bars), dtype=bool)
+        hits = sl_hits | tp_hits
+        if not hits.any():
+            return
+
+        index = int(np.argmax(hits))
+        # When both levels sit inside one bar the stop loss is assumed to trade first
+        price = sl if sl_hits[index] else tp
+        self._close_position(position, float(price), int(bars[index]["time"]))
+
+    # ------------------------------------------------------------------ price series
+    def _symbol(self, symbol: str) -> _SymbolState:
+        if symbol not in self.symbols:
+            self.add_symbol(SimulatedSymbol(name=symbol))
+        return self.symbols[symbol]
+
+    def _base_rates(self, symbol: str) -> np.ndarray:
+        state = self._symbol(symbol)
+        if not state.recorded:
+            self._extend(state)
+        return state.rates
+
+    def _extend(self, state: _SymbolState):
+        block_seconds = self.BLOCK_MINUTES * 60
+        needed = (int(self.clock) - self.origin) // block_seconds + 1
+        if state.generated_blocks >= needed:
+            return
+
+        spec = state.spec
+        blocks = [state.rates]
+        last_close = state.rates["close"][-1] if len(state.rates) else spec.start_price
+        symbol_seed = zlib.crc32(spec.name.encode())
+        for block in range(state.generated_blocks, needed):
+            rng = np.random.default_rng([self.seed, symbol_seed, block])
+            returns = rng.normal(0.0, spec.volatility, self.BLOCK_MINUTES)
+            wicks = np.abs(rng.normal(0.0, spec.volatility, (2, self.BLOCK_MINUTES)))
+            volumes = rng.integers(1, 500, self.BLOCK_MINUTES)
+
+            closes = last_close * np.exp(np.cumsum(returns))
+            opens = np.concatenate(([last_close], closes[:-1]))
+            rates = np.zeros(self.BLOCK_MINUTES, dtype=RATES_DTYPE)
+            rates["time"] = self.origin + block * block_seconds + np.arange(self.BLOCK_MINUTES) * 60
+            rates["open"] = np.round(opens, spec.digits)
+            rates["close"] = np.round(closes, spec.digits)
+            rates["high"] = np.round(np.maximum(opens, closes) * (1 + wicks[0]), spec.digits)
+            rates["low"] = np.round(np.minimum(opens, closes) * (1 - wicks[1]), spec.digits)
+            rates["tick_volume"] = volumes
+            rates["spread"] = spec.spread
+            last_close = closes[-1]
+
+            if self.skip_weekends:
+                # 1970-01-01 was a Thursday, so days 2 and 3 of each week are Saturday and Sunday
+                weekday = (rates["time"] // 86400 + 3) % 7
+                rates = rates[weekday < 5]
+            blocks.append(rates)
+
+        state.rates = np.concatenate(blocks)
+        state.generated_blocks = needed
+
+    def _closed_rates(self, symbol, timeframe) -> Optional[np.ndarray]:
+        """Bars up to the clock, the last one being the bar currently forming."""
+        rates = self._base_rates(symbol)
+        rates = self._forming(symbol, rates[:np.searchsorted(rates["time"], self.clock, side="right")])
+        if timeframe == self.TIMEFRAME_M1:
+            return rates
+        if timeframe not in self.timeframe_seconds:
+            self.error = (-2, "Invalid timeframe")
+            return None
+        return self._aggregate(self.symbols[symbol], timeframe, rates)
+
+    def _forming(self, symbol, rates: np.ndarray) -> np.ndarray:
+        """``rates`` with the M1 bar open at the clock cut down to the prices ticked so far.
+
+        The stored bar already holds the high, low and close of the whole minute, which a
+        terminal only knows once the minute is over.
+        """
+        if len(rates) == 0 or rates["time"][-1] + 60 <= self.clock:
+            return rates
+        state = self.symbols[symbol]
+        rates = rates.copy()
+        bar = rates[-1:]
+        if state.ticks is not None:
+            start = np.searchsorted(state.ticks["time_msc"], int(bar["time"][0]) * 1000, side="left")
+            end = np.searchsorted(state.ticks["time_msc"], self.clock * 1000, side="right")
+            bids = state.ticks["bid"][start:end]
+            tick_volume = len(bids)
+        else:
+            fraction = min(max((self.clock - bar["time"][0]) / 60.0, 0.0), 1.0)
+            bids = [self._tick(symbol).bid]
+            tick_volume = int(bar["tick_volume"][0] * fraction)
+        prices = np.concatenate((bar["open"], bids))
+        bar["high"] = prices.max()
+        bar["low"] = prices.min()
+        bar["close"] = prices[-1]
+        bar["tick_volume"] = tick_volume
+        return rates
+
+    def _aggregate(self, state: _SymbolState, timeframe: int, rates: np.ndarray) -> np.ndarray:
+        if len(rates) == 0:
+            return np.empty(0, dtype=RATES_DTYPE)
+        cached = state.aggregated.get(timeframe)
+        keep = 0
+        start = 0
+        if cached is not None and len(cached) > 1:
+            # Rebuild only from the last complete bucket onwards
+            keep = len(cached) - 1
+            start = int(np.searchsorted(rates["time"], cached["time"][keep], side="left"))
+
+        tail = rates[start:]
+        buckets = self._bucket(tail["time"], timeframe)
+        edges = np.flatnonzero(np.diff(buckets)) + 1
+        starts = np.concatenate(([0], edges))
+        ends = np.concatenate((edges, [len(tail)])) - 1
+
+        bars = np.zeros(len(starts), dtype=RATES_DTYPE)
+        bars["time"] = buckets[starts]
+        bars["open"] = tail["open"][starts]
+        bars["close"] = tail["close"][ends]
+        bars["high"] = np.maximum.reduceat(tail["high"], starts)
+        bars["low"] = np.minimum.reduceat(tail["low"], starts)
+        bars["tick_volume"] = np.add.reduceat(tail["tick_volume"], starts)
+        bars["spread"] = tail["spread"][starts]
+        bars["real_volume"] = np.add.reduceat(tail["real_volume"], starts)
+
+        aggregated = np.concatenate((cached[:keep], bars)) if keep else bars
+        state.aggregated[timeframe] = aggregated
+        return aggregated
+
+    def _bucket(self, times: np.ndarray, timeframe: int) -> np.ndarray:
+        if timeframe == self.TIMEFRAME_W1:
+            # Weeks open on Sunday; 1970-01-04 was the first one
+            return (times - 3 * 86400) // 604800 * 604800 + 3 * 86400
+        if timeframe == self.TIMEFRAME_MN1:
+            months = times.astype("datetime64[s]").astype("datetime64[M]")
+            return months.astype("datetime64[s]").astype(np.int64)
+        seconds = self.timeframe_seconds[timeframe]
+        return times // seconds * seconds
+
+    @classmethod
+    def _timeframes(cls) -> Dict[int, int]:
+        timeframes = {}
+        for name in dir(cls):
+            if name.startswith("TIMEFRAME_"):
+                value = getattr(cls, name)
+                if value < 16385:
+                    timeframes[value] = value * 60
+                elif value == cls.TIMEFRAME_D1:
+                    timeframes[value] = 86400
+                elif value < cls.TIMEFRAME_D1:
+                    timeframes[value] = (value - 16384) * 3600
+                else:
+                    timeframes[value] = 0
+        return timeframes
+
+    def _tick(self, symbol) -> Optional[Tick]:
+        state = self._symbol(symbol)
+        spec = state.spec
+        spread = round(spec.spread * spec.point, spec.digits)
+
+        if state.ticks is not None:
+            index = int(np.searchsorted(state.ticks["time_msc"], self.clock * 1000, side="right")) - 1
+            if index < 0:
+                return None
+            tick = state.ticks[index]
+            ask = float(tick["ask"]) or round(float(tick["bid"]) + spread, spec.digits)
+            return Tick(int(tick["time_msc"]) // 1000, float(tick["bid"]), ask, float(tick["last"]),
+                        int(tick["volume"]), int(tick["time_msc"]), 0, float(tick["volume"]))
+
+        rates = self._base_rates(symbol)
+        index = int(np.searchsorted(rates["time"], self.clock, side="right")) - 1
+        if index < 0:
+            return None
+        bar = rates[index]
+        # Walk from open to close across the minute so consecutive polls see a moving price
+        fraction = min(max((self.clock - bar["time"]) / 60.0, 0.0), 1.0)
+        bid = round(float(bar["open"] + (bar["close"] - bar["open"]) * fraction), spec.digits)
+        time_msc = int(self.clock * 1000)
+        return Tick(time_msc // 1000, bid, round(bid + spread, spec.digits), bid, 1, time_msc, 0, 1.0)
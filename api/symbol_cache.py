@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import constants.defs as defs
+from models.symbol_spec import SymbolSpec
+
+class SymbolCache:
+    """Symbol specs and an account balance snapshot kept for a TTL instead of asked for per signal.
+
+    Contract fields barely change, so specs live for ``spec_ttl`` seconds. The balance is
+    refreshed after ``account_ttl`` seconds or straight away after ``invalidate_account``,
+    which is called on trade events.
+    """
+
+    def __init__(self, mt5_terminal, spec_ttl: float = defs.SYMBOL_SPEC_TTL, account_ttl: float = defs.ACCOUNT_SNAPSHOT_TTL):
+        self.mt5 = mt5_terminal
+        self.spec_ttl = spec_ttl
+        self.account_ttl = account_ttl
+        self.specs: Dict[str, SymbolSpec] = {}
+        self.account_balance: Optional[float] = None
+        self.account_fetched_at = 0.0
+        self.lock = threading.Lock()
+
+    def spec(self, symbol: str) -> SymbolSpec:
+        now = time.monotonic()
+        spec = self.specs.get(symbol)
+        if spec is not None and now - spec.fetched_at < self.spec_ttl:
+            return spec
+
+        symbol_info = self.mt5.symbol_info(symbol)
+        if symbol_info is None:
+            raise ValueError(f"No symbol info returned for {symbol}")
+
+        spec = SymbolSpec.from_symbol_info(symbol, symbol_info, now)
+        with self.lock:
+            self.specs[symbol] = spec
+        return spec
+
+    def balance(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            if self.account_balance is None or now - self.account_fetched_at >= self.account_ttl:
+                account_info = self.mt5.account_info()
+                if account_info is None:
+                    raise ConnectionError("No account info returned by the terminal")
+                self.account_balance = account_info.balance
+                self.account_fetched_at = now
+            return self.account_balance
+
+    def invalidate_account(self):
+        with self.lock:
+            self.account_balance = None
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self.lock:
+            if symbol is None:
+                self.specs.clear()
+            else:
+                self.specs.pop(symbol, None)
@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from db.tick_store import TICK_DTYPE, TickStore
+
+class TickBuffer:
+    """Preallocated ticks of one symbol waiting to be written."""
+
+    def __init__(self, size: int):
+        self.data = np.zeros(size, dtype=TICK_DTYPE)
+        self.count = 0
+        self.last = None  # (time_msc, bid, ask) of the last recorded tick
+
+class TickRecorder:
+    """Keeps every distinct tick the bot sees, per symbol, in a TickStore.
+
+    ``record`` only copies five fields into a preallocated buffer, the file write happens
+    once ``buffer_ticks`` ticks are waiting or ``flush_interval`` seconds have passed, so
+    the live loop pays well under a microsecond per tick most of the time. Polling the same
+    tick again, as the tick pollers do between price changes, records nothing.
+    """
+
+    def __init__(self, store: TickStore, buffer_ticks: int = 4096, flush_interval: float = 5.0):
+        self.store = store
+        self.buffer_ticks = buffer_ticks
+        self.flush_interval = flush_interval
+        self.buffers: Dict[str, TickBuffer] = {}
+        self.full_batches: List[Tuple[str, np.ndarray]] = []  # Filled buffers in the order they filled, waiting to be written
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # Held across a whole flush so batches of a symbol reach the file in order
+        self.next_flush = time.monotonic() + flush_interval
+        self.stats = {"recorded": 0, "repeated": 0, "flushes": 0}
+
+    def record(self, symbol: str, tick):
+        if tick is None:
+            return
+        key = (tick.time_msc, tick.bid, tick.ask)
+        with self.lock:
+            buffer = self.buffers.get(symbol)
+            if buffer is None:
+                buffer = self.buffers[symbol] = TickBuffer(self.buffer_ticks)
+            if buffer.last == key:
+                self.stats["repeated"] += 1
+                return
+
+            buffer.data[buffer.count] = (tick.time_msc, tick.bid, tick.ask, tick.last, tick.volume)
+            buffer.count += 1
+            buffer.last = key
+            self.stats["recorded"] += 1
+            full = buffer.count == self.buffer_ticks
+            if full:
+                # Handed over whole, the next tick goes to a fresh array rather than waiting for the write
+                self.full_batches.append((symbol, buffer.data))
+                buffer.data = np.zeros(self.buffer_ticks, dtype=TICK_DTYPE)
+                buffer.count = 0
+
+        if full or time.monotonic() >= self.next_flush:
+            self.flush(None if not full else symbol)
+
+    def flush(self, symbol: Optional[str] = None):
+        """Write the filled buffers and the waiting ticks, of every symbol unless ``symbol`` is given."""
+        with self.write_lock:
+            with self.lock:
+                pending, self.full_batches = self.full_batches, []
+                for name, buffer in self.buffers.items():
+                    if buffer.count and (symbol is None or name == symbol):
+                        pending.append((name, buffer.data[:buffer.count].copy()))
+                        buffer.count = 0
+                if symbol is None:
+                    self.next_flush = time.monotonic() + self.flush_interval
+
+            for name, ticks in pending:
+                self.store.append(name, ticks)
+            if pending:
+                self.stats["flushes"] += 1
+
+class RecordingTerminal:
+    """Stands in for the terminal and records every tick read through ``symbol_info_tick``.
+
+    Everything else is passed through to ``terminal`` unchanged.
+    """
+
+    def __init__(self, terminal, recorder: TickRecorder):
+        self.terminal = terminal
+        self.recorder = recorder
+
+    def symbol_info_tick(self, symbol):
+        tick = self.terminal.symbol_info_tick(symbol)
+        self.recorder.record(symbol, tick)
+        return tick
+
+    def __getattr__(self, name):
+        return getattr(self.terminal, name)
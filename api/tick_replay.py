@@ -0,0 +1,99 @@
+import calendar
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from api.simulated_terminal import Tick
+from db.tick_store import TickStore
+
+# Ticks the cursor of a symbol is looked for in before falling back to the sparse index
+CURSOR_WINDOW = 64
+
+class TickReplay:
+    """Serves recorded ticks through the terminal's tick interface.
+
+    ``symbol_info_tick`` returns the latest recorded tick at the replay clock, which runs
+    ``speed`` times faster than the wall clock from ``start_msc`` (the first recorded tick by
+    default). With ``speed=None`` the clock only moves on ``advance`` or ``set_time``, for
+    stepping through the ticks in tests and backtests. ``copy_ticks_range`` and ``batches``
+    hand out views of the memory-mapped files, so a consumer that takes whole arrays replays
+    as fast as it can read them. Everything else is passed through to ``terminal``.
+    """
+
+    def __init__(self, store: TickStore, terminal=None, start_msc: Optional[int] = None, speed: Optional[float] = 1.0):
+        self.store = store
+        self.terminal = terminal
+        self.speed = speed
+        if start_msc is None:
+            firsts = [int(ticks["time_msc"][0]) for ticks in map(self.store.query, self.store.symbols()) if len(ticks)]
+            start_msc = min(firsts, default=0)
+        self.start_msc = start_msc
+        self.clock_msc = start_msc
+        self.wall_start = time.monotonic()
+        self.cursors: Dict[str, int] = {}  # symbol -> number of ticks at or before the clock when last read
+
+    def now_msc(self) -> int:
+        if self.speed is None:
+            return self.clock_msc
+        return self.start_msc + int((time.monotonic() - self.wall_start) * self.speed * 1000)
+
+    def advance(self, seconds: float):
+        if self.speed is not None:
+            raise RuntimeError("advance() needs a replay created with speed=None")
+        self.clock_msc += int(seconds * 1000)
+
+    def set_time(self, time_msc: int):
+        if self.speed is not None:
+            raise RuntimeError("set_time() needs a replay created with speed=None")
+        self.clock_msc = int(time_msc)
+        self.cursors.clear()  # The clock may have moved back
+
+    def position(self, symbol: str, time_msc: int) -> int:
+        """Number of ticks of ``symbol`` at or before ``time_msc``."""
+        tick_file = self.store.file(symbol)
+        times = tick_file.ticks()["time_msc"]
+        cursor = min(self.cursors.get(symbol, 0), len(times))
+        end = min(cursor + CURSOR_WINDOW, len(times))
+        # Polled on a clock that only moves forward, the next position is rarely far from the last
+        if (cursor == 0 or times[cursor - 1] <= time_msc) and (end == len(times) or times[end - 1] > time_msc):
+            cursor += int(np.searchsorted(times[cursor:end], time_msc, side="right"))
+        else:
+            cursor = tick_file.locate(time_msc, "right")
+        self.cursors[symbol] = cursor
+        return cursor
+
+    def symbol_info_tick(self, symbol):
+        index = self.position(symbol, self.now_msc()) - 1
+        if index < 0:
+            return None
+        tick = self.store.file(symbol).ticks()[index]
+        return Tick(int(tick["time_msc"]) // 1000, float(tick["bid"]), float(tick["ask"]), float(tick["last"]),
+                    int(tick["volume"]), int(tick["time_msc"]), 0, float(tick["volume"]))
+
+    def copy_ticks_range(self, symbol, date_from, date_to, flags=None) -> np.ndarray:
+        """Recorded ticks of ``symbol`` between two times, as a read-only view of the file."""
+        return self.store.query(symbol, self._to_msc(date_from), self._to_msc(date_to))
+
+    def batches(self, symbol: str, start_msc: Optional[int] = None, end_msc: Optional[int] = None,
+                size: int = 1 << 16) -> Iterator[np.ndarray]:
+        """The recorded ticks in time order, as views of at most ``size`` ticks each."""
+        ticks = self.store.query(symbol, start_msc, end_msc)
+        for start in range(0, len(ticks), size):
+            yield ticks[start:start + size]
+
+    @staticmethod
+    def _to_msc(when) -> int:
+        if isinstance(when, datetime):
+            # Naive datetimes are taken as broker time, as in db.bar_store.to_epoch
+            if when.tzinfo is None:
+                return calendar.timegm(when.timetuple()) * 1000 + when.microsecond // 1000
+            return int(when.timestamp() * 1000)
+        return int(when * 1000)
+
+    def __getattr__(self, name):
+        terminal = self.__dict__.get("terminal")
+        if terminal is None:
+            raise AttributeError(name)
+        return getattr(terminal, name)
@@ -0,0 +1,214 @@
+"""Benchmarks for the candle-to-order hot path, run against the simulated terminal.
+
+    python -m benchmarks.hot_path                       # run, write benchmarks/results.json
+    python -m benchmarks.hot_path --baseline benchmarks/baseline.json
+    python -m benchmarks.hot_path --save-baseline       # refresh the stored baseline
+
+With ``--baseline`` the run exits with status 1 if any benchmark's median per-bar cost
+grew by more than ``--tolerance`` over the baseline.
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from bot.candle_manager import CandleManager
+from bot.candle_scheduler import CandleScheduler
+from bot.risk_management import calculate_lot_size
+from bot.strategy_manager import StrategyManager
+import constants.defs as defs
+from models.indicators import Indicators
+from models.individual_strategy import IndividualStrategy
+from models.scheduling import Scheduling
+from models.signal_decision import SignalDecision
+from strategy.strategy import run_strategy
+
+DEFAULT_OUTPUT = "benchmarks/results.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+SYMBOL_COUNTS = (10, 100, 1000)
+
+def ignore(*args):
+    pass
+
+def measure(func: Callable[[], None], repeat: int, bars: int = 1, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Time ``func`` ``repeat`` times, ``setup`` runs before each call outside the timing."""
+    # Warm up caches and lazy imports
+    if setup is not None:
+        setup()
+    func()
+
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    return {
+        "calls": repeat,
+        "bars": bars,
+        "median_s": median,
+        "mean_s": statistics.fmean(timings),
+        "min_s": min(timings),
+        "p90_s": sorted(timings)[int(0.9 * (repeat - 1))],
+        "per_bar_s": median / bars,
+    }
+
+def create_terminal(**kwargs) -> SimulatedTerminal:
+    return SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)], history_days=5, **kwargs)
+
+def strategy(granularity: str = "M1") -> IndividualStrategy:
+    return IndividualStrategy(granularity=granularity, indicators=Indicators(), risk=0.01, profit_ratio=1)
+
+def bench_configure_df(repeat: int) -> Dict[str, float]:
+    mt5 = MT5(terminal=create_terminal())
+    rates = mt5.query_historic_data("XAUUSD", defs.CANDLE_COUNT, "M1")
+    return measure(lambda: mt5.configure_df(rates), repeat, bars=len(rates))
+
+def bench_fetch_candles(repeat: int) -> Dict[str, float]:
+    """Steady state: one new bar since the previous fetch, as when a candle has just closed."""
+    terminal = create_terminal()
+    mt5 = MT5(terminal=terminal)
+    return measure(lambda: mt5.fetch_candles("XAUUSD", "M1", ignore), repeat, bars=defs.CANDLE_COUNT,
+                   setup=lambda: terminal.advance(60))
+
+def bench_run_strategy(repeat: int) -> Dict[str, float]:
+    mt5 = MT5(terminal=create_terminal())
+    df = mt5.fetch_candles("XAUUSD", "M1", ignore)
+    individual_strategy = strategy()
+    return measure(lambda: run_strategy(df, "XAUUSD", individual_strategy, ignore, ignore), repeat, bars=len(df))
+
+def bench_run_strategy_candles(repeat: int) -> Dict[str, float]:
+    """run_strategy on the zero-copy Candles container, fetch included, no DataFrame built."""
+    terminal = create_terminal()
+    mt5 = MT5(terminal=terminal)
+    individual_strategy = strategy()
+
+    def fetch_and_run():
+        run_strategy(mt5.fetch_candle_data("XAUUSD", "M1", ignore), "XAUUSD", individual_strategy, ignore, ignore)
+
+    return measure(fetch_and_run, repeat, bars=defs.CANDLE_COUNT, setup=lambda: terminal.advance(60))
+
+def bench_generate_signal(repeat: int) -> Dict[str, float]:
+    """StrategyManager.generate_signal, the live path: delta fetch, indicator update, lot sizing."""
+    terminal = create_terminal()
+    strategy_manager = StrategyManager("XAUUSD", strategy(), MT5(terminal=terminal), ignore, ignore)
+    return measure(strategy_manager.generate_signal, repeat, setup=lambda: terminal.advance(60))
+
+def bench_calculate_lot_size(repeat: int) -> Dict[str, float]:
+    mt5 = MT5(terminal=create_terminal())
+    tick = mt5.mt5.symbol_info_tick("XAUUSD")
+    signal_decision = SignalDecision(
+        symbol="XAUUSD", signal=1, order_type="BUY_STOP", current_price=tick.ask, volume=None, risk=0.01,
+        take_profit=tick.ask + 10, stop_loss=tick.ask - 10, signal_timestamp=dt.datetime(2024, 1, 2),
+    )
+    return measure(lambda: calculate_lot_size(mt5, signal_decision, ignore, ignore), repeat)
+
+def bench_update_timings(repeat: int, symbols: int) -> Dict[str, float]:
+    """Every symbol's M1 candle closes between two polls."""
+    terminal = SimulatedTerminal(history_days=2)
+    mt5 = MT5(terminal=terminal)
+    trading_symbols = {f"SYM{i:04d}": [SimpleNamespace(strategy=strategy())] for i in range(symbols)}
+    scheduler = CandleScheduler("Etc/GMT-2", Scheduling(grace_seconds=1))  # The terminal runs at UTC+2
+    candle_manager = CandleManager(mt5, trading_symbols, ignore, scheduler)
+
+    def poll():
+        triggered = candle_manager.update_timings(now=scheduler.broker_to_epoch(terminal.time()) + 1)
+        assert len(triggered) == symbols, f"{len(triggered)} of {symbols} symbols triggered"
+
+    return measure(poll, repeat, bars=symbols, setup=lambda: terminal.advance(60))
+
+def bench_process_candles(repeat: int) -> Dict[str, float]:
+    """Bot.process_candles through to the order reaching the terminal, with the repo's configuration."""
+    from bot.bot import Bot
+
+    terminal = create_terminal()
+    bot = Bot(mt5=MT5(terminal=terminal))
+    symbols = list(bot.trading_symbols)
+
+    def candle_to_order():
+        bot.process_candles(symbols)
+        while bot.current_signals.qsize():
+            for signal_decision, strategy_manager in bot.next_signal_batch():
+                bot.dispatch_signal(signal_decision, strategy_manager)
+
+    try:
+        return measure(candle_to_order, repeat, setup=lambda: terminal.advance(60))
+    finally:
+        bot.stop()
+
+def run_benchmarks(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    repeat = 20 if quick else 200
+    results = {
+        "configure_df": bench_configure_df(repeat),
+        "fetch_candles": bench_fetch_candles(repeat),
+        "run_strategy": bench_run_strategy(repeat),
+        "fetch_and_run_strategy_candles": bench_run_strategy_candles(repeat),
+        "generate_signal": bench_generate_signal(repeat),
+        "calculate_lot_size": bench_calculate_lot_size(repeat * 10),
+        "process_candles_to_order": bench_process_candles(repeat),
+    }
+    for symbols in SYMBOL_COUNTS[:2] if quick else SYMBOL_COUNTS:
+        results[f"update_timings_{symbols}"] = bench_update_timings(max(repeat // 10, 5), symbols)
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> Dict[str, float]:
+    """Benchmarks whose per-bar cost grew by more than ``tolerance`` (0.25 = 25%), with their ratio."""
+    regressions = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["per_bar_s"] / baseline[name]["per_bar_s"]
+        if ratio > 1 + tolerance:
+            regressions[name] = ratio
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations and symbol counts")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.quick)
+    report = {
+        "created": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    for path in [args.output] + ([DEFAULT_BASELINE] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:32} median {result['median_s'] * 1e3:9.3f} ms  per bar {result['per_bar_s'] * 1e6:9.2f} us")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for name, ratio in regressions.items():
+            print(f"REGRESSION {name}: {ratio:.2f}x the baseline per-bar cost")
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
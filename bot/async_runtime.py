@@ -0,0 +1,187 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+class AsyncRuntime:
+    """Runs the loops of a Bot as coroutines on one event loop.
+
+    Candle polling, signal dispatch, entry watching and trade monitoring are tasks, and
+    the blocking calls they make to the terminal, strategy evaluation included, run on a
+    dedicated pool of ``runtime.terminal_workers`` threads. A stop cancels every task at
+    once rather than at the next sleep boundary, a queued signal wakes the dispatcher
+    straight away, and each symbol with pending entries costs one task instead of a thread.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.terminal_executor = ThreadPoolExecutor(max_workers=bot.bot_config.runtime.terminal_workers, thread_name_prefix="terminal")
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.main_task: Optional[asyncio.Task] = None
+        self.signals: Optional[asyncio.Queue] = None
+
+    async def call(self, func: Callable[..., T], *args) -> T:
+        """Run a blocking ``func`` on the terminal pool without holding up the event loop."""
+        return await self.loop.run_in_executor(self.terminal_executor, func, *args)
+
+    def run(self):
+        bot = self.bot
+        bot.async_runtime = self
+        try:
+            asyncio.run(self.main())
+        except asyncio.CancelledError:
+            pass  # stop() cancels the main task
+        except KeyboardInterrupt:
+            bot.log_to_main("run: KeyboardInterrupt received, stopping the bot...")
+        except Exception as e:
+            bot.log_to_error(f"run: Critical error in the event loop: {e}")
+        finally:
+            bot.async_runtime = None
+            bot.stop()
+            self.terminal_executor.shutdown(wait=False, cancel_futures=True)
+            bot.log_to_main("run: Bot has been stopped.")
+
+    def cancel(self):
+        """Cancel every task, safe to call from any thread."""
+        loop, main_task = self.loop, self.main_task
+        if loop is None or main_task is None:
+            return
+        try:
+            loop.call_soon_threadsafe(main_task.cancel)
+        except RuntimeError:
+            pass  # The loop has already closed
+
+    async def main(self):
+        bot = self.bot
+        self.loop = asyncio.get_running_loop()
+        self.main_task = asyncio.current_task()
+        self.signals = asyncio.Queue()
+        if not bot.is_running:
+            return  # Stopped before the loop started
+
+        bot.metrics.gauge("signal_queue_depth", self.signals.qsize)
+        bot.tick_multiplexer.start_poller = self.start_entry_poller
+        bot.start_monitoring()
+
+        tasks = [
+            asyncio.create_task(self.run_candles(), name="run_bot"),
+            asyncio.create_task(self.run_signals(), name="run_signal_executor"),
+            asyncio.create_task(self.run_metrics_summary(), name="metrics_summary"),
+        ]
+        # Keeps the daily P&L ledger current and trails stops, the coordinator's job when sharded
+        if bot.order_queue is None:
+            tasks.append(asyncio.create_task(self.run_trade_manager(), name="run_trade_manager"))
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if bot.is_running and not task.cancelled():
+                    bot.log_to_error(f"run: {task.get_name()} has unexpectedly stopped: {task.exception()!r}")
+        finally:
+            tasks.extend(bot.tick_multiplexer.pollers.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_candles(self):
+        bot = self.bot
+        bot.log_to_main("run_bot: Running bot...")
+        while bot.is_running:
+            try:
+                await self.process_candles(await self.call(bot.poll_triggered))
+                delay = bot.next_poll_delay()
+            except Exception as e:
+                bot.log_to_error(f"run_bot: Critical error in run_bot task: {e}")
+                bot.error_count += 1
+                delay = bot.bot_config.sleep_time
+            await asyncio.sleep(max(delay, 0))
+
+    async def process_candles(self, triggered):
+        bot = self.bot
+        strategy_managers = bot.triggered_strategy_managers(triggered)
+        if not strategy_managers:
+            return
+
+        bot.log_to_main(f"process_candles: triggered {triggered}")
+        # Signals are queued as their evaluation finishes, not when the slowest one does
+        started = {}
+        pending = {self.terminal_executor.submit(bot.evaluate, strategy_manager, started): strategy_manager for strategy_manager in strategy_managers}
+        waiters = {asyncio.wrap_future(future): future for future in pending}
+        while True:
+            wait_for = bot.expire_evaluations(pending, started, bot.bot_config.runtime.terminal_workers)
+            if not pending:
+                break
+            done, _ = await asyncio.wait([waiter for waiter, future in waiters.items() if future in pending],
+                                         timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in done:
+                future = waiters[waiter]
+                strategy_manager = pending.pop(future, None)
+                if strategy_manager is None:
+                    continue  # Expired while the loop was waking up
+                signal_decision = bot.evaluation_result(future, strategy_manager)
+                if signal_decision is not None:
+                    bot.stamp_signal(signal_decision, strategy_manager)
+                    self.signals.put_nowait((signal_decision, strategy_manager))
+
+    async def run_signals(self):
+        bot = self.bot
+        signal_management = bot.bot_config.signal_management
+        order_slots = asyncio.Semaphore(max(signal_management.order_concurrency, 1))
+        bot.log_to_main("run_signal_executor: Running signal executor...")
+
+        while bot.is_running:
+            # Wakes as soon as a signal is queued, then drains the rest of the burst
+            batch = [await self.signals.get()]
+            while len(batch) < signal_management.dispatch_batch_size and not self.signals.empty():
+                batch.append(self.signals.get_nowait())
+
+            if signal_management.trade_processor:
+                for signal_decision, strategy_manager in batch:
+                    bot.log_to_main(f"run_signal_processor: Watching entry of signal for {signal_decision.symbol}")
+                    bot.tick_multiplexer.watch(signal_decision, strategy_manager)
+                continue
+
+            bot.log_to_main(f"run_signal_executor: Attempting entry of {len(batch)} signal(s)")
+            await asyncio.gather(*(self.dispatch(order_slots, signal_decision, strategy_manager) for signal_decision, strategy_manager in batch))
+
+    async def dispatch(self, order_slots: asyncio.Semaphore, signal_decision, strategy_manager):
+        async with order_slots:
+            try:
+                await self.call(self.bot.dispatch_signal, signal_decision, strategy_manager)
+            except Exception as e:
+                self.bot.log_to_error(f"run_signal_executor: Critical error dispatching {signal_decision.symbol}: {e}")
+                self.bot.error_count += 1
+
+    def start_entry_poller(self, symbol: str) -> asyncio.Task:
+        # Called by TickMultiplexer.watch, which only runs on the event loop in this runtime
+        return self.loop.create_task(self.watch_entries(symbol), name=f"ticks-{symbol}")
+
+    async def watch_entries(self, symbol: str):
+        multiplexer = self.bot.tick_multiplexer
+        levels = {}  # granularity -> (bar index, high, low) of the last candle
+        try:
+            while True:
+                watchers = multiplexer.pending(symbol)
+                if not watchers:
+                    return
+                await self.call(multiplexer.poll, symbol, watchers, levels)
+                await asyncio.sleep(multiplexer.tick_interval)
+        except asyncio.CancelledError:
+            multiplexer.drop(symbol)
+            raise
+        except Exception as error:
+            self.bot.log_to_error(f"TickMultiplexer: poller for {symbol} failed: {error}")
+            multiplexer.drop(symbol)
+
+    async def run_trade_manager(self):
+        trade_manager = self.bot.trade_manager
+        trade_manager.log_to_main("run_trade_manager: Running trade manager...")
+        while trade_manager.is_running:
+            await self.call(trade_manager.run_cycle)
+            await asyncio.sleep(trade_manager.monitor_interval)
+
+    async def run_metrics_summary(self):
+        while True:
+            self.bot.log_metrics_summary()
+            await asyncio.sleep(1)
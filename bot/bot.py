@@ -1,42 +1,76 @@
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import json
-from queue import Queue
+from queue import Empty, Queue
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 import datetime as dt 
 import threading
 import logging
-import google.cloud.logging
-from google.cloud.logging.handlers import CloudLoggingHandler
 
 from api.metatrader_api import MT5
-from bot.signal_management import process_signal
+from api.resampler import Resampler
+from api.shared_candles import SharedCandles
+from api.tick_recorder import RecordingTerminal, TickRecorder
+from bot.async_runtime import AsyncRuntime
+from bot.signal_management import process_place_order
+from bot.tick_multiplexer import TickMultiplexer
 from bot.strategy_manager import StrategyManager
-from core.log_wrapper import LogWrapper
+from core.log_wrapper import LogQueue, LogWrapper
+from core.metrics import MetricsServer
+from db.db import DataDB
+from db.tick_store import TickStore
 
 from bot.candle_manager import CandleManager
+from bot.candle_scheduler import CandleScheduler
+from bot.daily_pnl_ledger import DailyPnLLedger
 
+from models.bar_storage import BarStorage
+from models.sharding import Sharding
 from models.bot_config import BotConfig
 from models.error_handling import ErrorHandling
 from models.indicators import Indicators
-from models.logging import CloudLogging, Logging, LoggingConfig
+from models.monitoring import Monitoring
+from models.logging import CloudLogging, Logging, LoggingConfig, QueueLogging
+from models.resampling import Resampling
 from models.risk_management import RiskManagement
+from models.runtime import Runtime
+from models.scheduling import Scheduling
 from models.individual_strategy import IndividualStrategy
 from models.signal_decision import SignalDecision
 from models.signal_managment import SignalManagement
+from models.startup_report import StartupReport
+from models.tick_recording import TickRecording
 from models.strategy_configuration import StrategyConfiguration
 import bot.trade_manager as trade_manager
 
 from models.trade_management import TradeManagement
+from strategy.indicator_state import IndicatorState
 
 from utils.utils import granularity_to_minutes
 
 class Bot:
     ERROR_LOG = "error"
     MAIN_LOG = "main"
-
-    def __init__(self):
-        self.mt5 = MT5()
+    CANDLE_QUEUE_WAIT = 1.0  # Seconds a worker waits on its candle queue before checking whether it was stopped
+
+    def __init__(self, mt5: Optional[MT5] = None, started_at: Optional[float] = None, symbols: Optional[List[str]] = None,
+                 shard: Optional[int] = None, order_queue=None, log_mode: str = "w", shared_candles: Optional[SharedCandles] = None,
+                 candle_queue=None):
+        # Seconds per startup stage up to the first candle poll, started_at is the perf_counter() when the process started
+        self.startup_report = StartupReport()
+        stage_start = time.perf_counter()
+        if started_at is not None:
+            self.startup_report.stages["imports"] = stage_start - started_at
+        self.first_poll_pending = True
+        # In a shard worker process: the symbols it trades, its index, and where it sends orders for the coordinator to place
+        self.symbols = symbols
+        self.shard = shard
+        self.order_queue = order_queue
+        self.log_mode = log_mode  # "a" for a restarted shard worker, so the log of the one before is kept
+        self.shared_candles = shared_candles  # Candles the coordinator publishes, read by the strategy managers of a worker
+        self.candle_queue = candle_queue  # The pairs the coordinator has published a new candle of, polled instead of the terminal
+
+        self.mt5 = mt5 if mt5 is not None else MT5()
 
         # Attempt login
         if not self.mt5.attempt_login():
@@ -44,14 +78,44 @@ class Bot:
             return  # Exit the constructor if login fails
 
         logging.info("Login successful, proceeding with bot initialization.")
+        stage_start = self.startup_report.mark("login", stage_start)
         
         self.load_settings()
+        self.mt5.symbol_cache.spec_ttl = self.risk_management.symbol_spec_ttl
+        self.mt5.symbol_cache.account_ttl = self.risk_management.account_snapshot_ttl
+        # A worker reading shared candles leaves storing them to the coordinator that publishes them
+        if self.bar_storage.enabled and self.mt5.data_db is None and self.shared_candles is None:
+            self.mt5.data_db = DataDB(self.bar_storage.path)
+        if self.resampling.enabled:
+            self.mt5.resampler = Resampler(self.resampling.session_offset_minutes)
+            for symbol, strategy_managers in self.trading_symbols.items():
+                self.mt5.resampler.register(symbol, [strategy_manager.strategy.granularity for strategy_manager in strategy_managers])
+        self.tick_recorder = None
+        if self.tick_recording.enabled:
+            # Every tick read from the terminal, by the entry pollers or the trade manager, is kept for replay
+            self.tick_recorder = TickRecorder(TickStore(self.tick_recording.path), self.tick_recording.buffer_ticks, self.tick_recording.flush_interval)
+            self.mt5.mt5 = RecordingTerminal(self.mt5.mt5, self.tick_recorder)
         self.set_bot_configuration()
         self.set_bot_variables()
+        stage_start = self.startup_report.mark("settings", stage_start)
         self.setup_logs()
-
-        self.candle_manager = CandleManager(self.mt5, self.trading_symbols, self.log_message)
-        self.trade_manager = trade_manager.TradeManager(self.mt5, self.risk_management, self.log_to_main, self.log_message, self.log_to_error)
+        self.startup_report.mark("logs", stage_start)
+
+        # With sharding on, the process started from main.py only coordinates, the workers evaluate the strategies.
+        # It polls the candles of every symbol when it publishes them to the workers, which then poll none themselves
+        self.is_coordinator = self.shard is None and self.bot_config.sharding.processes > 1
+        coordinator_only = self.is_coordinator and not self.bot_config.sharding.shared_candles
+        polled_symbols = {} if coordinator_only or self.candle_queue is not None else self.trading_symbols
+        self.candle_scheduler = CandleScheduler(self.bot_config.timezone, self.bot_config.scheduling)
+        self.candle_manager = CandleManager(self.mt5, polled_symbols, self.log_message, self.candle_scheduler,
+                                            self.bar_storage.backfill_bars, self.startup_report)
+        stage_start = time.perf_counter()
+        self.daily_pnl_ledger = DailyPnLLedger(self.mt5.mt5, self.bot_config.timezone, self.risk_management.daily_pnl_snapshot)
+        self.trade_manager = trade_manager.TradeManager(self.mt5, self.risk_management, self.log_to_main, self.log_message, self.log_to_error,
+                                                        self.trade_management, self.daily_pnl_ledger)
+
+        self.startup_report.mark("managers", stage_start)
+        self.initialized_at = time.perf_counter()
 
         self.log_to_main("Bot started")
         self.log_to_error("Bot started")
@@ -73,29 +137,42 @@ class Bot:
                                     log_file_path=data["logging"]["directories"]["main"]["log_file_path"])
 
             cloud_logging = CloudLogging(enabled=data["logging"]["cloud_logging"]["enabled"])
+            queue_logging = QueueLogging(**data["logging"].get("queue", {}))
 
             self.logging_config = LoggingConfig(
                 directories={
                     "error": error_log,
                     "main": main_log
                 },
-                cloud_logging=cloud_logging
+                cloud_logging=cloud_logging,
+                queue=queue_logging,
+                level=data["logging"].get("level", "DEBUG")
             )
 
             self.trade_management = TradeManagement(**data["trade_management"])
             self.signal_management = SignalManagement(**data["signal_management"])
+            self.scheduling = Scheduling(**data.get("scheduling", {}))
+            self.monitoring = Monitoring(**data.get("monitoring", {}))
+            self.bar_storage = BarStorage(**data.get("bar_storage", {}))
+            self.sharding = Sharding(**data.get("sharding", {}))
+            self.runtime = Runtime(**data.get("runtime", {}))
+            self.resampling = Resampling(**data.get("resampling", {}))
+            self.tick_recording = TickRecording(**data.get("tick_recording", {}))
             
             self.trading_symbols: Dict[str, List[StrategyManager]] = {}
             self.trading_times = set()
+            self.indicator_states: Dict[str, IndicatorState] = {}
             
             for symbol, strategy_configurations in data["tradable_symbols"].items():
+                if self.symbols is not None and symbol not in self.symbols:
+                    continue  # Traded by another shard
                 self.trading_symbols[symbol] = []
                 
                 for strategy_configuration in strategy_configurations:
                     granularities_in_minutes = granularity_to_minutes(strategy_configuration["granularity"])
                     self.trading_times.add(granularities_in_minutes)
                     
-                    indicators = Indicators(**strategy_configuration["indicators"])
+                    indicators = Indicators.from_config(strategy_configuration["indicators"])
                     strategy = IndividualStrategy(indicators=indicators, granularity=strategy_configuration["granularity"], risk=strategy_configuration["risk"], profit_ratio=strategy_configuration["profit_ratio"])
 
                     strategy_manager = StrategyManager(
@@ -103,7 +180,9 @@ class Bot:
                         strategy=strategy,
                         mt5=self.mt5,
                         log_message=self.log_message,
-                        log_to_error=self.log_to_error
+                        log_to_error=self.log_to_error,
+                        indicator_state=self.indicator_states.setdefault(f'{symbol}_{strategy.granularity}', IndicatorState()),
+                        shared_candles=self.shared_candles,
                     )
                     
                     self.trading_symbols[symbol].append(strategy_manager)
@@ -120,7 +199,14 @@ class Bot:
                 logging_config=self.logging_config,
                 error_handling=self.error_handling,
                 trade_management=self.trade_management,
-                signal_management=self.signal_management
+                signal_management=self.signal_management,
+                scheduling=self.scheduling,
+                monitoring=self.monitoring,
+                bar_storage=self.bar_storage,
+                sharding=self.sharding,
+                runtime=self.runtime,
+                resampling=self.resampling,
+                tick_recording=self.tick_recording
             )
             
             self.strategy_configuration = StrategyConfiguration(
@@ -130,21 +216,35 @@ class Bot:
 
     def setup_logs(self):
         cloud_logging_enabled = self.logging_config.cloud_logging.enabled
+        level = logging.getLevelName(self.logging_config.level)
         self.logs: Dict[str, LogWrapper] = {}
         
+        # In queue mode a background writer does all formatting and I/O
+        queue_logging = self.logging_config.queue
+        self.log_queue = None
+        if queue_logging.enabled:
+            self.log_queue = LogQueue(queue_logging.max_size, queue_logging.batch_size, queue_logging.flush_interval)
+            self.metrics.gauge("log_queue_depth", self.log_queue.queue.qsize)
+            self.metrics.gauge("log_records_dropped", lambda: self.log_queue.stats["dropped"])
+        
+        def create_log(name):
+            # With sharding the coordinator and every worker write their own files
+            name = name if self.shard is None else f"{name}_shard{self.shard}"
+            return LogWrapper(name, self.log_mode, cloud_logging_enabled=cloud_logging_enabled, log_queue=self.log_queue, level=level)
+        
        # Create log wrappers for all symbols and components
         for symbol in self.trading_symbols.keys():
-            self.logs[symbol] = LogWrapper(symbol, cloud_logging_enabled=cloud_logging_enabled)
+            self.logs[symbol] = create_log(symbol)
             for symbol_candle in self.trading_symbols[symbol]:
-                self.log_message(f"{symbol_candle}", symbol)
+                self.log_message("%s", symbol, symbol_candle)
         
         for logging_name, logging_attributes in self.logging.items():
             _name = logging_attributes.name
-            self.logs[_name] = LogWrapper(_name, cloud_logging_enabled=cloud_logging_enabled)
+            self.logs[_name] = create_log(_name)
         
         # Specific log for trade processor, if applicable
         if self.bot_config.signal_management.trade_processor:
-            self.logs["trade_processor"] = LogWrapper("trade_processor", cloud_logging_enabled=cloud_logging_enabled)
+            self.logs["trade_processor"] = create_log("trade_processor")
         
         self.log_to_main(
             f"Bot started with {StrategyConfiguration.settings_to_str(self.strategy_configuration)}"
@@ -152,23 +252,46 @@ class Bot:
             
     def set_bot_configuration(self):
         self.is_running = True
+        self.stopped = threading.Event()  # Set by stop(), wakes run_bot from its sleep until the next candle
         self.lock = threading.Lock()
         self.error_count = 0
+        self.overdue_evaluations = 0  # Timed out evaluations still holding a worker
+        self.orders_in_flight = 0  # Orders let through reserve_trade that have not been sent yet
+        self.async_runtime: Optional[AsyncRuntime] = None  # Set while running in the asyncio runtime
         
     def set_bot_variables(self):
         self.current_signals = Queue()
+        self.metrics = self.mt5.metrics
+        self.metrics.gauge("signal_queue_depth", self.current_signals.qsize)
+        self.strategy_executor = ThreadPoolExecutor(
+            max_workers=self.bot_config.signal_management.evaluation_workers,
+            thread_name_prefix="strategy"
+        )
+        order_concurrency = self.bot_config.signal_management.order_concurrency
+        self.order_executor = ThreadPoolExecutor(max_workers=order_concurrency, thread_name_prefix="order") if order_concurrency > 1 else None
+        self.tick_multiplexer = TickMultiplexer(
+            self.mt5,
+            lambda: self.is_running,
+            self.place_watched_entry,
+            self.log_message,
+            self.log_to_error,
+            tick_interval=self.bot_config.signal_management.tick_interval,
+            entry_expiry_bars=self.bot_config.signal_management.entry_expiry_bars,
+        )
 
-    def log_message(self, msg, key):
+    def log_message(self, msg, key, *args):
+        # ``args`` are only %-formatted if the record passes the level, on the writer thread in queue mode
         if key in self.logs:
-            self.logs[key].logger.debug(msg)
+            self.logs[key].logger.debug(msg, *args)
         else:
-            logging.getLogger(key).debug(msg)
+            logging.getLogger(key).debug(msg, *args)
 
-    def log_to_main(self, msg):
-        self.log_message(msg, 'main')
+    def log_to_main(self, msg, *args):
+        self.log_message(msg, 'main', *args)
 
-    def log_to_error(self, msg):
-        self.log_message(msg, 'error')
+    def log_to_error(self, msg, *args):
+        self.metrics.inc("errors")
+        self.log_message(msg, 'error', *args)
         
     def get_next_interval(self):
         now = dt.datetime.now()
@@ -185,115 +308,284 @@ class Bot:
             if len(triggered) > 0:
                 self.log_to_main(f"process_candles: triggered {triggered}")
                 
-                while len(triggered) > 0:
-                    print(triggered)
-                    symbol = triggered.pop(0)
-                    
-                    print(self.trading_symbols[symbol])
-                    
-                    for strategy_manager in self.trading_symbols[symbol]:
-                        print(f'process_candles: strategy_manager {strategy_manager}')
-                        signal_decision = strategy_manager.generate_signal()
-                        
-                        if signal_decision == None or signal_decision.signal == 0:
-                            continue
-                        
-                        print(f'process_candles: signal_decision {signal_decision}')
-                        signal_container = (signal_decision, strategy_manager)
-                        
-                        self.current_signals.put(signal_container)
+                # Fan every (symbol, strategy) out to the pool and queue signals in completion order
+                started = {}
+                pending = {}
+                for strategy_manager in self.triggered_strategy_managers(triggered):
+                    pending[self.strategy_executor.submit(self.evaluate, strategy_manager, started)] = strategy_manager
+                
+                workers = self.bot_config.signal_management.evaluation_workers
+                while True:
+                    wait_for = self.expire_evaluations(pending, started, workers)
+                    if not pending:
+                        break
+                    done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        strategy_manager = pending.pop(future)
+                        signal_decision = self.evaluation_result(future, strategy_manager)
+                        if signal_decision is not None:
+                            self.enqueue_signal(signal_decision, strategy_manager)
         except Exception as error:
             self.log_to_error(f'process_candles: Error {error}')
             raise error
 
+    def evaluate(self, strategy_manager, started: dict):
+        """Run ``generate_signal`` on a pool thread, recording in ``started`` when it began."""
+        started[strategy_manager] = time.monotonic()
+        return strategy_manager.generate_signal()
+
+    def evaluation_result(self, future, strategy_manager) -> Optional[SignalDecision]:
+        """The signal of a finished evaluation, ``None`` when it failed or has nothing to trade."""
+        try:
+            signal_decision = future.result()
+        except Exception as error:
+            self.log_to_error(f'process_candles: generate_signal failed for {strategy_manager.symbol}: {error}')
+            return None
+        
+        if signal_decision == None or signal_decision.signal == 0:
+            return None
+        
+        self.log_to_main("process_candles: signal_decision %s", signal_decision)
+        return signal_decision
+
+    def expire_evaluations(self, pending: dict, started: dict, workers: int) -> float:
+        """Stop waiting on the ``pending`` evaluations past their deadline, returning the seconds to the next one.
+
+        Each evaluation has ``evaluation_timeout`` seconds from when it starts on a worker, time spent
+        queued does not count. A running evaluation cannot be interrupted, so one that overruns keeps its
+        worker until it returns and its late signal is dropped and counted. Evaluations still queued once
+        ``workers`` overrunning ones hold the pool are cancelled, nothing would free a worker for them.
+        """
+        timeout = self.bot_config.signal_management.evaluation_timeout
+        now = time.monotonic()
+        wait_for = timeout
+        for future, strategy_manager in list(pending.items()):
+            start = started.get(strategy_manager)
+            if start is None or future.done():
+                continue
+            remaining = start + timeout - now
+            if remaining > 0:
+                wait_for = min(wait_for, remaining)
+                continue
+            
+            del pending[future]
+            with self.lock:
+                self.overdue_evaluations += 1
+            self.metrics.inc("evaluations_timed_out")
+            self.log_to_error(f'process_candles: generate_signal timed out for {strategy_manager.symbol} {strategy_manager.strategy.granularity}, still running')
+            future.add_done_callback(lambda future, strategy_manager=strategy_manager: self.finish_overdue_evaluation(future, strategy_manager))
+        
+        if self.overdue_evaluations >= workers:
+            for future, strategy_manager in list(pending.items()):
+                if future.cancel():
+                    del pending[future]
+                    self.log_to_error(f'process_candles: generate_signal cancelled for {strategy_manager.symbol} {strategy_manager.strategy.granularity}, every worker is held by a timed out evaluation')
+        return wait_for
+
+    def finish_overdue_evaluation(self, future, strategy_manager):
+        """Count an evaluation that returned after its deadline and drop its signal."""
+        with self.lock:
+            self.overdue_evaluations -= 1
+        self.metrics.inc("evaluations_late")
+        outcome = future.exception() or future.result()
+        self.log_to_error(f'process_candles: generate_signal for {strategy_manager.symbol} {strategy_manager.strategy.granularity} returned after its deadline, dropped {outcome}')
+
+    def triggered_strategy_managers(self, triggered) -> list:
+        """Strategy managers of the ``triggered`` symbols whose own granularity has a new candle.
+
+        A symbol triggers when any of its granularities closes, e.g. every M1 candle, while its
+        H1 strategies only have something new to evaluate once an hour.
+        """
+        triggered_pairs = self.candle_manager.triggered_pairs
+        return [strategy_manager for symbol in triggered for strategy_manager in self.trading_symbols[symbol]
+                if f'{symbol}_{strategy_manager.strategy.granularity}' in triggered_pairs]
+
+    def enqueue_signal(self, signal_decision, strategy_manager):
+        self.stamp_signal(signal_decision, strategy_manager)
+        signal_container = (signal_decision, strategy_manager)
+        self.current_signals.put(signal_container)
+
+    def stamp_signal(self, signal_decision, strategy_manager):
+        signal_decision.enqueued_at = time.time()
+        
+        # Latency from the candle closing to its signal being queued, only for pairs whose candle has just closed
+        symbol_granularity = f'{strategy_manager.symbol}_{strategy_manager.strategy.granularity}'
+        timing = self.candle_manager.timings.get(symbol_granularity)
+        if timing is not None and symbol_granularity in self.candle_manager.triggered_pairs:
+            candle_close = self.candle_scheduler.broker_to_epoch(int(timing.last_time.timestamp()))
+            self.metrics.observe("candle_to_enqueue_seconds", signal_decision.enqueued_at - candle_close)
+
                             
     def run_signal_executor(self):
         self.log_to_main("run_signal_executor: Running signal executor...")
         while self.is_running:
             try:
-                if not self.current_signals.empty():
-                    time.sleep(0.1)  # Prevent tight loop when no signals are present                        
-                    signal_container = self.current_signals.get()
-                    signal_decision, strategy_manager = signal_container
-                    
-                    self.log_to_main("run_signal_executor: Attempting entry of signal")
-
-                    try:
-                        placed_trade = self.mt5.place_order(
-                            signal_decision.order_type,
-                            signal_decision.symbol,
-                            signal_decision.volume,
-                            signal_decision.current_price,
-                            signal_decision.stop_loss,
-                            signal_decision.take_profit,
-                            'Comment',
-                            log_message=self.log_message,
-                            log_to_error=self.log_to_error
-                        )
-                        
-                        if placed_trade is None:
-                            raise ValueError(f"Failed to place order for {signal_decision.symbol}")
-
-                        self.log_message(f"run_signal_executor: Successfully placed {signal_decision.symbol}", signal_decision.symbol)
-                        self.log_to_main(f"run_signal_executor: Successfully placed {signal_decision.symbol} for {signal_decision.symbol}")
-
-                    except ConnectionError as ce:
-                        self.log_to_error(f"run_signal_executor: Connection error while placing order for {signal_decision.symbol}: {ce}")
-
-                    except ValueError as ve:
-                        self.log_to_error(f"run_signal_executor: Value error (order issue) for {signal_decision.symbol}: {ve}")
-
-                    except Exception as e:
-                        self.log_to_error(f"run_signal_executor: Unexpected error while processing signal for {signal_decision.symbol}: {e}")
-                        self.error_count += 1
-                        raise e
-                        
+                batch = self.next_signal_batch()
+                if len(batch) == 0:
+                    continue
+
+                self.log_to_main(f"run_signal_executor: Attempting entry of {len(batch)} signal(s)")
+                if self.order_executor is not None and len(batch) > 1:
+                    list(self.order_executor.map(lambda signal_container: self.dispatch_signal(*signal_container), batch))
+                else:
+                    for signal_decision, strategy_manager in batch:
+                        self.dispatch_signal(signal_decision, strategy_manager)
             except Exception as e:
                 self.log_to_error(f"run_signal_executor: Critical error in run_signal_executor thread: {e}")
                 self.error_count += 1
-            finally:            
-                time.sleep(self.bot_config.sleep_time)
+
+    def next_signal_batch(self):
+        """Block until a signal is queued, then drain whatever else arrived up to dispatch_batch_size."""
+        try:
+            signal_container = self.current_signals.get(timeout=self.bot_config.sleep_time)
+        except Empty:
+            return []
+
+        batch = []
+        while signal_container is not None:
+            batch.append(signal_container)
+            if len(batch) >= self.bot_config.signal_management.dispatch_batch_size:
+                break
+            try:
+                signal_container = self.current_signals.get_nowait()
+            except Empty:
+                break
+
+        return batch
+
+    def dispatch_signal(self, signal_decision, strategy_manager):
+        if signal_decision.enqueued_at is not None:
+            self.metrics.observe("signal_queue_wait_seconds", time.time() - signal_decision.enqueued_at)
+
+        if self.order_queue is not None:
+            self.forward_signal(signal_decision, strategy_manager.strategy.granularity)
+            return
+
+        if not self.reserve_trade(signal_decision.symbol, "run_signal_executor"):
+            return
+        try:
+            self.place_signal(signal_decision, strategy_manager.strategy.granularity)
+        finally:
+            self.release_trade()
+
+    def reserve_trade(self, symbol: str, caller: str) -> bool:
+        """Whether an order for ``symbol`` is within the daily loss and concurrent trade limits.
+
+        A True result holds a slot of max_concurrent_trades until release_trade, so orders placed
+        in parallel by the order pool cannot together go over the limit.
+        """
+        if not self.trade_manager.track_daily_loss():
+            self.log_message(f"{caller}: Max daily loss reached, skipping {symbol}", symbol)
+            return False
+        with self.lock:
+            if not self.trade_manager.has_trade_capacity(self.orders_in_flight):
+                self.log_message(f"{caller}: Max concurrent trades reached, skipping {symbol}", symbol)
+                return False
+            self.orders_in_flight += 1
+        return True
+
+    def release_trade(self):
+        """Free the slot of an order reserve_trade let through, once it has been sent."""
+        with self.lock:
+            self.orders_in_flight -= 1
+
+    def forward_signal(self, signal_decision, granularity):
+        """Shard workers hand their orders to the coordinator, which owns the risk limits and order placement."""
+        self.order_queue.put((signal_decision, granularity, time.time()))
+        self.log_message(f"forward_signal: Sent {signal_decision.symbol} to the coordinator", signal_decision.symbol)
+
+    def place_signal(self, signal_decision, granularity):
+        try:
+            placed_trade = self.mt5.place_order(
+                signal_decision.order_type,
+                signal_decision.symbol,
+                signal_decision.volume,
+                signal_decision.current_price,
+                signal_decision.stop_loss,
+                signal_decision.take_profit,
+                f'{signal_decision.symbol}_{granularity}',  # Read back by the daily P&L ledger
+                log_message=self.log_message,
+                log_to_error=self.log_to_error
+            )
+            
+            if placed_trade is None:
+                raise ValueError(f"Failed to place order for {signal_decision.symbol}")
+
+            self.log_message(f"run_signal_executor: Successfully placed {signal_decision.symbol}", signal_decision.symbol)
+            self.log_to_main(f"run_signal_executor: Successfully placed {signal_decision.symbol} for {signal_decision.symbol}")
+
+        except ConnectionError as ce:
+            self.log_to_error(f"run_signal_executor: Connection error while placing order for {signal_decision.symbol}: {ce}")
+
+        except ValueError as ve:
+            self.log_to_error(f"run_signal_executor: Value error (order issue) for {signal_decision.symbol}: {ve}")
+
+        except Exception as e:
+            self.log_to_error(f"run_signal_executor: Unexpected error while processing signal for {signal_decision.symbol}: {e}")
+            self.error_count += 1
     
     def run_signal_processor(self):
         self.log_message("run_signal_processor: Running trade processor...", "trade_processor")
 
-        with ThreadPoolExecutor() as executor:
-            while self.is_running:
-                try:
-                    if not self.current_signals.empty():
-                        time.sleep(0.1)  # Prevent tight loop when no signals are present
-                        
-                        while not self.current_signals.empty():
-                            signal_container = self.current_signals.get()
-                            signal_decision, strategy_manager = signal_container
-
-                            self.log_to_main(f"run_signal_executor: Submitting entry of signal for {signal_decision.symbol}")
-
-                            # Submit the task to the thread pool with unpacked parameters
-                            executor.submit(
-                                process_signal,
-                                self.is_running,
-                                signal_decision,
-                                self.mt5,
-                                strategy_manager,
-                                self.log_message,
-                                self.log_to_error
-                            )
-
-                except Exception as e:
-                    self.log_to_error(f"Error in run_signal_processor loop: {e}")
+        while self.is_running:
+            try:
+                signal_container = self.current_signals.get(timeout=self.bot_config.sleep_time)
+            except Empty:
+                continue
+            if signal_container is None:
+                continue
+            signal_decision, strategy_manager = signal_container
+
+            try:
+                self.log_to_main(f"run_signal_processor: Watching entry of signal for {signal_decision.symbol}")
+                self.tick_multiplexer.watch(signal_decision, strategy_manager)
+            except Exception as e:
+                self.log_to_error(f"Error in run_signal_processor loop: {e}")
+
+    def place_watched_entry(self, watcher):
+        if self.order_queue is not None:
+            self.forward_signal(watcher.signal_decision, watcher.granularity)
+            return
+        if not self.reserve_trade(watcher.symbol, "place_watched_entry"):
+            return
+        try:
+            process_place_order(watcher.signal_decision, self.mt5, self.log_message, self.log_to_error, f'{watcher.symbol}_{watcher.granularity}')
+        finally:
+            self.release_trade()
+
+    def poll_candles(self) -> float:
+        """Processes the candles that have closed, returns the seconds until the next one is due."""
+        self.process_candles(self.poll_triggered())
+        return self.next_poll_delay()
+
+    def poll_triggered(self) -> List[str]:
+        """Symbols with a new candle, from the terminal or, in a worker given a candle queue, as published by the coordinator."""
+        if self.candle_queue is None:
+            return self.candle_manager.update_timings()
+        try:
+            closed = self.candle_queue.get(timeout=self.CANDLE_QUEUE_WAIT)
+        except Empty:
+            closed = {}
+        return self.candle_manager.apply_triggered(closed)
+
+    def next_poll_delay(self) -> float:
+        """Seconds until the next candle poll, logs the startup report after the first one."""
+        if self.first_poll_pending:
+            self.first_poll_pending = False
+            self.startup_report.mark("first_poll", self.initialized_at)
+            self.log_to_main("run_bot: %s", self.startup_report)
+
+        if self.candle_queue is not None:
+            return 0.0  # Waiting on the queue paces the polls
+        # Sleep until the next candle close that any (symbol, granularity) is waiting for
+        next_poll_time = self.candle_manager.next_poll_time()
+        return next_poll_time - time.time() if next_poll_time is not None else self.bot_config.sleep_time
 
     def run_bot(self):
         self.log_to_main("run_bot: Running bot...")
         while self.is_running:
             try:
-                print("run_bot: executing process_candles()")
-                self.process_candles(self.candle_manager.update_timings())
-                next_interval = self.get_next_interval()
-                sleep_duration = (next_interval - dt.datetime.now()).total_seconds()
-                print(f"run_bot: complete process_candles(), time_duration {sleep_duration}")
-                
-                time.sleep(sleep_duration)
+                self.stopped.wait(max(self.poll_candles(), 0))
             except Exception as e:
                 self.log_to_error(f"run_bot: Critical error in run_bot thread: {e}")
                 self.error_count += 1
@@ -305,11 +597,48 @@ class Bot:
         # self.trade_manager.close_open_trades()
                 
         self.is_running = False
+        self.stopped.set()
+        if self.async_runtime is not None:
+            self.async_runtime.cancel()  # Safe from any thread, the coroutines stop at their next await
+        self.trade_manager.is_running = False
+        self.current_signals.put(None)  # Wakes the signal executor blocked on the queue
+        self.strategy_executor.shutdown(wait=False, cancel_futures=True)
+        if self.order_executor is not None:
+            self.order_executor.shutdown(wait=False)
+        if self.tick_recorder is not None:
+            self.tick_recorder.flush()
+        
+        if getattr(self, "metrics_server", None) is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
         
         self.log_to_main("stop: Bot has been stopped.")
+        if self.log_queue is not None:
+            self.log_queue.flush()
+
+    def start_monitoring(self):
+        monitoring = self.bot_config.monitoring
+        self.metrics_server = None
+        if monitoring.metrics_port and self.shard is None:  # Shards would all bind the same port
+            self.metrics_server = MetricsServer(self.metrics, monitoring.metrics_host, monitoring.metrics_port)
+            self.metrics_server.start()
+            self.log_to_main(f"start_monitoring: Serving metrics on http://{monitoring.metrics_host}:{self.metrics_server.port}/metrics")
+        self.next_summary_time = time.time() + monitoring.summary_interval
+
+    def log_metrics_summary(self):
+        summary_interval = self.bot_config.monitoring.summary_interval
+        if summary_interval and time.time() >= self.next_summary_time:
+            self.log_to_main("metrics: %s", self.metrics.summary())
+            self.next_summary_time = time.time() + summary_interval
 
     def run(self):
+        if self.bot_config.runtime.mode == "asyncio":
+            AsyncRuntime(self).run()
+            return
+
+        run_bot_thread = run_signal_executor = None
         try: 
+            self.start_monitoring()
             run_bot_thread = threading.Thread(target=self.run_bot, name="run_bot_thread")
             run_bot_thread.start()
             
@@ -320,6 +649,11 @@ class Bot:
                 
             run_signal_executor.start()
             
+            # Keeps the daily P&L ledger current and trails stops when trailing_stop is set, the coordinator's job when sharded
+            if self.order_queue is None:
+                run_trade_manager_thread = threading.Thread(target=self.trade_manager.run_trade_manager, name="run_trade_manager_thread", daemon=True)
+                run_trade_manager_thread.start()
+            
             while self.is_running:
                 if not run_bot_thread.is_alive():
                     self.log_to_error("run: Bot thread has unexpectedly stopped.")
@@ -329,6 +663,7 @@ class Bot:
                     self.log_to_error("run: Signal executor thread has unexpectedly stopped.")
                     break 
                 
+                self.log_metrics_summary()
                 time.sleep(1)
         except KeyboardInterrupt:
             self.log_to_main("run: KeyboardInterrupt received, stopping the bot...")
@@ -338,6 +673,8 @@ class Bot:
             self.stop()
         finally:
             self.stop()
-            run_bot_thread.join()
-            run_signal_executor.join()
+            # Only the threads started before a failure need joining
+            for thread in (run_bot_thread, run_signal_executor):
+                if thread is not None and thread.is_alive():
+                    thread.join()
             self.log_to_main("run: Bot has been stopped.")
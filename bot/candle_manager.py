@@ -1,71 +1,184 @@
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Dict, List, Optional
 from api.metatrader_api import MT5
+from api.resampler import bucket_times
+from bot.candle_scheduler import CandleScheduler
 from bot.strategy_manager import StrategyManager
 from models.candle_timing import CandleTiming
 import constants.defs as defs
 from models.individual_strategy import IndividualStrategy
+from models.startup_report import StartupReport
+from utils.utils import granularity_to_minutes
 import datetime as dt
 
 class CandleManager:
-    def __init__(self, mt5: MT5, trading_symbols: Dict[str, List[StrategyManager]], log_message):
+    def __init__(self, mt5: MT5, trading_symbols: Dict[str, List[StrategyManager]], log_message, scheduler: Optional[CandleScheduler] = None,
+                 backfill_bars: int = defs.CANDLE_COUNT, startup_report: Optional[StartupReport] = None):
         self.mt5 = mt5
         self.trading_symbols = trading_symbols
         self.log_message = log_message
+        self.scheduler = scheduler if scheduler is not None else CandleScheduler()
+        self.backfill_bars = backfill_bars
+        self.startup_report = startup_report if startup_report is not None else StartupReport()
+        self.triggered_pairs = set()  # "<symbol>_<granularity>" of the pairs with a new candle in the latest poll
 
         self.create_timings()
         
     def create_timings(self):
+        """Warm start: loads the lookback history of every distinct (symbol, granularity) concurrently.
+
+        Strategies sharing a pair share one load. Each load fills the candle cache, so the first
+        evaluation only fetches the bars since, and stores the closed candles. The time spent in
+        each stage is kept in ``startup_report``.
+        """
         self.timings: Dict[str, CandleTiming] = {}
         self.symbols_list: List[tuple[str, str]] = []
-        
+        self.startup_report.workers = self.scheduler.scheduling.warm_start_workers
+        start = time.perf_counter()
+
+        seen = set()
         for symbol, strategy_managers in self.trading_symbols.items():
             for strategy_manager in strategy_managers:
-                strategy = strategy_manager.strategy
-                granularity = strategy.granularity
-                
-                name = f'{symbol}_{granularity}'
-                current_candle = self.mt5.query_historic_data(symbol, 1, granularity=granularity)
-                timestamp = current_candle[0][0]
-            
-                datetime = dt.datetime.fromtimestamp(timestamp)
-                
-                self.timings[name] = CandleTiming(
-                    last_time=datetime)
-
-                timing_var = (symbol, granularity)
+                timing_var = (symbol, strategy_manager.strategy.granularity)
+                if timing_var in seen:
+                    self.startup_report.duplicate_pairs += 1
+                    continue
+                seen.add(timing_var)
                 self.symbols_list.append(timing_var)
+        self.startup_report.pairs = len(self.symbols_list)
+        start = self.startup_report.mark("dedupe", start)
 
-        for pg, t in self.timings.items():
-            symbol, granularity = pg.rsplit('_', 1)
+        with ThreadPoolExecutor(max_workers=max(self.startup_report.workers, 1), thread_name_prefix="warm_start") as executor:
+            loaded = list(executor.map(lambda pair: self.warm_start(*pair), self.symbols_list))
+        start = self.startup_report.mark("load", start)
 
-            self.log_message(f"CandleManager() init last_candle:{t}", symbol)
+        for (symbol, granularity), (rates, seconds) in zip(self.symbols_list, loaded):
+            name = f'{symbol}_{granularity}'
+            if seconds > self.startup_report.slowest_pair_seconds:
+                self.startup_report.slowest_pair, self.startup_report.slowest_pair_seconds = name, seconds
+            if rates is None:
+                self.startup_report.failed_pairs.append(name)
+                continue
+
+            timestamp = int(rates["time"][-1])
+            self.timings[name] = CandleTiming(last_time=dt.datetime.fromtimestamp(timestamp))
+            if self.mt5.resampler is None or self.mt5.resampler.base_of(symbol, granularity) is None:
+                self.scheduler.schedule(symbol, granularity, timestamp)  # Resampled pairs close with their base pair
+            self.log_message(f"CandleManager() init last_candle:{self.timings[name]}", symbol)
+        self.startup_report.mark("schedule", start)
+
+        if self.startup_report.failed_pairs:
+            raise ValueError(f"CandleManager() warm start failed for {', '.join(self.startup_report.failed_pairs)}")
+
+    def warm_start(self, symbol: str, granularity: str):
+        """(rates, seconds) for one pair, rates is None when the terminal has no candles for it."""
+        start = time.perf_counter()
+        try:
+            rates = self.mt5.fetch_rates(symbol, granularity, count=StrategyManager.FETCH_COUNT)
+        except Exception as error:
+            self.log_message(f"CandleManager() warm start failed for {symbol} {granularity}: {error}", symbol)
+            return None, time.perf_counter() - start
+
+        if self.mt5.data_db is not None:
+            try:
+                self.mt5.data_db.write_candles(symbol, granularity, rates[:-1])  # The last candle is still forming
+            except Exception as error:
+                self.log_message(f"CandleManager() failed to store candles for {symbol} {granularity}: {error}", symbol)
+        return rates, time.perf_counter() - start
             
-    def update_timings(self):
+    def update_timings(self, now: Optional[float] = None):
+        """Polls the (symbol, granularity) pairs whose candle is due to close and returns the symbols with a new candle."""
+        with self.mt5.metrics.timed("update_timings_seconds"):
+            return self.poll_due(time.time() if now is None else now)
+
+    def poll_due(self, now: float) -> List[str]:
         triggered: List[str] = []
+        self.triggered_pairs = set()
 
-        for symbol, granularity in self.symbols_list:
+        for symbol, granularity in self.scheduler.due(now):
+            symbol_granularity = f'{symbol}_{granularity}'
             current_candle = self.mt5.query_historic_data(symbol, 1, granularity=granularity)
-            timestamp = current_candle[0][0] if current_candle else None
-            current_time = dt.datetime.fromtimestamp(timestamp)
                                 
-            if current_time is None:
+            if current_candle is None or len(current_candle) == 0:
                 self.log_message(f"Unable to get candle for {symbol}. Retrying...", symbol)
-                self.timings[f'{symbol}_{granularity}'].tries += 1
-                if self.timings[f'{symbol}_{granularity}'].tries > defs.MAX_RETRIES:
+                self.mt5.metrics.inc("candle_retries")
+                self.timings[symbol_granularity].tries += 1
+                if self.timings[symbol_granularity].tries > defs.MAX_RETRIES:
                     self.log_message(f"Max retries exceeded for {symbol}. Skipping update.", symbol)
+                self.scheduler.retry(symbol, granularity, self.timings[symbol_granularity].tries, now)
                 continue
 
-            # Reset retries on success
-            self.timings[f'{symbol}_{granularity}'].tries = 0
-            symbol_granularity = f'{symbol}_{granularity}'
+            timestamp = int(current_candle[0][0])
+            current_time = dt.datetime.fromtimestamp(timestamp)
             self.timings[symbol_granularity].is_ready = False
 
             if current_time > self.timings[symbol_granularity].last_time:
+                # Reset retries on success
+                self.timings[symbol_granularity].tries = 0
                 self.timings[symbol_granularity].is_ready = True
                 self.timings[symbol_granularity].last_time = current_time
                 self.log_message(
                     f"CandleManager() new candle:{self.timings[symbol_granularity]}", symbol)
                 triggered.append(symbol)
+                self.triggered_pairs.add(symbol_granularity)
+                self.scheduler.schedule(symbol, granularity, timestamp)
+                self.store_candles(symbol, granularity, timestamp)
+                self.close_resampled(symbol, granularity, timestamp)
+            else:
+                # Closed but the next candle has not opened yet, e.g. a quiet market or a holiday
+                self.mt5.metrics.inc("candle_retries")
+                self.timings[symbol_granularity].tries += 1
+                self.scheduler.retry(symbol, granularity, self.timings[symbol_granularity].tries, now)
 
         return triggered
 
+    def apply_triggered(self, closed: Dict[str, dt.datetime]) -> List[str]:
+        """Takes the pairs another process polled (``"<symbol>_<granularity>"`` -> new candle open time), returns their symbols."""
+        self.triggered_pairs = set(closed)
+        for symbol_granularity, last_time in closed.items():
+            timing = self.timings.setdefault(symbol_granularity, CandleTiming(last_time))
+            timing.last_time = last_time
+            timing.is_ready = True
+        return list(dict.fromkeys(symbol_granularity.rsplit("_", 1)[0] for symbol_granularity in closed))
+
+    def close_resampled(self, symbol: str, granularity: str, timestamp: int):
+        """Marks the candles built from ``granularity`` that closed as the base candle at ``timestamp`` opened."""
+        resampler = self.mt5.resampler
+        if resampler is None or resampler.bases.get(symbol) != granularity:
+            return
+
+        for resampled in resampler.derived[symbol]:
+            timing = self.timings.get(f'{symbol}_{resampled}')
+            if timing is None:
+                continue
+            opened = dt.datetime.fromtimestamp(int(bucket_times(timestamp, granularity_to_minutes(resampled) * 60, resampler.offset)))
+            if opened > timing.last_time:
+                timing.tries = 0
+                timing.is_ready = True
+                timing.last_time = opened
+                self.triggered_pairs.add(f'{symbol}_{resampled}')
+                self.log_message(f"CandleManager() new resampled candle:{timing}", symbol)
+
+    def store_candles(self, symbol: str, granularity: str, timestamp: int):
+        """Writes the candles closed before the one opened at ``timestamp`` that the store does not have yet."""
+        data_db = self.mt5.data_db
+        if data_db is None:
+            return
+
+        last_time = data_db.last_candle_time(symbol, granularity)
+        if last_time is not None and last_time >= timestamp:
+            return
+        # Candles from the last stored one to the forming one, across a weekend this also re-reads some already stored
+        count = self.backfill_bars if last_time is None else (timestamp - last_time) // (granularity_to_minutes(granularity) * 60) + 1
+        try:
+            with self.mt5.metrics.timed("store_candles_seconds"):
+                rates = self.mt5.query_historic_data(symbol, min(count, self.backfill_bars), granularity=granularity)
+                if rates is not None and len(rates) > 1:
+                    data_db.write_candles(symbol, granularity, rates[rates["time"] < timestamp])
+        except Exception as error:
+            self.log_message(f"CandleManager() failed to store candles for {symbol} {granularity}: {error}", symbol)
+
+    def next_poll_time(self) -> Optional[float]:
+        """Epoch time of the next candle close to poll for."""
+        return self.scheduler.next_deadline()
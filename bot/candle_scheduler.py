@@ -0,0 +1,72 @@
+import datetime as dt
+import heapq
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+
+import pytz
+
+from models.scheduling import Scheduling
+from utils.utils import granularity_to_minutes
+
+EPOCH = dt.datetime(1970, 1, 1)
+
+class CandleScheduler:
+    """Min-heap of the next candle close per (symbol, granularity).
+
+    Candle times from the terminal are broker wall-clock times written as epoch seconds,
+    deadlines are real epoch seconds, so every close is shifted by the broker timezone
+    offset at that moment. Closes that fall on a weekend move to the Monday open.
+    """
+
+    def __init__(self, timezone: str = "UTC", scheduling: Optional[Scheduling] = None):
+        self.timezone = pytz.timezone(timezone)
+        self.scheduling = scheduling if scheduling is not None else Scheduling()
+        self.heap: List[Tuple[float, str, str]] = []
+        self.scheduled: Set[Tuple[str, str]] = set()
+        self.lock = threading.Lock()
+
+    def broker_to_epoch(self, broker_time: int) -> float:
+        offset = self.timezone.utcoffset(EPOCH + dt.timedelta(seconds=broker_time))
+        return broker_time - offset.total_seconds()
+
+    def next_close(self, granularity: str, candle_time: int) -> int:
+        """Broker time at which the candle opened at ``candle_time`` closes, skipping weekends."""
+        close_time = candle_time + granularity_to_minutes(granularity) * 60
+        if self.scheduling.skip_weekends:
+            weekday = (EPOCH + dt.timedelta(seconds=close_time)).weekday()
+            if weekday >= 5:
+                close_time = (close_time // 86400 + 7 - weekday) * 86400
+        return close_time
+
+    def schedule(self, symbol: str, granularity: str, candle_time: int):
+        """Schedule a poll for just after the candle opened at ``candle_time`` closes."""
+        deadline = self.broker_to_epoch(self.next_close(granularity, candle_time)) + self.scheduling.grace_seconds
+        self.push(symbol, granularity, deadline)
+
+    def retry(self, symbol: str, granularity: str, tries: int, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        delay = min(self.scheduling.retry_seconds * 2 ** max(tries - 1, 0), self.scheduling.max_retry_seconds)
+        self.push(symbol, granularity, now + delay)
+
+    def push(self, symbol: str, granularity: str, deadline: float):
+        with self.lock:
+            if (symbol, granularity) in self.scheduled:
+                return
+            self.scheduled.add((symbol, granularity))
+            heapq.heappush(self.heap, (deadline, symbol, granularity))
+
+    def due(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """Pop every (symbol, granularity) whose deadline has passed."""
+        now = time.time() if now is None else now
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                _, symbol, granularity = heapq.heappop(self.heap)
+                self.scheduled.discard((symbol, granularity))
+                due.append((symbol, granularity))
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        with self.lock:
+            return self.heap[0][0] if self.heap else None
@@ -0,0 +1,152 @@
+import calendar
+import datetime as dt
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import pytz
+
+UNKNOWN_STRATEGY = "unknown"
+
+class DailyPnLLedger:
+    """Running realized and floating P&L for the current broker day.
+
+    Each ``update`` pulls only the deals after the last processed ticket and one
+    positions snapshot, so its cost follows new activity rather than the day's history,
+    and ``within_limit`` is O(1). Deals are attributed to the strategy named in the comment
+    of the order that opened their position. The day starts at midnight in the broker
+    ``timezone``, where the start-of-day balance is taken and the totals are reset.
+    """
+
+    def __init__(self, mt5, timezone: str = "UTC", snapshot_path: Optional[str] = None):
+        self.mt5 = mt5
+        self.timezone = pytz.timezone(timezone)
+        self.snapshot_path = snapshot_path
+        self.lock = threading.Lock()
+        self.day: Optional[dt.date] = None
+        self.reset(None)
+        self.load_snapshot()
+
+    def reset(self, day: Optional[dt.date], start_balance: float = 0.0):
+        self.day = day
+        self.start_balance = start_balance
+        self.last_ticket = 0
+        self.last_deal_time = 0
+        self.realized = 0.0
+        self.realized_by_symbol: Dict[str, float] = {}
+        self.realized_by_strategy: Dict[str, float] = {}
+        self.position_strategies: Dict[int, str] = {}
+        self.floating = 0.0
+        self.floating_by_symbol: Dict[str, float] = {}
+        self.floating_by_strategy: Dict[str, float] = {}
+
+    def broker_now(self) -> int:
+        """Broker wall clock as epoch-like seconds, the way the terminal stamps deals."""
+        return calendar.timegm(dt.datetime.now(self.timezone).timetuple())
+
+    @staticmethod
+    def day_of(broker_time: int) -> dt.date:
+        return dt.datetime.fromtimestamp(broker_time, tz=dt.timezone.utc).date()
+
+    def update(self, now: Optional[int] = None) -> float:
+        """Fold in new deals and the floating P&L of open positions, returns the day's total P&L."""
+        now = self.broker_now() if now is None else now
+        today = self.day_of(now)
+
+        with self.lock:
+            if today != self.day:
+                account_info = self.mt5.account_info()
+                self.reset(today, account_info.balance if account_info is not None else 0.0)
+
+            # Deals sharing the last processed second come back again and are dropped by ticket
+            date_from = max(calendar.timegm(today.timetuple()), self.last_deal_time)
+            deals = self.mt5.history_deals_get(date_from, now + 1) or ()
+            new_deals = [deal for deal in deals if deal.ticket > self.last_ticket]
+            for deal in sorted(new_deals, key=lambda deal: deal.ticket):
+                self.add_deal(deal)
+
+            positions = self.mt5.positions_get() or ()
+            self.floating_by_symbol = {}
+            self.floating_by_strategy = {}
+            for position in positions:
+                strategy = self.strategy_of(position)
+                self.floating_by_symbol[position.symbol] = self.floating_by_symbol.get(position.symbol, 0.0) + position.profit
+                self.floating_by_strategy[strategy] = self.floating_by_strategy.get(strategy, 0.0) + position.profit
+            self.floating = sum(self.floating_by_symbol.values())
+
+            if new_deals:
+                self.save_snapshot()
+
+            return self.realized + self.floating
+
+    def strategy_of(self, position) -> str:
+        """Strategy of an open position, from its opening deal or else the comment it carries."""
+        strategy = self.position_strategies.get(getattr(position, "identifier", position.ticket))
+        return strategy or getattr(position, "comment", "") or UNKNOWN_STRATEGY
+
+    def add_deal(self, deal):
+        self.last_ticket = deal.ticket
+        self.last_deal_time = max(self.last_deal_time, deal.time)
+        if deal.type not in (self.mt5.DEAL_TYPE_BUY, self.mt5.DEAL_TYPE_SELL):
+            return  # Deposits, withdrawals and other balance operations are not trading P&L
+
+        if deal.entry == self.mt5.DEAL_ENTRY_IN:
+            self.position_strategies[deal.position_id] = deal.comment or UNKNOWN_STRATEGY
+        strategy = self.position_strategies.get(deal.position_id, UNKNOWN_STRATEGY)
+        if deal.entry != self.mt5.DEAL_ENTRY_IN:
+            self.position_strategies.pop(deal.position_id, None)
+
+        pnl = deal.profit + getattr(deal, "commission", 0.0) + getattr(deal, "swap", 0.0) + getattr(deal, "fee", 0.0)
+        self.realized += pnl
+        self.realized_by_symbol[deal.symbol] = self.realized_by_symbol.get(deal.symbol, 0.0) + pnl
+        self.realized_by_strategy[strategy] = self.realized_by_strategy.get(strategy, 0.0) + pnl
+
+    def within_limit(self, max_daily_loss_percentage: float) -> bool:
+        """False once the day's realized plus floating loss reaches the share of the start-of-day balance."""
+        if self.day is None:
+            return True  # Nothing is known before the first update
+        return -(self.realized + self.floating) < max_daily_loss_percentage * self.start_balance
+
+    def to_dict(self) -> dict:
+        return {
+            "day": self.day.isoformat() if self.day is not None else None,
+            "start_balance": self.start_balance,
+            "last_ticket": self.last_ticket,
+            "last_deal_time": self.last_deal_time,
+            "realized": self.realized,
+            "realized_by_symbol": self.realized_by_symbol,
+            "realized_by_strategy": self.realized_by_strategy,
+            "position_strategies": {str(position): strategy for position, strategy in self.position_strategies.items()},
+        }
+
+    def save_snapshot(self):
+        if self.snapshot_path is None:
+            return
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        temporary_path = f"{self.snapshot_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temporary_path, self.snapshot_path)  # Never leave a half written snapshot
+
+    def load_snapshot(self):
+        """Resume today's totals from the snapshot, a snapshot from another day is ignored."""
+        if self.snapshot_path is None or not os.path.exists(self.snapshot_path):
+            return
+        with open(self.snapshot_path) as f:
+            snapshot = json.load(f)
+        if snapshot.get("day") is None:
+            return
+
+        self.day = dt.date.fromisoformat(snapshot["day"])
+        self.start_balance = snapshot["start_balance"]
+        self.last_ticket = snapshot["last_ticket"]
+        self.last_deal_time = snapshot["last_deal_time"]
+        self.realized = snapshot["realized"]
+        self.realized_by_symbol = snapshot["realized_by_symbol"]
+        self.realized_by_strategy = snapshot["realized_by_strategy"]
+        self.position_strategies = {int(position): strategy for position, strategy in snapshot["position_strategies"].items()}
+
+    def __repr__(self):
+        return (f"DailyPnLLedger(day={self.day}, realized={self.realized:.2f}, floating={self.floating:.2f}, "
+                f"last_ticket={self.last_ticket})")
@@ -1,36 +1,51 @@
+from typing import List, Tuple
+
+import numpy as np
+
 from api.metatrader_api import MT5
 import constants.defs as defs
-import decimal
 
 from models.signal_decision import SignalDecision
 
 def calculate_lot_size(mt5: MT5, signal_decision: SignalDecision, log_message: callable, log_to_error: callable):
     log_message('calculate_lot_size:', signal_decision.symbol)
     
-    symbol_info = mt5.mt5.symbol_info(signal_decision.symbol)
-    
-    pip_value = symbol_info.trade_tick_value
-    volume_step = symbol_info.volume_step
+    # Contract fields and their decimal places come precomputed from the symbol cache
+    symbol_spec = mt5.symbol_cache.spec(signal_decision.symbol)
     
-    if signal_decision.signal == 1:
-        price = symbol_info.ask
-    elif signal_decision.signal == -1:
-        price = symbol_info.bid
-    
-    trade_multiper = symbol_info.trade_tick_size
+    pip_value = symbol_spec.trade_tick_value
+    trade_multiper = symbol_spec.trade_tick_size
     num_pips = (abs(signal_decision.current_price - signal_decision.stop_loss) / trade_multiper)
 
-    balance = mt5.mt5.account_info().balance
+    balance = mt5.symbol_cache.balance()
     risk_amt = signal_decision.risk * balance
     
-    # Volume 
-    d_v = decimal.Decimal(str(volume_step))
-    d_v = abs(d_v.as_tuple().exponent)
-    
-    # Multiplier
-    d_p = decimal.Decimal(str(trade_multiper))
-    d_p = abs(d_p.as_tuple().exponent)
-    
-    units = round(risk_amt / (num_pips * pip_value), d_v)
+    units = round(risk_amt / (num_pips * pip_value), symbol_spec.volume_decimals)
     
-    return units, trade_multiper, d_p
\ No newline at end of file
+    return units, trade_multiper, symbol_spec.price_decimals
+
+def calculate_lot_sizes(mt5: MT5, signal_decisions: List[SignalDecision]) -> Tuple[np.ndarray, np.ndarray]:
+    """calculate_lot_size for many signals at once, returns (volumes, price decimal places).
+
+    Specs are looked up once per distinct symbol and the balance once for the whole batch.
+    """
+    specs = {symbol: mt5.symbol_cache.spec(symbol) for symbol in {signal.symbol for signal in signal_decisions}}
+    balance = mt5.symbol_cache.balance()
+
+    current_price = np.array([signal.current_price for signal in signal_decisions], dtype=np.float64)
+    stop_loss = np.array([signal.stop_loss for signal in signal_decisions], dtype=np.float64)
+    risk = np.array([signal.risk for signal in signal_decisions], dtype=np.float64)
+    tick_value = np.array([specs[signal.symbol].trade_tick_value for signal in signal_decisions], dtype=np.float64)
+    tick_size = np.array([specs[signal.symbol].trade_tick_size for signal in signal_decisions], dtype=np.float64)
+    volume_decimals = np.array([specs[signal.symbol].volume_decimals for signal in signal_decisions], dtype=np.int64)
+    price_decimals = np.array([specs[signal.symbol].price_decimals for signal in signal_decisions], dtype=np.int64)
+
+    num_pips = np.abs(current_price - stop_loss) / tick_size
+    volumes = risk * balance / (num_pips * tick_value)
+
+    # np.round takes one number of decimals, so round each group of symbols sharing a volume step
+    for decimals in np.unique(volume_decimals):
+        rows = volume_decimals == decimals
+        volumes[rows] = np.round(volumes[rows], int(decimals))
+
+    return volumes, price_decimals
@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+from queue import Empty
+import threading
+import time
+from typing import Dict, List, Optional
+
+from api.metatrader_api import MT5
+from api.shared_candles import SharedCandles
+from bot.bot import Bot
+from bot.strategy_manager import StrategyManager
+from core.log_wrapper import LogWrapper
+from db.db import DataDB
+
+def shard_symbols(trading_symbols: Dict[str, list], processes: int) -> List[List[str]]:
+    """Split the symbols into ``processes`` groups with about the same number of strategies each."""
+    shards: List[List[str]] = [[] for _ in range(max(min(processes, len(trading_symbols)), 1))]
+    loads = [0] * len(shards)
+    # Largest first onto the least loaded shard, ties broken by name so every run splits the same way
+    for symbol in sorted(trading_symbols, key=lambda symbol: (-len(trading_symbols[symbol]), symbol)):
+        index = loads.index(min(loads))
+        shards[index].append(symbol)
+        loads[index] += len(trading_symbols[symbol])
+    return shards
+
+def run_shard(symbols: List[str], shard: int, order_queue, stop_event, bar_store_path: Optional[str] = None,
+              log_path: str = LogWrapper.PATH, log_mode: str = "w", shared_candles_prefix: Optional[str] = None, candle_queue=None):
+    """Entry point of a worker process: a Bot trading ``symbols`` that sends its orders to ``order_queue``."""
+    LogWrapper.PATH = log_path
+    mt5 = MT5(data_db=DataDB(bar_store_path) if bar_store_path is not None else None)
+    shared_candles = SharedCandles(shared_candles_prefix) if shared_candles_prefix is not None else None
+    bot = Bot(mt5=mt5, symbols=symbols, shard=shard, order_queue=order_queue, log_mode=log_mode, shared_candles=shared_candles,
+              candle_queue=candle_queue)
+
+    def wait_for_stop():
+        stop_event.wait()
+        bot.stop()
+
+    threading.Thread(target=wait_for_stop, name="shard_stop", daemon=True).start()
+    bot.run()
+
+class ShardCoordinator:
+    """Runs the symbols of ``bot`` in worker processes and places their orders.
+
+    Each worker runs its own CandleManager and StrategyManagers for its share of the
+    symbols, so strategy evaluation is spread over cores. Orders come back over one queue
+    and are placed through the coordinator's terminal connection, after the global limits
+    of RiskManagement (``max_concurrent_trades``, ``max_daily_loss_percentage``) are checked
+    against the whole account. The coordinator also runs the trade manager.
+
+    With ``sharding.shared_candles`` the coordinator polls the candles of every symbol and
+    publishes each window that closes to shared memory, then tells the worker trading the
+    symbol which pairs closed. Workers do not poll the terminal for candles, they evaluate
+    when told and their strategy managers read the published window.
+    """
+
+    def __init__(self, bot: Bot, processes: Optional[int] = None):
+        self.bot = bot
+        self.processes = processes if processes is not None else bot.bot_config.sharding.processes
+        self.shards = shard_symbols(bot.trading_symbols, self.processes)
+        # Spawned rather than forked, so workers start clean on every platform and open their own terminal connection
+        self.context = multiprocessing.get_context("spawn")
+        self.order_queue = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.workers: List[Optional[multiprocessing.Process]] = [None] * len(self.shards)
+        self.shared_candles = None
+        if bot.bot_config.sharding.shared_candles:
+            self.shared_candles = SharedCandles(f"candles{os.getpid()}", create=True, capacity=StrategyManager.FETCH_COUNT)
+            bot.mt5.shared_candles = self.shared_candles  # Every full fetch is published
+        self.publisher: Optional[threading.Thread] = None
+        # Per shard, the pairs published since the worker last evaluated
+        self.candle_queues = [self.context.Queue() for _ in self.shards] if self.shared_candles is not None else None
+        # Workers store their candles where the coordinator does, unless the coordinator stores them while publishing
+        self.bar_store_path = bot.mt5.data_db.bars.root if bot.mt5.data_db is not None and self.shared_candles is None else None
+        self.metrics = bot.metrics
+        self.metrics.gauge("shard_workers_alive", lambda: sum(1 for worker in self.workers if worker is not None and worker.is_alive()))
+
+    def start_worker(self, shard: int):
+        # A restarted worker appends to the logs of the one it replaces
+        log_mode = "w" if self.workers[shard] is None else "a"
+        worker = self.context.Process(
+            target=run_shard,
+            args=(self.shards[shard], shard, self.order_queue, self.stop_event, self.bar_store_path, LogWrapper.PATH, log_mode,
+                  self.shared_candles.prefix if self.shared_candles is not None else None,
+                  self.candle_queues[shard] if self.candle_queues is not None else None),
+            name=f"shard-{shard}",
+            daemon=True,
+        )
+        worker.start()
+        self.workers[shard] = worker
+        self.bot.log_to_main("ShardCoordinator: started shard %s (pid %s) with %s", shard, worker.pid, self.shards[shard])
+
+    def check_workers(self):
+        for shard, worker in enumerate(self.workers):
+            if worker is None or worker.is_alive() or self.stop_event.is_set():
+                continue
+            self.bot.log_to_error(f"ShardCoordinator: shard {shard} exited with code {worker.exitcode}")
+            self.metrics.inc("shard_restarts")
+            if self.bot.bot_config.sharding.restart_workers:
+                self.start_worker(shard)
+            else:
+                self.workers[shard] = None
+
+    def publish_candles(self, now: Optional[float] = None) -> float:
+        """Fetches and publishes the candles that have closed, then tells their workers.
+
+        Returns the seconds until the next candle is due.
+        """
+        bot = self.bot
+        candle_manager = bot.candle_manager
+        candle_manager.update_timings(now)
+        for symbol_granularity in candle_manager.triggered_pairs:
+            symbol, granularity = symbol_granularity.rsplit("_", 1)
+            try:
+                bot.mt5.fetch_rates(symbol, granularity, count=StrategyManager.FETCH_COUNT)
+            except Exception as error:
+                # The worker is still told, it fetches the candles itself when nothing new is published
+                bot.log_to_error(f"ShardCoordinator: failed to publish candles for {symbol} {granularity}: {error}")
+
+        for shard, symbols in enumerate(self.shards):
+            closed = {symbol_granularity: candle_manager.timings[symbol_granularity].last_time
+                      for symbol_granularity in candle_manager.triggered_pairs if symbol_granularity.rsplit("_", 1)[0] in symbols}
+            worker = self.workers[shard]
+            if closed and worker is not None and worker.is_alive():
+                self.candle_queues[shard].put(closed)
+        return bot.next_poll_delay()
+
+    def run_candle_publisher(self):
+        bot = self.bot
+        while bot.is_running:
+            try:
+                bot.stopped.wait(max(self.publish_candles(), 0))
+            except Exception as e:
+                bot.log_to_error(f"ShardCoordinator: Critical error while publishing candles: {e}")
+                bot.stopped.wait(bot.bot_config.sleep_time)
+
+    def handle_order(self, signal_decision, granularity: str, sent_at: Optional[float] = None) -> bool:
+        """Place one order from a worker if the account-wide limits allow it, returns whether it was placed."""
+        if sent_at is not None:
+            self.metrics.observe("shard_order_wait_seconds", time.time() - sent_at)
+
+        trade_manager = self.bot.trade_manager
+        if not trade_manager.track_daily_loss():
+            self.bot.log_message(f"ShardCoordinator: Max daily loss reached, skipping {signal_decision.symbol}", signal_decision.symbol)
+            return False
+        if not trade_manager.has_trade_capacity():
+            self.bot.log_message(f"ShardCoordinator: Max concurrent trades reached, skipping {signal_decision.symbol}", signal_decision.symbol)
+            return False
+
+        self.bot.place_signal(signal_decision, granularity)
+        return True
+
+    def run(self):
+        bot = self.bot
+        try:
+            bot.start_monitoring()
+            threading.Thread(target=bot.trade_manager.run_trade_manager, name="run_trade_manager_thread", daemon=True).start()
+            if self.shared_candles is not None:
+                self.publisher = threading.Thread(target=self.run_candle_publisher, name="candle_publisher_thread", daemon=True)
+                self.publisher.start()
+            for shard in range(len(self.shards)):
+                self.start_worker(shard)
+
+            while bot.is_running:
+                try:
+                    order = self.order_queue.get(timeout=1)
+                except Empty:
+                    self.check_workers()
+                    bot.log_metrics_summary()
+                    continue
+                self.handle_order(*order)
+        except KeyboardInterrupt:
+            bot.log_to_main("ShardCoordinator: KeyboardInterrupt received, stopping the shards...")
+        except Exception as e:
+            bot.log_to_error(f"ShardCoordinator: Critical error in the coordinator: {e}")
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10.0):
+        self.stop_event.set()
+        deadline = time.time() + timeout
+        for worker in self.workers:
+            if worker is not None:
+                worker.join(max(deadline - time.time(), 0))
+                if worker.is_alive():
+                    worker.terminate()
+        self.bot.stop()
+        if self.shared_candles is not None:
+            if self.publisher is not None:
+                self.publisher.join(max(deadline - time.time(), 1))
+            self.bot.mt5.shared_candles = None
+            self.shared_candles.close()  # Unlinks the segments, the workers have exited
@@ -1,58 +1,83 @@
+import constants.defs as defs
 from typing import Optional
 from api.metatrader_api import MT5
+from api.shared_candles import SharedCandles
 from bot.risk_management import calculate_lot_size
 from models.individual_strategy import IndividualStrategy
 from models.signal_decision import SignalDecision
-from strategy.strategy import run_strategy
+from strategy.indicator_state import IndicatorState
+from strategy.strategy import run_strategy_from_state
 
 
 class StrategyManager:
-    def __init__(self, symbol, strategy: IndividualStrategy, mt5: MT5 , log_message, log_to_error):
+    FETCH_COUNT = defs.CANDLE_COUNT + 1  # One extra for the candle that has just opened
+
+    def __init__(self, symbol, strategy: IndividualStrategy, mt5: MT5 , log_message, log_to_error, indicator_state: Optional[IndicatorState] = None,
+                 shared_candles: Optional[SharedCandles] = None):
         self.symbol = symbol
         self.strategy = strategy
         self.mt5 = mt5
         self.log_message = log_message
         self.log_to_error = log_to_error
+        # Shared with the other managers on the same symbol and granularity
+        self.indicator_state = indicator_state if indicator_state is not None else IndicatorState()
+        self.indicator_state.require(strategy.indicators)
+        # Candles published by the process that talks to the terminal, read instead of fetching when they are newer
+        self.shared_candles = shared_candles
         
     def generate_signal(self) -> Optional[SignalDecision]: 
-        print(f"StrategyManager.generate_signal: starting for {self.symbol}, {self.strategy.granularity}")
-        
-        # Fetch candle data from MT5 API
-        candle_data = self.mt5.fetch_candles(self.symbol, self.strategy.granularity, self.log_to_error)
+        self.log_message("StrategyManager.generate_signal: starting for %s, %s", self.symbol, self.symbol, self.strategy.granularity)
         
-        # Check if we received valid candle data
-        if candle_data.empty:
-            self.log_to_error(f"StrategyManager.generate_signal: No candle data received for {self.symbol}")
-            return None
-
-        print(f"StrategyManager.generate_signal: Running run_strategy with data size {len(candle_data)}")
+        # Only closed candles feed the indicators, usually just the one that closed since the last call
+        closed_candles = None
+        if self.shared_candles is not None:
+            closed_candles = self.shared_candles.closed_since(self.symbol, self.strategy.granularity, self.indicator_state.last_time)
+            if closed_candles is not None and (len(closed_candles) == 0 or closed_candles["time"][-1] == self.indicator_state.last_time):
+                closed_candles = None  # Nothing published since the last evaluation
 
-        # Call run_strategy to get the signal decision
-        signal_decision = run_strategy(
-            candle_data=candle_data,
-            symbol=self.symbol,
-            strategy=self.strategy,
-            log_message=self.log_message,
-            log_to_error=self.log_to_error,
+        if closed_candles is None:
+            # Fetch candle data from MT5 API
+            try:
+                candle_data = self.mt5.fetch_rates(self.symbol, self.strategy.granularity, count=self.FETCH_COUNT)
+            except Exception as error:
+                self.log_to_error(f"StrategyManager.generate_signal: No candle data received for {self.symbol}: {error}")
+                return None
+            closed_candles = candle_data[:-1]
+        added = self.indicator_state.update_many(
+            closed_candles["time"],
+            closed_candles["high"],
+            closed_candles["low"],
+            closed_candles["close"],
         )
 
-        print(f"StrategyManager.generate_signal: Received strategy decision: {signal_decision}")
+        self.log_message("StrategyManager.generate_signal: Running run_strategy with %s new candles", self.symbol, added)
+
+        # Call run_strategy to get the signal decision
+        with self.mt5.metrics.timed("run_strategy_seconds"):
+            signal_decision = run_strategy_from_state(
+                indicator_state=self.indicator_state,
+                symbol=self.symbol,
+                strategy=self.strategy,
+                log_message=self.log_message,
+                log_to_error=self.log_to_error,
+            )
         
         if not signal_decision or signal_decision.signal == 0:
-            self.log_message(f"StrategyManager: No valid signal generated for {self.symbol}", self.symbol)
+            self.log_message("StrategyManager: No valid signal generated for %s", self.symbol, self.symbol)
             return None
 
         # Calculate lot size based on the signal decision
-        volume, _, decimal_places = calculate_lot_size(
-            self.mt5, signal_decision, self.log_message, self.log_to_error
-        )
+        with self.mt5.metrics.timed("calculate_lot_size_seconds"):
+            volume, _, decimal_places = calculate_lot_size(
+                self.mt5, signal_decision, self.log_message, self.log_to_error
+            )
         
         signal_decision.volume = volume
         signal_decision.take_profit = round(signal_decision.take_profit, decimal_places)
         signal_decision.stop_loss = round(signal_decision.stop_loss, decimal_places)
     
         # Log the successful signal generation
-        self.log_message(f"StrategyManager: Signal generated for {self.symbol}: {signal_decision}", self.symbol)
+        self.log_message("StrategyManager: Signal generated for %s: %s", self.symbol, self.symbol, signal_decision)
         
         return signal_decision
         
\ No newline at end of file
@@ -0,0 +1,169 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from api.metatrader_api import MT5
+from bot.strategy_manager import StrategyManager
+from models.signal_decision import SignalDecision
+from utils.utils import granularity_to_minutes
+
+class EntryWatcher:
+    """A pending entry waiting for price to break the last candle of its granularity.
+
+    Watchers hold no thread of their own, the symbol's poller offers them every tick.
+    """
+
+    def __init__(self, signal_decision: SignalDecision, strategy_manager: StrategyManager, expires_at: Optional[float] = None):
+        self.signal_decision = signal_decision
+        self.strategy_manager = strategy_manager
+        self.symbol = signal_decision.symbol
+        self.granularity = strategy_manager.strategy.granularity
+        self.expires_at = expires_at
+        self.cancelled = False
+
+    def is_triggered(self, ask: float, high: float, low: float) -> bool:
+        if self.signal_decision.signal == 1:
+            return high < ask
+        if self.signal_decision.signal == -1:
+            return low > ask
+        return False
+
+    def is_expired(self, now: float) -> bool:
+        return self.cancelled or (self.expires_at is not None and now >= self.expires_at)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __repr__(self):
+        return f"EntryWatcher(symbol={self.symbol}, granularity={self.granularity}, signal={self.signal_decision.signal})"
+
+class TickMultiplexer:
+    """One tick poller per symbol shared by every EntryWatcher on that symbol.
+
+    Each poll reads one tick and refreshes the last candle of a granularity only when the
+    tick moves into a new bar, so the cost follows the number of distinct symbols rather
+    than the number of pending entries. Pollers exit once their symbol has no watchers left.
+    """
+
+    def __init__(
+        self,
+        mt5: MT5,
+        is_running: Callable[[], bool],
+        on_trigger: Callable[[EntryWatcher], None],
+        log_message: callable,
+        log_to_error: callable,
+        tick_interval: float = 1.0,
+        entry_expiry_bars: Optional[int] = None,
+    ):
+        self.mt5 = mt5
+        self.is_running = is_running
+        self.on_trigger = on_trigger
+        self.log_message = log_message
+        self.log_to_error = log_to_error
+        self.tick_interval = tick_interval
+        self.entry_expiry_bars = entry_expiry_bars
+        self.watchers: Dict[str, List[EntryWatcher]] = {}
+        self.pollers: Dict[str, object] = {}
+        self.lock = threading.Lock()
+        # Starts the poller of a symbol and returns its handle, a thread unless the asyncio runtime replaces it with a task
+        self.start_poller: Callable[[str], object] = self.start_thread_poller
+
+    def watch(self, signal_decision: SignalDecision, strategy_manager: StrategyManager) -> EntryWatcher:
+        expires_at = None
+        if self.entry_expiry_bars:
+            expires_at = time.time() + self.entry_expiry_bars * granularity_to_minutes(strategy_manager.strategy.granularity) * 60
+
+        watcher = EntryWatcher(signal_decision, strategy_manager, expires_at)
+        with self.lock:
+            self.watchers.setdefault(watcher.symbol, []).append(watcher)
+            if watcher.symbol not in self.pollers:
+                self.pollers[watcher.symbol] = self.start_poller(watcher.symbol)
+
+        self.log_message("TickMultiplexer: watching %s", "trade_processor", watcher)
+        return watcher
+
+    def watcher_count(self) -> int:
+        with self.lock:
+            return sum(len(watchers) for watchers in self.watchers.values())
+
+    def start_thread_poller(self, symbol: str) -> threading.Thread:
+        poller = threading.Thread(target=self.run_poller, args=(symbol,), name=f"ticks-{symbol}", daemon=True)
+        poller.start()
+        return poller
+
+    def run_poller(self, symbol: str):
+        levels = {}  # granularity -> (bar index, high, low) of the last candle
+
+        try:
+            while True:
+                watchers = self.pending(symbol)
+                if not watchers:
+                    return
+                self.poll(symbol, watchers, levels)
+                time.sleep(self.tick_interval)
+        except Exception as error:
+            self.log_to_error(f"TickMultiplexer: poller for {symbol} failed: {error}")
+            self.drop(symbol)
+
+    def pending(self, symbol: str) -> List[EntryWatcher]:
+        """The watchers to offer the next tick, none once the symbol has no watchers left or the bot stops."""
+        with self.lock:
+            if not self.is_running():
+                for watcher in self.watchers.pop(symbol, []):
+                    watcher.cancel()
+            if not self.watchers.get(symbol):
+                self.watchers.pop(symbol, None)
+                self.pollers.pop(symbol, None)
+                return []
+            return list(self.watchers[symbol])
+
+    def drop(self, symbol: str):
+        """Cancels every watcher on ``symbol`` when its poller ends early."""
+        with self.lock:
+            for watcher in self.watchers.pop(symbol, []):
+                watcher.cancel()
+            self.pollers.pop(symbol, None)
+
+    def poll(self, symbol: str, watchers: List[EntryWatcher], levels: dict):
+        now = time.time()
+        tick_info = self.mt5.mt5.symbol_info_tick(symbol)
+        if tick_info is None:
+            self.log_to_error(f"TickMultiplexer: Failed to get tick info for {symbol}")
+            return
+
+        finished = []
+        for watcher in watchers:
+            if watcher.is_expired(now):
+                self.log_message("TickMultiplexer: %s expired", "trade_processor", watcher)
+                finished.append(watcher)
+                continue
+
+            level = self.get_level(symbol, watcher.granularity, tick_info.time, levels)
+            if level is None or not watcher.is_triggered(tick_info.ask, level[1], level[2]):
+                continue
+
+            finished.append(watcher)
+            try:
+                self.on_trigger(watcher)
+            except Exception as error:
+                self.log_to_error(f"TickMultiplexer: entry failed for {watcher}: {error}")
+
+        if finished:
+            finished = set(map(id, finished))
+            with self.lock:
+                self.watchers[symbol] = [watcher for watcher in self.watchers.get(symbol, []) if id(watcher) not in finished]
+
+    def get_level(self, symbol: str, granularity: str, tick_time: int, levels: dict):
+        """(bar index, high, low) of the last candle, fetched once per bar per granularity."""
+        bar = tick_time // (granularity_to_minutes(granularity) * 60)
+        level = levels.get(granularity)
+        if level is not None and level[0] == bar:
+            return level
+
+        candles = self.mt5.fetch_candle_data(symbol, granularity, self.log_to_error, count=2)
+        if candles is None or candles.empty:
+            return level  # fetch_candle_data has logged why
+
+        level = (bar, float(candles.High[-1]), float(candles.Low[-1]))
+        levels[granularity] = level
+        return level
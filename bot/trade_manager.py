@@ -17,16 +17,35 @@ import time
 import datetime as dt
 from typing import List
 
+def trailing_stops(is_buy: np.ndarray, price_open: np.ndarray, stop_loss: np.ndarray, current_price: np.ndarray,
+                   trail: float, min_step: float) -> np.ndarray:
+    """New stop loss per position, nan where it stays.
+
+    Once price has moved ``trail`` (a fraction of the open price) in a position's favour the
+    stop follows it at that distance, only ever tightening and only by more than ``min_step``
+    of the open price. A stop of 0 means the position has none.
+    """
+    distance = trail * price_open
+    candidate = np.where(is_buy, current_price - distance, current_price + distance)
+    in_profit = np.where(is_buy, current_price > price_open + distance, current_price < price_open - distance)
+
+    has_stop = stop_loss != 0
+    improvement = np.where(is_buy, candidate - stop_loss, stop_loss - candidate)
+    moves = in_profit & (~has_stop | (improvement > min_step * price_open))
+    return np.where(moves, candidate, np.nan)
+
 class TradeManager:
-    def __init__(self, mt5, risk_management, log_to_main, log_message, log_to_error):
+    def __init__(self, mt5, risk_management, log_to_main, log_message, log_to_error, trade_management=None, daily_pnl_ledger=None):
         """Initializes the TradeManager with MT5 instance, risk management rules, and logging functions."""
         self.mt5 = mt5  # MT5 instance for trading operations
         self.risk_management = risk_management  # Risk management settings
+        self.trade_management = trade_management  # Trailing stop settings
         self.log_to_main = log_to_main
         self.log_message = log_message  # Function for logging general messages
         self.log_to_error = log_to_error  # Function for logging error messages
         self.is_running = True  # Flag to control the trade monitoring loop
-        self.daily_loss = 0  # Track daily loss to stop trading if threshold is met
+        self.daily_pnl_ledger = daily_pnl_ledger  # Running P&L of the broker day, updated each cycle
+        self.daily_loss_reached = False
         
     def close_open_trades(self):
         """Closes all open trades before stopping the bot."""
@@ -44,98 +63,111 @@ class TradeManager:
                 raise error
 
 
-    def monitor_open_trades(self):
-        """Monitors open trades and adjusts stop-loss or take-profit if necessary."""
-        self.log_message("monitor_open_trades: Monitoring open trades...")
+    def monitor_open_trades(self) -> int:
+        """Trails the stop loss of every open position, returns the number of stops moved.
+
+        One positions_get snapshot and one tick per distinct symbol per cycle, the new stop
+        levels are computed for all positions at once.
+        """
+        self.log_message("monitor_open_trades: Monitoring open trades...", "main")
 
         try:
-            open_trades = self.mt5.get_open_trades()  # Fetch open trades
-            for trade in open_trades:
-                # Get the current market price for the traded symbol
-                current_price = self.mt5.get_current_price(trade.symbol)
-                # Adjust stop-loss or take-profit based on your strategy
-                self.manage_trade(trade, current_price)
+            positions = self.mt5.get_open_positions()
+            if not positions:
+                return 0
+
+            ticks = {symbol: self.mt5.mt5.symbol_info_tick(symbol) for symbol in {position.symbol for position in positions}}
+            positions = [position for position in positions if ticks[position.symbol] is not None]
+            if not positions:
+                return 0
+
+            is_buy = np.array([position.type == self.mt5.mt5.POSITION_TYPE_BUY for position in positions])
+            # Positions close at the bid for buys and at the ask for sells
+            current_price = np.array([ticks[position.symbol].bid if buy else ticks[position.symbol].ask
+                                      for position, buy in zip(positions, is_buy)])
+            new_stop_loss = trailing_stops(
+                is_buy,
+                np.array([position.price_open for position in positions]),
+                np.array([position.sl for position in positions]),
+                current_price,
+                self.risk_management.max_stop_loss_percentage,
+                self.trade_management.trailing_min_step if self.trade_management is not None else 0.0,
+            )
+
+            modified = 0
+            for i in np.flatnonzero(~np.isnan(new_stop_loss)):
+                position = positions[i]
+                stop_loss = round(float(new_stop_loss[i]), self.mt5.symbol_cache.spec(position.symbol).digits)
+                if self.mt5.modify_position(position.ticket, position.symbol, stop_loss, position.tp):
+                    modified += 1
+                    self.log_message(f"manage_trade: Adjusted stop-loss for {position.symbol} to {stop_loss}", position.symbol)
+                else:
+                    self.log_to_error(f"monitor_open_trades: Failed to adjust stop-loss for {position.symbol} ticket {position.ticket}")
+
+            return modified
 
         except Exception as error:
             self.log_to_error(f"monitor_open_trades: Critical error while monitoring trades: {error}")
             raise error
 
-    def manage_trade(self, trade, current_price):
-        """Manages an open trade by adjusting stop-loss or take-profit if conditions are met."""
-        if trade.order_type == "BUY_ORDER":
-            # Check if the current price has moved favorably for a BUY order
-            if current_price > trade.price_open + self.risk_management["max_stop_loss_percentage"] * trade.price_open:
-                new_stop_loss = current_price - self.risk_management["max_stop_loss_percentage"] * trade.price_open
-                if new_stop_loss > trade.stop_loss:
-                    self.mt5.modify_order(trade.order_id, stop_loss=new_stop_loss)
-                    self.log_message(f"manage_trade: Adjusted stop-loss for {trade.symbol} to {new_stop_loss}")
-
-        elif trade.order_type == "SELL_ORDER":
-            # Check if the current price has moved favorably for a SELL order
-            if current_price < trade.price_open - self.risk_management["max_stop_loss_percentage"] * trade.price_open:
-                new_stop_loss = current_price + self.risk_management["max_stop_loss_percentage"] * trade.price_open
-                if new_stop_loss < trade.stop_loss:
-                    self.mt5.modify_order(trade.order_id, stop_loss=new_stop_loss)
-                    self.log_message(f"manage_trade: Adjusted stop-loss for {trade.symbol} to {new_stop_loss}")
-
     def close_trade_early(self, trade, current_price):
         """Closes a trade early if it meets specific conditions (e.g., profit threshold)."""
         current_profit = self.mt5.calculate_profit(trade)
 
         # Example: Close the trade early if it reaches the take-profit ratio
-        take_profit_target = self.risk_management["take_profit_ratio"] * (trade.price_open - trade.stop_loss)
+        take_profit_target = self.risk_management.take_profit_ratio * (trade.price_open - trade.stop_loss)
         if current_profit >= take_profit_target:
             self.mt5.close_order(trade.order_id)
             self.log_message(f"close_trade_early: Closed trade {trade.symbol} early with profit {current_profit}")
 
-    def check_risk_limits(self, signal_decision):
-        """Ensures that the trade meets risk management limits."""
-        account_balance = self.mt5.get_account_balance()
-        open_trades = self.mt5.get_open_trades()
+    def has_trade_capacity(self, in_flight: int = 0) -> bool:
+        """Whether another trade fits within max_concurrent_trades.
 
-        # Check the number of concurrent trades
-        if len(open_trades) >= self.risk_management["max_concurrent_trades"]:
-            self.log_to_error(f"check_risk_limits: Maximum concurrent trades reached. Ignoring new trade for {signal_decision.symbol}.")
-            return False
+        Open positions and pending orders both count, as do ``in_flight`` orders already
+        allowed through but not yet on the terminal.
+        """
+        open_trades = len(self.mt5.mt5.positions_get() or ()) + len(self.mt5.mt5.orders_get() or ()) + in_flight
+        return open_trades < self.risk_management.max_concurrent_trades
 
-        # Calculate potential risk for this trade
-        stop_loss_distance = signal_decision.current_price - signal_decision.stop_loss
-        risk_per_trade = stop_loss_distance * signal_decision.volume
-        max_risk_per_trade = self.risk_management["max_trade_percentage"] * account_balance
+    def track_daily_loss(self) -> bool:
+        """Whether trading may continue today, False once the max daily loss is reached.
 
-        if risk_per_trade > max_risk_per_trade:
-            self.log_to_error(f"check_risk_limits: Risk for {signal_decision.symbol} exceeds allowed maximum. Ignoring trade.")
-            return False
+        Reads the ledger's running totals, so it is O(1) and safe to call before every order.
+        """
+        if self.daily_pnl_ledger is None:
+            return True
 
-        return True
+        within_limit = self.daily_pnl_ledger.within_limit(self.risk_management.max_daily_loss_percentage)
+        if not within_limit and not self.daily_loss_reached:
+            self.log_to_error(f"track_daily_loss: Max daily loss reached. No further trades today. {self.daily_pnl_ledger}")
+        self.daily_loss_reached = not within_limit
+        return within_limit
 
-    def track_daily_loss(self):
-        """Tracks the bot's daily losses and stops trading if the max daily loss limit is reached."""
-        total_loss = sum([trade.loss for trade in self.mt5.get_closed_trades_today()])
-        account_balance = self.mt5.get_account_balance()
-        max_daily_loss = self.risk_management["max_daily_loss_percentage"] * account_balance
+    @property
+    def monitor_interval(self) -> float:
+        return self.trade_management.monitor_interval if self.trade_management is not None else 5
 
-        if total_loss >= max_daily_loss:
-            self.log_to_error(f"track_daily_loss: Max daily loss reached. No further trades today.")
-            return False  # Stop trading for the day
-
-        return True
+    def run_cycle(self):
+        """One pass of the trade manager: the daily P&L, then the trailing stops."""
+        try:
+            if self.daily_pnl_ledger is not None:
+                self.daily_pnl_ledger.update()
+                self.track_daily_loss()
+            if self.trade_management is None or self.trade_management.trailing_stop:
+                self.monitor_open_trades()  # Continuously monitor and manage open trades
+        except Exception as e:
+            self.log_to_error(f"run_trade_manager: Critical error in trade management: {e}")
 
     def run_trade_manager(self):
         """Main loop to monitor and manage open trades."""
-        self.log_message("run_trade_manager: Running trade manager...")
+        self.log_to_main("run_trade_manager: Running trade manager...")
 
         while self.is_running:
-            try:
-                if self.track_daily_loss():  # Stop trading if daily loss limit is hit
-                    self.monitor_open_trades()  # Continuously monitor and manage open trades
-            except Exception as e:
-                self.log_to_error(f"run_trade_manager: Critical error in trade management: {e}")
-            finally:
-                time.sleep(5)  # Adjust sleep time as needed to control trade management frequency
+            self.run_cycle()
+            time.sleep(self.monitor_interval)
 
     def stop_trade_manager(self):
         """Stops the trade manager process."""
         self.is_running = False
-        self.log_message("stop_trade_manager: Trade manager stopped.")
+        self.log_to_main("stop_trade_manager: Trade manager stopped.")
 
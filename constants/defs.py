@@ -1,4 +1,25 @@
+import os
+
 # Update path to MT5 termianl
 METATRADER_PATH = r"C:/Program Files/MetaTrader 5/terminal64.exe"
 
-MAX_RETRIES = 4
\ No newline at end of file
+MAX_RETRIES = 4
+
+# Number of candles a strategy is evaluated on
+CANDLE_COUNT = 200
+
+# Run against api.simulated_terminal instead of a MetaTrader 5 terminal
+SIMULATED_TERMINAL = os.getenv("SIMULATED_TERMINAL", "false").lower() == "true"
+
+# Seconds symbol specs and the account balance snapshot are reused by calculate_lot_size
+SYMBOL_SPEC_TTL = 3600
+ACCOUNT_SNAPSHOT_TTL = 5
+
+# Where the daily P&L ledger keeps its snapshot so a restart resumes the day
+DAILY_PNL_SNAPSHOT = "./state/daily_pnl.json"
+
+# Root of the on-disk candle store used by DataDB
+BAR_STORE_PATH = "./data/bars"
+
+# Root of the recorded tick files, one per symbol
+TICK_STORE_PATH = "./data/ticks"
@@ -1,33 +1,173 @@
-import google.cloud.logging
-from google.cloud.logging.handlers import CloudLoggingHandler
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
+from typing import List, Optional
 
 LOG_FORMAT = "%(asctime)s %(message)s"
 DEFAULT_LEVEL = logging.DEBUG
 
+class LogQueue:
+    """Bounded queue of log records written out in batches by one background thread.
+
+    Trading threads only append to the queue. When it is full the record is dropped and
+    counted instead of blocking. Records are formatted by the writer, so ``%`` arguments
+    are rendered as they are when written, not when logged.
+    """
+
+    def __init__(self, max_size: int = 10000, batch_size: int = 256, flush_interval: float = 0.5):
+        self.queue = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {"enqueued": 0, "dropped": 0, "written": 0, "batches": 0, "errors": 0}
+        self.lock = threading.Lock()
+        self.writer = threading.Thread(target=self.run_writer, name="log_writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.flush, 1.0)  # The writer is a daemon, so write what is left on exit
+
+    def put(self, handlers: List[logging.Handler], record: logging.LogRecord):
+        try:
+            self.queue.put_nowait((handlers, record))
+            counter = "enqueued"
+        except queue.Full:
+            counter = "dropped"
+        with self.lock:
+            self.stats[counter] += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every record queued so far is written, False on timeout."""
+        if not self.writer.is_alive():
+            return False
+
+        written = threading.Event()
+        try:
+            self.queue.put(written, timeout=timeout)
+        except queue.Full:
+            return False
+        return written.wait(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        self.flush(timeout)
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.writer.join(timeout)
+
+    def run_writer(self):
+        while True:
+            # Gather records for up to flush_interval, a flush or stop request ends the batch early
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and isinstance(batch[-1], tuple):
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            try:
+                self.write([item for item in batch if isinstance(item, tuple)])
+            except Exception:
+                # A failing handler must not stop the writer, flush() waits on it
+                with self.lock:
+                    self.stats["errors"] += 1
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if stop:
+                return
+
+    def write(self, batch):
+        records = {}
+        for handlers, record in batch:
+            for handler in handlers:
+                records.setdefault(handler, []).append(record)
+
+        for handler, handler_records in records.items():
+            if isinstance(handler, logging.StreamHandler):
+                self.write_stream(handler, handler_records)
+            else:
+                # Other handlers (Cloud Logging) batch uploads on their own transport
+                for record in handler_records:
+                    handler.handle(record)
+
+        with self.lock:
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+
+    def write_stream(self, handler: logging.StreamHandler, records: List[logging.LogRecord]):
+        """Write every record then flush once, rather than once per record as emit does."""
+        lines = []
+        for record in records:
+            if record.levelno < handler.level:
+                continue
+            try:
+                lines.append(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+
+        handler.acquire()
+        try:
+            if handler.stream is None and isinstance(handler, logging.FileHandler):
+                handler.stream = handler._open()
+            handler.stream.write("".join(lines))
+            handler.flush()
+        except Exception:
+            handler.handleError(records[-1])
+        finally:
+            handler.release()
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to a LogQueue unformatted, along with the handlers that will write them."""
+
+    def __init__(self, log_queue: LogQueue, handlers: List[logging.Handler]):
+        super().__init__(log_queue.queue)
+        self.log_queue = log_queue
+        self.handlers = handlers
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        self.log_queue.put(self.handlers, record)
+
 class LogWrapper:
     PATH = './logs'
 
-    def __init__(self, name, mode="w", cloud_logging_enabled=False):
+    def __init__(self, name, mode="w", cloud_logging_enabled=False, log_queue: Optional[LogQueue] = None, level=DEFAULT_LEVEL):
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(DEFAULT_LEVEL)
+        self.logger.setLevel(level)
 
         if cloud_logging_enabled:
-            self.setup_cloud_logging(name)
+            handler = self.setup_cloud_logging(name)
         else:
-            self.setup_file_logging(name, mode)
+            handler = self.setup_file_logging(name, mode)
+
+        # With a queue the handler only runs on the writer thread
+        if log_queue is not None:
+            handler = LogQueueHandler(log_queue, [handler])
+        self.logger.addHandler(handler)
 
+        if cloud_logging_enabled:
+            self.logger.info("Google Cloud Logging enabled")
         self.logger.info(f"LogWrapper initialized for {name}")
 
     def setup_cloud_logging(self, name):
+        # Imported here, the client and its gRPC stack take longer to import than the rest of the bot
+        import google.cloud.logging
+        from google.cloud.logging.handlers import CloudLoggingHandler
+
         client = google.cloud.logging.Client()
         cloud_handler = CloudLoggingHandler(client, name=name)
         formatter = logging.Formatter(LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S')
 
         cloud_handler.setFormatter(formatter)
-        self.logger.addHandler(cloud_handler)
-        self.logger.info("Google Cloud Logging enabled")
+        return cloud_handler
 
     def setup_file_logging(self, name, mode):
         self.create_directory()
@@ -36,7 +176,7 @@ class LogWrapper:
         formatter = logging.Formatter(LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S')
 
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        return file_handler
 
     def create_directory(self):
         if not os.path.exists(LogWrapper.PATH):
@@ -0,0 +1,175 @@
+import bisect
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# Upper bounds in seconds, roughly log spaced from 1ms to a minute
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    """Bucketed histogram, O(log buckets) to observe and a fixed few hundred bytes to keep."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one counts values above every bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (0-1), the max for the overflow bucket."""
+        with self.lock:
+            if self.count == 0:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank and count:
+                    return self.buckets[index] if index < len(self.buckets) else self.max
+            return self.max
+
+    def __repr__(self):
+        return (f"Histogram(count={self.count}, mean={self.sum / self.count if self.count else 0:.4f}, "
+                f"p50={self.percentile(0.5)}, p99={self.percentile(0.99)})")
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self.lock:
+            self.value += amount
+
+class Metrics:
+    """Named histograms, counters and gauges shared by the bot's threads."""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Counter] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self.lock = threading.Lock()
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, name: str, value: float):
+        self.histogram(name).observe(value)
+
+    @contextmanager
+    def timed(self, name: str):
+        """Observe the seconds spent in the ``with`` block, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).observe(time.perf_counter() - start)
+
+    def counter(self, name: str) -> Counter:
+        counter = self.counters.get(name)
+        if counter is None:
+            with self.lock:
+                counter = self.counters.setdefault(name, Counter())
+        return counter
+
+    def inc(self, name: str, amount: int = 1):
+        self.counter(name).inc(amount)
+
+    def gauge(self, name: str, read: Callable[[], float]):
+        """Register ``read``, called whenever the metrics are exported."""
+        with self.lock:
+            self.gauges[name] = read
+
+    def summary(self) -> str:
+        """One line with p50/p99 of every histogram and the value of every counter and gauge."""
+        parts = []
+        for name, histogram in sorted(self.histograms.items()):
+            if histogram.count:
+                parts.append(f"{name} n={histogram.count} p50={histogram.percentile(0.5):g} "
+                             f"p99={histogram.percentile(0.99):g} max={histogram.max:.4f}")
+        for name, counter in sorted(self.counters.items()):
+            parts.append(f"{name}={counter.value}")
+        for name, value in self.read_gauges():
+            parts.append(f"{name}={value:g}")
+        return "; ".join(parts)
+
+    def read_gauges(self):
+        for name, read in sorted(self.gauges.items()):
+            try:
+                yield name, float(read())
+            except Exception:
+                continue
+
+    def render_prometheus(self, prefix: str = "bot_") -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            with histogram.lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{prefix}{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}{name}_bucket{{le="+Inf"}} {count}')
+            lines.append(f"{prefix}{name}_sum {total}")
+            lines.append(f"{prefix}{name}_count {count}")
+        for name, counter in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}{name}_total counter")
+            lines.append(f"{prefix}{name}_total {counter.value}")
+        for name, value in self.read_gauges():
+            lines.append(f"# TYPE {prefix}{name} gauge")
+            lines.append(f"{prefix}{name} {value}")
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """Serves ``Metrics.render_prometheus`` on ``/metrics`` from a daemon thread."""
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9100):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would otherwise be written to stderr
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics_server", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
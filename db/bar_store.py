@@ -0,0 +1,149 @@
+import calendar
+import datetime as dt
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Field layout of the terminal's rate arrays, so stored bars can be handed to strategies as they are
+BAR_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("tick_volume", "<u8"),
+    ("spread", "<i4"),
+    ("real_volume", "<u8"),
+])
+
+def to_epoch(when) -> int:
+    """Broker epoch seconds of a bar time, naive datetimes are taken as broker time."""
+    if isinstance(when, dt.datetime):
+        if when.tzinfo is None:
+            return calendar.timegm(when.timetuple())
+        return int(when.timestamp())
+    return int(when)
+
+class BarFile:
+    """Closed bars of one (symbol, granularity), fixed-size records sorted by time.
+
+    New bars are appended to the end of the file. Bars older than the last one stored
+    are only written when their time is missing, by merging and replacing the file, so
+    every time is stored once. Reads are memory-mapped and never copy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.map: Optional[np.ndarray] = None
+
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size % BAR_DTYPE.itemsize:
+            # An append cut short by a crash leaves a partial record at the end
+            size -= size % BAR_DTYPE.itemsize
+            with open(path, "r+b") as f:
+                f.truncate(size)
+        self.count = size // BAR_DTYPE.itemsize
+
+    def bars(self) -> np.ndarray:
+        """Every stored bar, a read-only memory map of the file."""
+        with self.lock:
+            if self.count == 0:
+                return np.empty(0, dtype=BAR_DTYPE)
+            if self.map is None or len(self.map) != self.count:
+                self.map = np.memmap(self.path, dtype=BAR_DTYPE, mode="r", shape=(self.count,))
+            return self.map
+
+    def last_time(self) -> Optional[int]:
+        bars = self.bars()
+        return int(bars["time"][-1]) if len(bars) else None
+
+    def write(self, rates: np.ndarray) -> int:
+        """Store the bars whose time is not stored yet, returns how many were written."""
+        if len(rates) == 0:
+            return 0
+
+        rates = as_bars(rates)
+        # Sorted and unique on time, the last copy of a repeated time wins
+        _, last_index = np.unique(rates["time"][::-1], return_index=True)
+        rates = rates[len(rates) - 1 - last_index]
+
+        stored = self.bars()
+        last_time = int(stored["time"][-1]) if len(stored) else None
+        if last_time is None or rates["time"][0] > last_time:
+            return self.append(rates)
+
+        older = rates[rates["time"] <= last_time]
+        index = np.searchsorted(stored["time"], older["time"])
+        missing = older[(index == len(stored)) | (stored["time"][np.minimum(index, len(stored) - 1)] != older["time"])]
+        if len(missing):
+            self.merge(stored, missing)
+        return len(missing) + self.append(rates[rates["time"] > last_time])
+
+    def append(self, rates: np.ndarray) -> int:
+        if len(rates) == 0:
+            return 0
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(rates.tobytes())
+            self.count += len(rates)
+        return len(rates)
+
+    def merge(self, stored: np.ndarray, rates: np.ndarray):
+        merged = np.concatenate([np.asarray(stored), rates])
+        merged = merged[np.argsort(merged["time"], kind="stable")]
+        with self.lock:
+            temporary_path = f"{self.path}.tmp"
+            merged.tofile(temporary_path)
+            self.map = None  # Release our mapping, the file cannot be replaced while mapped on Windows
+            os.replace(temporary_path, self.path)
+            self.count = len(merged)
+
+def as_bars(rates: np.ndarray) -> np.ndarray:
+    if rates.dtype == BAR_DTYPE:
+        return rates
+    bars = np.zeros(len(rates), dtype=BAR_DTYPE)
+    for name in BAR_DTYPE.names:
+        if name in rates.dtype.names:
+            bars[name] = rates[name]
+    return bars
+
+class BarStore:
+    """Closed candles on disk, one file per symbol and granularity under ``root``."""
+
+    EXTENSION = ".bars"
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files: Dict[Tuple[str, str], BarFile] = {}
+        self.lock = threading.Lock()
+
+    def file(self, symbol: str, granularity: str) -> BarFile:
+        key = (symbol, granularity)
+        bar_file = self.files.get(key)
+        if bar_file is None:
+            with self.lock:
+                bar_file = self.files.get(key)
+                if bar_file is None:
+                    bar_file = BarFile(os.path.join(self.root, symbol, f"{granularity}{self.EXTENSION}"))
+                    self.files[key] = bar_file
+        return bar_file
+
+    def write(self, symbol: str, granularity: str, rates: np.ndarray) -> int:
+        return self.file(symbol, granularity).write(rates)
+
+    def query(self, symbol: str, granularity: str, start=None, end=None, count: Optional[int] = None) -> np.ndarray:
+        """Bars with ``start <= time <= end``, the last ``count`` of them if given, as a view of the file."""
+        bars = self.file(symbol, granularity).bars()
+        times = bars["time"]
+        first = 0 if start is None else int(np.searchsorted(times, to_epoch(start), side="left"))
+        last = len(bars) if end is None else int(np.searchsorted(times, to_epoch(end), side="right"))
+        if count is not None:
+            first = max(first, last - count)
+        return bars[first:last]
+
+    def last_time(self, symbol: str, granularity: str) -> Optional[int]:
+        return self.file(symbol, granularity).last_time()
@@ -1,4 +1,9 @@
-from pymongo import MongoClient, errors
+from typing import Optional
+
+import numpy as np
+
+import constants.defs as defs
+from db.bar_store import BarStore
 
 # from constants.defs import MONGO_CONN_STR
 
@@ -7,10 +12,22 @@ class DataDB:
     CALENDAR_COLL = "forex_calendar"
     INSTRUMENTS_COLL = "forex_instruments"
 
-    def __init__(self):
+    def __init__(self, bar_store_path: str = defs.BAR_STORE_PATH):
+        # from pymongo import MongoClient, errors  # Imported only once the Mongo collections are in use
         # self.client = MongoClient(MONGO_CONN_STR)
         # self.db = self.client.forex_learning
-        pass
+        self.bars = BarStore(bar_store_path)
+
+    def write_candles(self, symbol: str, granularity: str, rates: np.ndarray) -> int:
+        """Store closed candles, times already stored are skipped. Returns the number written."""
+        return self.bars.write(symbol, granularity, rates)
+
+    def query_candles(self, symbol: str, granularity: str, start=None, end=None, count: Optional[int] = None) -> np.ndarray:
+        """Stored candles between ``start`` and ``end`` (broker time), in the terminal's rate array layout."""
+        return self.bars.query(symbol, granularity, start, end, count)
+
+    def last_candle_time(self, symbol: str, granularity: str) -> Optional[int]:
+        return self.bars.last_time(symbol, granularity)
     
     
     def query_single(self, collection, **kwargs):
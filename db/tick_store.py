@@ -0,0 +1,138 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+# Field layout of the terminal's tick arrays (copy_ticks_*), one fixed-width record per tick
+TICK_DTYPE = np.dtype([
+    ("time_msc", "<i8"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("last", "<f8"),
+    ("volume", "<u8"),
+])
+
+# Every INDEX_EVERY-th tick's (time_msc, record number) goes into the sparse index
+INDEX_EVERY = 4096
+INDEX_DTYPE = np.dtype([("time_msc", "<i8"), ("record", "<i8")])
+
+class TickFile:
+    """Ticks of one symbol in time order, fixed-size records appended to one file.
+
+    A sidecar ``.idx`` file holds the time of every ``INDEX_EVERY``-th record, so a time
+    range is found by searching the small index and then a single block of the file,
+    without paging the whole file in. Reads are memory-mapped and never copy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.lock = threading.Lock()
+        self.map: Optional[np.ndarray] = None
+
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size % TICK_DTYPE.itemsize:
+            # An append cut short by a crash leaves a partial record at the end
+            size -= size % TICK_DTYPE.itemsize
+            with open(path, "r+b") as f:
+                f.truncate(size)
+        self.count = size // TICK_DTYPE.itemsize
+        self.index = self.load_index()
+        self.last_msc = int(self.ticks()["time_msc"][-1]) if self.count else None
+
+    def load_index(self) -> np.ndarray:
+        expected = (self.count + INDEX_EVERY - 1) // INDEX_EVERY
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) == expected * INDEX_DTYPE.itemsize:
+            return np.fromfile(self.index_path, dtype=INDEX_DTYPE)
+
+        # Missing or out of step with the ticks, e.g. after a crash between the two writes
+        index = np.zeros(expected, dtype=INDEX_DTYPE)
+        if expected:
+            index["record"] = np.arange(expected) * INDEX_EVERY
+            index["time_msc"] = self.ticks()["time_msc"][::INDEX_EVERY]
+        if self.count:
+            index.tofile(self.index_path)
+        return index
+
+    def ticks(self) -> np.ndarray:
+        """Every stored tick, a read-only memory map of the file."""
+        with self.lock:
+            if self.count == 0:
+                return np.empty(0, dtype=TICK_DTYPE)
+            if self.map is None or len(self.map) != self.count:
+                self.map = np.memmap(self.path, dtype=TICK_DTYPE, mode="r", shape=(self.count,))
+            return self.map
+
+    def append(self, ticks: np.ndarray) -> int:
+        """Append the ticks no older than the last one stored, returns how many were written."""
+        with self.lock:
+            if self.last_msc is not None and len(ticks) and ticks["time_msc"][0] < self.last_msc:
+                ticks = ticks[ticks["time_msc"] >= self.last_msc]  # e.g. seen again after a restart
+            if len(ticks) == 0:
+                return 0
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(ticks.tobytes())
+
+            first = self.count
+            self.count += len(ticks)
+            self.last_msc = int(ticks["time_msc"][-1])
+            # Index entries for the records that start a new block
+            records = np.arange((first + INDEX_EVERY - 1) // INDEX_EVERY * INDEX_EVERY, self.count, INDEX_EVERY)
+            if len(records):
+                entries = np.zeros(len(records), dtype=INDEX_DTYPE)
+                entries["record"] = records
+                entries["time_msc"] = ticks["time_msc"][records - first]
+                with open(self.index_path, "ab") as f:
+                    f.write(entries.tobytes())
+                self.index = np.concatenate((self.index, entries))
+        return len(ticks)
+
+    def locate(self, time_msc: int, side: str = "left") -> int:
+        """Record number at which ``time_msc`` would be inserted, searching one index block."""
+        block = max(int(np.searchsorted(self.index["time_msc"], time_msc, side=side)) - 1, 0)
+        start = block * INDEX_EVERY
+        end = min(start + 2 * INDEX_EVERY, self.count)  # Equal times may run past the block
+        times = self.ticks()["time_msc"]
+        position = start + int(np.searchsorted(times[start:end], time_msc, side=side))
+        if position == end and end < self.count:
+            position = int(np.searchsorted(times, time_msc, side=side))  # A long run of equal times
+        return position
+
+    def query(self, start_msc: Optional[int] = None, end_msc: Optional[int] = None) -> np.ndarray:
+        """Ticks with ``start_msc <= time_msc <= end_msc`` as a view of the file."""
+        first = 0 if start_msc is None else self.locate(start_msc, "left")
+        last = self.count if end_msc is None else self.locate(end_msc, "right")
+        return self.ticks()[first:last]
+
+class TickStore:
+    """Recorded ticks on disk, one file per symbol under ``root``."""
+
+    EXTENSION = ".ticks"
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files: Dict[str, TickFile] = {}
+        self.lock = threading.Lock()
+
+    def file(self, symbol: str) -> TickFile:
+        tick_file = self.files.get(symbol)
+        if tick_file is None:
+            with self.lock:
+                tick_file = self.files.get(symbol)
+                if tick_file is None:
+                    tick_file = TickFile(os.path.join(self.root, f"{symbol}{self.EXTENSION}"))
+                    self.files[symbol] = tick_file
+        return tick_file
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-len(self.EXTENSION)] for name in os.listdir(self.root) if name.endswith(self.EXTENSION))
+
+    def append(self, symbol: str, ticks: np.ndarray) -> int:
+        return self.file(symbol).append(ticks)
+
+    def query(self, symbol: str, start_msc: Optional[int] = None, end_msc: Optional[int] = None) -> np.ndarray:
+        return self.file(symbol).query(start_msc, end_msc)
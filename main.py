@@ -1,6 +1,14 @@
+import time
+
+started_at = time.perf_counter()  # Before any import, so the startup report includes them
+
 from bot.bot import Bot
+from bot.shard_coordinator import ShardCoordinator
 
 # Main function
 if __name__ == "__main__":
-    bot = Bot()
-    bot.run()
+    bot = Bot(started_at=started_at)
+    if bot.is_coordinator:
+        ShardCoordinator(bot).run()
+    else:
+        bot.run()
@@ -0,0 +1,78 @@
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional
+import datetime as dt
+
+import numpy as np
+
+from models.signal_decision import SignalDecision
+
+@dataclass
+class BacktestResult:
+    symbol: str
+    granularity: str
+    time: np.ndarray  # Open time of the bar each signal was generated on
+    signal: np.ndarray
+    current_price: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    risk: float
+    fill_index: np.ndarray  # -1 when the pending order never triggered
+    fill_price: np.ndarray
+    exit_index: np.ndarray  # -1 when the position was still open at the end of the data
+    exit_price: np.ndarray
+    pnl: np.ndarray  # In price units, nan for trades that did not complete
+    r_multiple: np.ndarray
+    volume: Optional[np.ndarray] = None
+    profit: Optional[np.ndarray] = None  # In account currency, only when a balance was given
+
+    def __repr__(self):
+        return (f"BacktestResult(symbol={self.symbol}, granularity={self.granularity}, "
+                f"signals={len(self.signal)}, summary={self.summary()})")
+
+    def to_signal_decisions(self) -> List[SignalDecision]:
+        """The SignalDecision stream the live path would have produced, timestamped by bar."""
+        signal_decisions = []
+        for i in range(len(self.signal)):
+            signal_decisions.append(SignalDecision(
+                symbol=self.symbol,
+                signal=int(self.signal[i]),
+                order_type="BUY_STOP" if self.signal[i] == 1 else "SELL_STOP",
+                current_price=float(self.current_price[i]),
+                volume=float(self.volume[i]) if self.volume is not None else None,
+                risk=self.risk,
+                take_profit=float(self.take_profit[i]),
+                stop_loss=float(self.stop_loss[i]),
+                signal_timestamp=dt.datetime.fromtimestamp(int(self.time[i]), tz=dt.timezone.utc).replace(tzinfo=None),
+            ))
+
+        return signal_decisions
+
+    def between(self, start: int, end: int) -> "BacktestResult":
+        """The signals generated on bars opening in ``[start, end)``, as views of these arrays."""
+        first, last = np.searchsorted(self.time, [start, end], side="left")
+        return replace(self, **{
+            field.name: getattr(self, field.name)[first:last]
+            for field in fields(self) if isinstance(getattr(self, field.name), np.ndarray)
+        })
+
+    def summary(self) -> Dict[str, float]:
+        closed = ~np.isnan(self.pnl)
+        wins = self.pnl[closed] > 0
+        gains = self.pnl[closed][wins].sum()
+        losses = -self.pnl[closed][~wins].sum()
+        r_multiple = self.r_multiple[closed & np.isfinite(self.r_multiple)]
+
+        summary = {
+            "signals": int(len(self.signal)),
+            "filled": int((self.fill_index >= 0).sum()),
+            "closed": int(closed.sum()),
+            "win_rate": float(wins.mean()) if wins.size else 0.0,
+            "total_pnl": float(self.pnl[closed].sum()),
+            "profit_factor": float(gains / losses) if losses > 0 else float("inf") if gains > 0 else 0.0,
+            "total_r": float(r_multiple.sum()),
+            "mean_r": float(r_multiple.mean()) if r_multiple.size else 0.0,
+        }
+        if self.profit is not None:
+            summary["profit"] = float(np.nansum(self.profit))
+
+        return summary
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+import constants.defs as defs
+
+@dataclass
+class BarStorage:
+    enabled: bool = True
+    path: str = defs.BAR_STORE_PATH  # Root directory of the candle files, one per symbol and granularity
+    backfill_bars: int = defs.CANDLE_COUNT  # Most candles requested from the terminal to fill a gap in the store
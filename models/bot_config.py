@@ -1,8 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from models.bar_storage import BarStorage
 from models.logging import LoggingConfig
+from models.monitoring import Monitoring
 # from models.notifications import Notifications
 from models.error_handling import ErrorHandling
+from models.resampling import Resampling
+from models.runtime import Runtime
+from models.scheduling import Scheduling
+from models.sharding import Sharding
 from models.signal_managment import SignalManagement
+from models.tick_recording import TickRecording
 from models.trade_management import TradeManagement
 
 @dataclass
@@ -18,4 +25,11 @@ class BotConfig:
     error_handling: ErrorHandling
     trade_management: TradeManagement
     signal_management: SignalManagement
+    scheduling: Scheduling = field(default_factory=Scheduling)
+    monitoring: Monitoring = field(default_factory=Monitoring)
+    bar_storage: BarStorage = field(default_factory=BarStorage)
+    sharding: Sharding = field(default_factory=Sharding)
+    runtime: Runtime = field(default_factory=Runtime)
+    resampling: Resampling = field(default_factory=Resampling)
+    tick_recording: TickRecording = field(default_factory=TickRecording)
     
@@ -0,0 +1,70 @@
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# DataFrame column names used by strategies for the fields of the terminal's rate array
+COLUMNS = {
+    "Time": "time",
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "tick_volume",
+    "_Volume": "real_volume",
+    "Spread": "spread",
+}
+
+class Candles:
+    """Zero-copy view of a rate array as returned by ``copy_rates_from_pos``.
+
+    Columns are read with the same names as the configured DataFrame, ``candles['Close']``
+    or ``candles.Close``, and come back as NumPy views of the array. ``Time`` is the
+    ``time`` field viewed as ``datetime64[s]``. ``to_df`` builds the DataFrame only when
+    a strategy needs pandas, and keeps it for later calls.
+    """
+
+    __slots__ = ("rates", "_df")
+
+    def __init__(self, rates: np.ndarray):
+        self.rates = rates
+        self._df: Optional["pd.DataFrame"] = None
+
+    def __len__(self):
+        return len(self.rates)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            column = self.rates[COLUMNS.get(key, key)]
+            return column.view("datetime64[s]") if key == "Time" else column
+        return Candles(self.rates[key])
+
+    def __getattr__(self, name):
+        if name in COLUMNS:
+            return self[name]
+        raise AttributeError(name)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.rates) == 0
+
+    @property
+    def columns(self):
+        return [name for name, field in COLUMNS.items() if field in self.rates.dtype.names]
+
+    def to_df(self) -> "pd.DataFrame":
+        if self._df is None:
+            import pandas as pd
+
+            df = pd.DataFrame(self.rates)
+            df.time = pd.to_datetime(df.time, unit="s")
+            df.rename(columns={field: name for name, field in COLUMNS.items()}, inplace=True)
+            self._df = df
+        return self._df
+
+    def __repr__(self):
+        if self.empty:
+            return "Candles(bars=0)"
+        return f"Candles(bars={len(self)}, first={self['Time'][0]}, last={self['Time'][-1]})"
@@ -1,5 +1,33 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict
+
+import constants.defs as defs
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """One indicator as declared in configuration.json, equal specs are computed once per (symbol, granularity)."""
+    type: str  # sma, ema, rsi, bollinger, atr, min or max
+    window: int
+    source: str = "close"  # Candle field the indicator reads: high, low or close, atr reads all three
+    deviations: float = 2.0  # Width of Bollinger bands in standard deviations
+
+def default_definitions() -> Dict[str, IndicatorSpec]:
+    # What make_decision reads, a strategy may redefine any of them and add its own
+    return {
+        "short_sma": IndicatorSpec("sma", 5),
+        "long_sma": IndicatorSpec("sma", 20),
+        "lowest_low": IndicatorSpec("min", defs.CANDLE_COUNT, source="low"),
+        "highest_high": IndicatorSpec("max", defs.CANDLE_COUNT, source="high"),
+    }
 
 @dataclass
 class Indicators:
-    pass
\ No newline at end of file
+    definitions: Dict[str, IndicatorSpec] = field(default_factory=default_definitions)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Indicators":
+        """``config`` maps a name to a spec, e.g. ``{"atr": {"type": "atr", "window": 14}}``."""
+        definitions = default_definitions()
+        for name, spec in config.items():
+            definitions[name] = IndicatorSpec(**spec)
+        return cls(definitions)
@@ -1,7 +1,4 @@
-from dataclasses import dataclass
-
-
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 @dataclass
@@ -13,7 +10,16 @@ class Logging:
 class CloudLogging:
     enabled: bool
 
+@dataclass
+class QueueLogging:
+    enabled: bool = False
+    max_size: int = 10000  # Records held before new ones are dropped
+    batch_size: int = 256  # Records written per batch
+    flush_interval: float = 0.5  # Seconds a record may wait for its batch to fill
+
 @dataclass
 class LoggingConfig:
     directories: dict
-    cloud_logging: Optional[CloudLogging]  # Cloud logging is optional
\ No newline at end of file
+    cloud_logging: Optional[CloudLogging]  # Cloud logging is optional
+    queue: QueueLogging = field(default_factory=QueueLogging)
+    level: str = "DEBUG"  # Records below this level are discarded before they are formatted
\ No newline at end of file
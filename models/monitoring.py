@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+@dataclass
+class Monitoring:
+    metrics_port: int = 0  # Port of the local /metrics endpoint, 0 to disable it
+    metrics_host: str = "127.0.0.1"
+    summary_interval: float = 60.0  # Seconds between metrics summary lines in the main log, 0 to disable them
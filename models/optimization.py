@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+def default_parameters() -> Dict[str, List[float]]:
+    return {
+        "short_window": [3, 5, 8, 13],
+        "long_window": [20, 30, 50, 100],
+        "profit_ratio": [1.0, 1.5, 2.0, 3.0],
+    }
+
+@dataclass
+class Optimization:
+    parameters: Dict[str, List[float]] = field(default_factory=default_parameters)  # Values to try per parameter, the strategy's own for the rest
+    samples: int = 0  # Random combinations of the grid to try, 0 tries all of them
+    seed: int = 0
+    bars: int = 375000  # Candles swept over per symbol and granularity, about a year of M1
+    splits: int = 4  # Walk-forward splits, each an in-sample window followed by an out-of-sample one
+    train_ratio: float = 3.0  # In-sample candles per out-of-sample candle of a split
+    rank_by: List[str] = field(default_factory=lambda: ["total_r", "profit_factor"])  # BacktestResult.summary() keys, averaged over the out-of-sample windows
+    min_trades: int = 30  # Closed trades a combination needs in every out-of-sample window to be ranked
+    balance: float = 10000.0  # Account balance trades are sized against, so risk shows in profit
+    processes: int = 0  # Worker processes, 0 for one per core
+    top: int = 20  # Combinations reported per symbol and granularity
@@ -0,0 +1,6 @@
+from dataclasses import dataclass
+
+@dataclass
+class Resampling:
+    enabled: bool = True  # Build a symbol's higher granularities from its finest configured one
+    session_offset_minutes: int = 0  # Minutes after broker midnight at which H4 and daily candles open
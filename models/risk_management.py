@@ -1,4 +1,7 @@
 from dataclasses import dataclass
+from typing import Optional
+
+import constants.defs as defs
 
 @dataclass
 class RiskManagement:
@@ -6,4 +9,7 @@ class RiskManagement:
     max_stop_loss_percentage: float
     take_profit_ratio: float
     max_concurrent_trades: int
-    max_daily_loss_percentage: float
\ No newline at end of file
+    max_daily_loss_percentage: float
+    symbol_spec_ttl: float = defs.SYMBOL_SPEC_TTL  # Seconds a symbol's contract fields are reused for lot sizing
+    account_snapshot_ttl: float = defs.ACCOUNT_SNAPSHOT_TTL  # Seconds the account balance is reused for lot sizing
+    daily_pnl_snapshot: Optional[str] = defs.DAILY_PNL_SNAPSHOT  # File the daily P&L ledger resumes from, None to keep it in memory
@@ -0,0 +1,6 @@
+from dataclasses import dataclass
+
+@dataclass
+class Runtime:
+    mode: str = "threads"  # "threads", or "asyncio" to run the loops as coroutines on one event loop
+    terminal_workers: int = 8  # Threads the asyncio runtime runs blocking terminal calls on
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+@dataclass
+class Scheduling:
+    grace_seconds: float = 1.0  # Wait after a candle closes before polling for the next one
+    retry_seconds: float = 1.0  # First retry delay when the new candle is not there yet, doubled each try
+    max_retry_seconds: float = 60.0
+    skip_weekends: bool = True
+    warm_start_workers: int = 8  # Pairs whose history is loaded at the same time on startup
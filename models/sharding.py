@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+@dataclass
+class Sharding:
+    processes: int = 1  # Worker processes the tradable symbols are split across, 1 runs everything in one process
+    restart_workers: bool = True  # Start a worker again if its process dies
+    shared_candles: bool = True  # The coordinator polls and fetches the candles once and publishes them to the workers in shared memory
@@ -16,6 +16,7 @@ class SignalDecision:
     signal_timestamp: datetime
     break_of_structure: Optional[bool] = None
     granularity_ctf_granularity: Optional[str] = None
+    enqueued_at: Optional[float] = None  # Epoch time the signal was queued for execution
     
     def __repr__(self):
         return f"SignalDecision(): symbol={self.symbol}, order_type={self.order_type}, signal_timestamp={self.signal_timestamp}"
@@ -2,4 +2,10 @@ from dataclasses import dataclass
 
 @dataclass
 class SignalManagement:
-    trade_processor: bool
\ No newline at end of file
+    trade_processor: bool
+    evaluation_workers: int = 4  # Strategies evaluated in parallel when candles close together
+    evaluation_timeout: float = 30.0  # Seconds a strategy evaluation may run once started before its signal is dropped
+    tick_interval: float = 1.0  # Seconds between tick polls while entries are pending
+    entry_expiry_bars: int = 3  # Bars of its granularity a pending entry is watched for, 0 to never expire
+    dispatch_batch_size: int = 16  # Signals the executor drains from the queue per wake up
+    order_concurrency: int = 1  # Orders sent to the broker at once, 1 sends them one after another
@@ -0,0 +1,33 @@
+from dataclasses import dataclass, field
+import time
+from typing import Dict, List, Optional
+
+@dataclass
+class StartupReport:
+    stages: Dict[str, float] = field(default_factory=dict)  # Wall seconds per startup stage, in the order they ran
+    pairs: int = 0  # Distinct (symbol, granularity) pairs warmed up
+    duplicate_pairs: int = 0  # Strategies that share a pair with another strategy
+    workers: int = 0
+    slowest_pair: Optional[str] = None
+    slowest_pair_seconds: float = 0.0
+    failed_pairs: List[str] = field(default_factory=list)
+
+    def mark(self, stage: str, since: float) -> float:
+        """Record the seconds from ``since`` (a perf_counter value) as ``stage``, returns now."""
+        now = time.perf_counter()
+        self.stages[stage] = now - since
+        return now
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stages.values())
+
+    def __str__(self):
+        stages = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.stages.items())
+        report = (f"startup {self.total_seconds:.3f}s ({stages}); {self.pairs} pairs, "
+                  f"{self.duplicate_pairs} duplicates, {self.workers} workers")
+        if self.slowest_pair is not None:
+            report += f", slowest {self.slowest_pair} {self.slowest_pair_seconds:.3f}s"
+        if self.failed_pairs:
+            report += f", failed {', '.join(self.failed_pairs)}"
+        return report
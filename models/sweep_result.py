@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+@dataclass
+class SweepResult:
+    parameters: Dict[str, float]
+    train: List[Dict[str, float]] = field(default_factory=list)  # BacktestResult.summary() per in-sample window
+    test: List[Dict[str, float]] = field(default_factory=list)  # BacktestResult.summary() per out-of-sample window
+
+    def score(self, metric: str) -> float:
+        """Mean of ``metric`` over the out-of-sample windows."""
+        return sum(summary.get(metric, 0.0) for summary in self.test) / len(self.test) if self.test else 0.0
+
+    @property
+    def min_trades(self) -> int:
+        return min((summary["closed"] for summary in self.test), default=0)
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+
+from utils.utils import get_decimals_places
+
+@dataclass
+class SymbolSpec:
+    symbol: str
+    trade_tick_value: float
+    trade_tick_size: float
+    volume_step: float
+    volume_min: float
+    volume_max: float
+    digits: int
+    volume_decimals: int  # Decimal places of volume_step, what volumes are rounded to
+    price_decimals: int  # Decimal places of trade_tick_size, what prices are rounded to
+    fetched_at: float
+
+    @classmethod
+    def from_symbol_info(cls, symbol: str, symbol_info, fetched_at: float) -> "SymbolSpec":
+        return cls(
+            symbol=symbol,
+            trade_tick_value=symbol_info.trade_tick_value,
+            trade_tick_size=symbol_info.trade_tick_size,
+            volume_step=symbol_info.volume_step,
+            volume_min=symbol_info.volume_min,
+            volume_max=symbol_info.volume_max,
+            digits=symbol_info.digits,
+            volume_decimals=get_decimals_places(symbol_info.volume_step),
+            price_decimals=get_decimals_places(symbol_info.trade_tick_size),
+            fetched_at=fetched_at,
+        )
+
+    def __repr__(self):
+        return (f"SymbolSpec(symbol={self.symbol}, tick_value={self.trade_tick_value}, "
+                f"tick_size={self.trade_tick_size}, volume_step={self.volume_step})")
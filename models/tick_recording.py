@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+import constants.defs as defs
+
+@dataclass
+class TickRecording:
+    enabled: bool = False
+    path: str = defs.TICK_STORE_PATH  # Root directory of the tick files, one per symbol
+    buffer_ticks: int = 4096  # Ticks of a symbol held in memory before they are written
+    flush_interval: float = 5.0  # Most seconds a recorded tick waits before it is written
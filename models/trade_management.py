@@ -3,4 +3,6 @@ from dataclasses import dataclass
 @dataclass
 class TradeManagement:
     trailing_stop: bool
-    partial_close: bool
\ No newline at end of file
+    partial_close: bool
+    trailing_min_step: float = 0.0001  # Smallest stop move sent to the broker, as a fraction of the open price
+    monitor_interval: float = 5.0  # Seconds between open position checks
\ No newline at end of file
@@ -0,0 +1,324 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.metatrader_api import MT5
+from models.backtest_result import BacktestResult
+from models.individual_strategy import IndividualStrategy
+from strategy.strategy import decision_windows
+from utils.utils import get_decimals_places
+
+# Bars per block of the first-crossing index
+CROSSING_BLOCK = 8
+
+def rolling_extreme(values: np.ndarray, window: int, ufunc) -> np.ndarray:
+    """Rolling min or max (``np.minimum``/``np.maximum``) in O(n) using block prefix and suffix scans."""
+    n = len(values)
+    result = np.full(n, np.nan)
+    if n < window:
+        return result
+
+    fill = np.inf if ufunc is np.minimum else -np.inf
+    padded = np.concatenate((values, np.full((-n) % window, fill))).reshape(-1, window)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    end = np.arange(window - 1, n)
+    result[window - 1:] = ufunc(suffix[end - window + 1], prefix[end])
+    return result
+
+class CrossingIndex:
+    """Answers "first index >= start whose value is <= threshold" for many queries at once.
+
+    Values are split into blocks of ``CROSSING_BLOCK`` bars with a sparse table of block
+    minimums on top, so each query scans at most two blocks plus O(log n) table lookups
+    no matter how far away the crossing is.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.length = len(values)
+        self.values = np.concatenate((values, np.full((-self.length) % CROSSING_BLOCK + CROSSING_BLOCK, np.inf)))
+        block_min = self.values.reshape(-1, CROSSING_BLOCK).min(axis=1)
+
+        # table[k][b] = min(block_min[b:b + 2 ** k])
+        self.table = [block_min]
+        while 2 ** len(self.table) <= len(block_min):
+            previous = self.table[-1]
+            step = 2 ** (len(self.table) - 1)
+            self.table.append(np.minimum(previous, np.concatenate((previous[step:], np.full(step, np.inf)))))
+
+    def first(self, start: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+        result = np.full(len(start), -1, dtype=np.int64)
+        start = np.asarray(start, dtype=np.int64)
+        threshold = np.asarray(threshold, dtype=np.float64)
+        valid = start < self.length
+        result[valid] = self._first(start[valid], threshold[valid])
+        result[result >= self.length] = -1
+        return result
+
+    def _first(self, start, threshold):
+        offsets = np.arange(CROSSING_BLOCK)
+
+        # Remainder of the block holding ``start``
+        block = start // CROSSING_BLOCK
+        cells = block[:, None] * CROSSING_BLOCK + offsets
+        hits = (self.values[cells] <= threshold[:, None]) & (cells >= start[:, None])
+        found = hits.any(axis=1)
+        result = np.where(found, cells[np.arange(len(start)), hits.argmax(axis=1)], -1)
+
+        # Skip whole blocks whose minimum stays above the threshold
+        rows = np.flatnonzero(~found)
+        position = block[rows] + 1
+        blocks = len(self.table[0])
+        for level in range(len(self.table) - 1, -1, -1):
+            step = 2 ** level
+            inside = position < blocks
+            skip = np.zeros(len(rows), dtype=bool)
+            skip[inside] = self.table[level][position[inside]] > threshold[rows][inside]
+            position = np.where(skip, position + step, position)
+
+        inside = position < blocks
+        rows, position = rows[inside], position[inside]
+        cells = position[:, None] * CROSSING_BLOCK + offsets
+        hits = self.values[cells] <= threshold[rows, None]
+        result[rows] = cells[np.arange(len(rows)), hits.argmax(axis=1)]
+        return result
+
+def first_crossing(low: CrossingIndex, negated_high: CrossingIndex, is_buy: np.ndarray, start: np.ndarray,
+                   below: np.ndarray, above: np.ndarray) -> np.ndarray:
+    """First bar >= start where low <= ``below`` or high >= ``above``, -1 if it never happens."""
+    buy_rows, sell_rows = np.flatnonzero(is_buy), np.flatnonzero(~is_buy)
+    index = np.full(len(start), -1, dtype=np.int64)
+    index[buy_rows] = low.first(start[buy_rows], below[buy_rows])
+    index[sell_rows] = negated_high.first(start[sell_rows], -above[sell_rows])
+    return index
+
+class BacktestData:
+    """Bars of one symbol and granularity with what every backtest over them shares.
+
+    The crossing indexes are built once and the rolling means and extremes once per window,
+    so backtesting many parameter sets over the same bars only pays for their signals and exits.
+    """
+
+    def __init__(self, rates: np.ndarray):
+        self.time = np.ascontiguousarray(rates["time"])
+        self.close = np.ascontiguousarray(rates["close"], dtype=np.float64)
+        self.high = np.ascontiguousarray(rates["high"], dtype=np.float64)
+        self.low = np.ascontiguousarray(rates["low"], dtype=np.float64)
+        self.open = np.ascontiguousarray(rates["open"], dtype=np.float64)
+        self.length = len(self.close)
+        self.low_index = CrossingIndex(self.low)
+        self.negated_high_index = CrossingIndex(-self.high)
+        self.means: Dict[int, np.ndarray] = {}
+        self.extremes: Dict[Tuple[int, bool], np.ndarray] = {}
+
+    def sma(self, window: int) -> np.ndarray:
+        # Same rolling means as run_strategy, computed once over the whole history
+        if window not in self.means:
+            self.means[window] = pd.Series(self.close).rolling(window=window).mean().to_numpy()
+        return self.means[window]
+
+    def lowest_low(self, window: int) -> np.ndarray:
+        if (window, False) not in self.extremes:
+            self.extremes[(window, False)] = rolling_extreme(self.low, window, np.minimum)
+        return self.extremes[(window, False)]
+
+    def highest_high(self, window: int) -> np.ndarray:
+        if (window, True) not in self.extremes:
+            self.extremes[(window, True)] = rolling_extreme(self.high, window, np.maximum)
+        return self.extremes[(window, True)]
+
+class BacktestEntries:
+    """Signals of one set of windows with their fills and the bars their stop losses are hit on.
+
+    None of it depends on the profit ratio or risk, so one instance serves every
+    ``backtest`` of them with the same windows. Buy stops are the lowest low of ``lookback``
+    bars, sell stops the highest high of ``high_lookback`` bars (``lookback`` by default).
+    """
+
+    def __init__(self, data: BacktestData, lookback: int, short_window: int, long_window: int, high_lookback: Optional[int] = None):
+        self.data = data
+        short_sma = data.sma(short_window)
+        long_sma = data.sma(long_window)
+        high_lookback = lookback if high_lookback is None else high_lookback
+
+        # Only full windows, as the live bot always evaluates ``lookback`` candles
+        bars = np.arange(max(lookback, high_lookback) - 1, data.length)
+        signal = np.where(short_sma[bars] > long_sma[bars], 1, np.where(short_sma[bars] < long_sma[bars], -1, 0))
+        self.bars = bars[signal != 0]
+        self.signal = signal[signal != 0]
+        self.is_buy = self.signal == 1
+
+        self.current_price = data.close[self.bars]
+        self.stop_loss = np.where(self.is_buy, data.lowest_low(lookback)[self.bars], data.highest_high(high_lookback)[self.bars])
+
+        # Stop entries trigger once price trades through the signal bar's close
+        self.fill_index = first_crossing(data.low_index, data.negated_high_index, ~self.is_buy, self.bars + 1,
+                                         self.current_price, self.current_price)
+        filled = self.fill_index >= 0
+        self.fill_price = np.full(len(self.bars), np.nan)
+        self.fill_price[filled] = np.where(
+            self.is_buy[filled],
+            np.maximum(self.current_price[filled], data.open[self.fill_index[filled]]),
+            np.minimum(self.current_price[filled], data.open[self.fill_index[filled]]),
+        )
+
+        self.rows = np.flatnonzero(filled)
+        self.after_fill = self.fill_index[self.rows] + 1
+        stop_index = first_crossing(data.low_index, data.negated_high_index, self.is_buy[self.rows], self.after_fill,
+                                    self.stop_loss[self.rows], self.stop_loss[self.rows])
+        self.stop_index = np.where(stop_index < 0, np.iinfo(np.int64).max, stop_index)
+        self.last_exits: Optional[Tuple[float, tuple]] = None  # (profit_ratio, exits), risk alone does not move them
+
+    def exits(self, profit_ratio: float) -> tuple:
+        """Take profit, exit bar, exit price, pnl and R multiple of every signal at ``profit_ratio``."""
+        if self.last_exits is not None and self.last_exits[0] == profit_ratio:
+            return self.last_exits[1]
+
+        data, rows, is_buy, signal = self.data, self.rows, self.is_buy, self.signal
+        current_price, stop_loss = self.current_price, self.stop_loss
+        take_profit = np.where(
+            is_buy,
+            current_price + (current_price - stop_loss) * profit_ratio,
+            current_price - (stop_loss - current_price) * profit_ratio,
+        )
+
+        # Exit on whichever of stop loss and take profit is reached first, stop loss on ties
+        target_index = first_crossing(data.low_index, data.negated_high_index, ~is_buy[rows], self.after_fill,
+                                      take_profit[rows], take_profit[rows])
+        target_index = np.where(target_index < 0, np.iinfo(np.int64).max, target_index)
+        stopped = self.stop_index <= target_index
+
+        exit_index = np.full(len(self.bars), -1, dtype=np.int64)
+        exit_index[rows] = np.minimum(self.stop_index, target_index)
+        exit_index[exit_index == np.iinfo(np.int64).max] = -1
+        closed = exit_index[rows] >= 0
+        closed_rows, stopped = rows[closed], stopped[closed]
+
+        exit_price = np.full(len(self.bars), np.nan)
+        exit_price[closed_rows] = np.where(stopped, stop_loss[closed_rows], take_profit[closed_rows])
+        pnl = (exit_price - self.fill_price) * signal
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r_multiple = pnl / np.abs(self.fill_price - stop_loss)
+
+        exits = (take_profit, exit_index, exit_price, pnl, r_multiple)
+        self.last_exits = (profit_ratio, exits)
+        return exits
+
+    def backtest(
+        self,
+        symbol: str,
+        strategy: IndividualStrategy,
+        balance: Optional[float] = None,
+        trade_tick_value: Optional[float] = None,
+        trade_tick_size: Optional[float] = None,
+        volume_step: Optional[float] = None,
+    ) -> BacktestResult:
+        current_price, stop_loss = self.current_price, self.stop_loss
+        take_profit, exit_index, exit_price, pnl, r_multiple = self.exits(strategy.profit_ratio)
+
+        volume = profit = None
+        if balance is not None and trade_tick_value and trade_tick_size and volume_step:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                num_pips = np.abs(current_price - stop_loss) / trade_tick_size
+                volume = np.round(strategy.risk * balance / (num_pips * trade_tick_value), get_decimals_places(volume_step))
+            profit = pnl / trade_tick_size * trade_tick_value * volume
+
+        return BacktestResult(
+            symbol=symbol,
+            granularity=strategy.granularity,
+            time=self.data.time[self.bars],
+            signal=self.signal,
+            current_price=current_price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            risk=strategy.risk,
+            fill_index=self.fill_index,
+            fill_price=self.fill_price,
+            exit_index=exit_index,
+            exit_price=exit_price,
+            pnl=pnl,
+            r_multiple=r_multiple,
+            volume=volume,
+            profit=profit,
+        )
+
+def run_backtest(
+    rates: np.ndarray,
+    symbol: str,
+    strategy: IndividualStrategy,
+    lookback: Optional[int] = None,
+    short_window: Optional[int] = None,
+    long_window: Optional[int] = None,
+    balance: Optional[float] = None,
+    trade_tick_value: Optional[float] = None,
+    trade_tick_size: Optional[float] = None,
+    volume_step: Optional[float] = None,
+) -> BacktestResult:
+    """Vectorized equivalent of calling run_strategy on every ``lookback`` bar window of ``rates``.
+
+    The windows not given are those of ``strategy.indicators``, ``lookback`` sets both the
+    lowest low and the highest high window. ``rates`` is a structured array as returned by
+    ``copy_rates_from_pos``. Each signal is placed
+    as a stop order at the signal bar's close, fills on the first later bar that trades through
+    it and exits at its stop loss or take profit (stop loss first if a bar touches both). When
+    ``balance`` and the symbol's tick value/size and volume step are given, volumes are sized as
+    in calculate_lot_size and profit is reported in account currency.
+    """
+    windows = decision_windows(strategy.indicators)
+    entries = BacktestEntries(
+        BacktestData(rates),
+        lookback if lookback is not None else windows["lowest_low"],
+        short_window if short_window is not None else windows["short_sma"],
+        long_window if long_window is not None else windows["long_sma"],
+        lookback if lookback is not None else windows["highest_high"],
+    )
+    return entries.backtest(symbol, strategy, balance, trade_tick_value, trade_tick_size, volume_step)
+
+def load_rates(mt5: MT5, symbol: str, granularity: str, count: int) -> np.ndarray:
+    """The latest ``count`` closed bars from ``mt5.data_db`` when it holds all of them, otherwise from the terminal.
+
+    The stored bars are used when the oldest of them is the terminal's ``count``-th bar before
+    the forming one: ``count`` stored bars from there have no gap and reach the last closed bar.
+    Bars fetched from the terminal are stored for the next run, the forming one is left out of both.
+    """
+    if mt5.data_db is not None:
+        rates = mt5.data_db.query_candles(symbol, granularity, count=count)
+        first = mt5.mt5.copy_rates_from_pos(symbol, mt5.set_query_timeframe(granularity), count, 1)
+        if first is not None and len(first) and len(rates) == count and rates["time"][0] == first["time"][0]:
+            return rates
+
+    # Behind the terminal or missing bars
+    rates = mt5.query_historic_data(symbol, count + 1, granularity)
+    if rates is None or len(rates) == 0:
+        raise ValueError(f"No bars returned by the terminal for {symbol} in {granularity}")
+    closed = rates[:-1]  # The last candle is still forming
+    if mt5.data_db is not None:
+        mt5.data_db.write_candles(symbol, granularity, closed)
+    return closed
+
+def run_backtests(
+    mt5: MT5,
+    tradable_symbols: Dict[str, List[IndividualStrategy]],
+    count: int,
+    balance: Optional[float] = None,
+) -> Dict[str, List[BacktestResult]]:
+    """Backtest every configured strategy, with its own indicator windows, on the latest ``count`` bars (see load_rates)."""
+    results: Dict[str, List[BacktestResult]] = {}
+    for symbol, strategies in tradable_symbols.items():
+        symbol_info = mt5.mt5.symbol_info(symbol)
+        results[symbol] = []
+
+        for strategy in strategies:
+            results[symbol].append(run_backtest(
+                load_rates(mt5, symbol, strategy.granularity, count),
+                symbol,
+                strategy,
+                balance=balance,
+                trade_tick_value=symbol_info.trade_tick_value,
+                trade_tick_size=symbol_info.trade_tick_size,
+                volume_step=symbol_info.volume_step,
+            ))
+
+    return results
@@ -0,0 +1,321 @@
+from collections import deque
+import math
+import threading
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+import constants.defs as defs
+from models.indicators import IndicatorSpec, Indicators
+
+class RollingMean:
+    """O(1) per bar rolling mean that repeats pandas' ``rolling(window).mean()`` arithmetic.
+
+    pandas keeps a Kahan compensated running sum with separate compensations for added and
+    removed values, so doing the same steps in the same order gives bit-identical output
+    for the same sequence of values.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.sum = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.neg_ct = 0
+        self.consecutive_same = 0
+        self.prev_value = math.nan
+
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self._add(value)
+        self.values.append(value)
+        return self.mean
+
+    def _add(self, value: float):
+        y = value - self.compensation_add
+        t = self.sum + y
+        self.compensation_add = t - self.sum - y
+        self.sum = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct += 1
+
+        if value == self.prev_value:
+            self.consecutive_same += 1
+        else:
+            self.consecutive_same = 1
+        self.prev_value = value
+
+    def _remove(self, value: float):
+        y = -value - self.compensation_remove
+        t = self.sum + y
+        self.compensation_remove = t - self.sum - y
+        self.sum = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct -= 1
+
+    @property
+    def value(self) -> float:
+        return self.mean
+
+    @property
+    def mean(self) -> float:
+        nobs = len(self.values)
+        if nobs < self.window:
+            return math.nan
+
+        result = self.sum / nobs
+        if self.consecutive_same >= nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == nobs and result > 0:
+            result = 0.0
+        return result
+
+class RollingExtreme:
+    """O(1) amortized rolling min or max over the last ``window`` values using a monotonic deque."""
+
+    def __init__(self, window: int, is_max: bool = False):
+        self.window = window
+        self.is_max = is_max
+        self.candidates = deque()  # (position, value), values monotonic from the front
+        self.position = 0
+
+    def update(self, value: float) -> float:
+        if self.is_max:
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.position, value))
+
+        if self.candidates[0][0] <= self.position - self.window:
+            self.candidates.popleft()
+        self.position += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.candidates[0][1] if self.candidates else math.nan
+
+class ExponentialMean:
+    """Exponential moving average with ``alpha = 2 / (window + 1)``, as pandas' ``ewm(span=window, adjust=False)``."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.average = math.nan
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        self.average = value if self.count == 0 else self.average + self.alpha * (value - self.average)
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.average if self.count >= self.window else math.nan
+
+class WilderAverage:
+    """Wilder's smoothing: the plain mean of the first ``window`` values, then ``(previous * (window - 1) + value) / window``."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.average = 0.0
+        self.count = 0
+
+    def update(self, value: float):
+        self.count += 1
+        if self.count <= self.window:
+            self.average += (value - self.average) / self.count
+        else:
+            self.average = (self.average * (self.window - 1) + value) / self.window
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.window
+
+class RelativeStrength:
+    """Wilder's RSI over ``window`` price changes."""
+
+    def __init__(self, window: int):
+        self.gains = WilderAverage(window)
+        self.losses = WilderAverage(window)
+        self.previous = math.nan
+
+    def update(self, value: float) -> float:
+        if not math.isnan(self.previous):
+            change = value - self.previous
+            self.gains.update(max(change, 0.0))
+            self.losses.update(max(-change, 0.0))
+        self.previous = value
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if not self.gains.ready:
+            return math.nan
+        if self.losses.average == 0:
+            return 100.0 if self.gains.average > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + self.gains.average / self.losses.average)
+
+class AverageTrueRange:
+    """Wilder's ATR, the first candle's true range is its high minus its low."""
+
+    def __init__(self, window: int):
+        self.ranges = WilderAverage(window)
+        self.previous_close = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if not math.isnan(self.previous_close):
+            true_range = max(true_range, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.ranges.update(true_range)
+        self.previous_close = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.ranges.average if self.ranges.ready else math.nan
+
+class BollingerBands:
+    """(middle, upper, lower): the rolling mean and ``deviations`` population standard deviations either side."""
+
+    def __init__(self, window: int, deviations: float):
+        self.window = window
+        self.deviations = deviations
+        self.values = deque(maxlen=window)
+
+    def update(self, value: float):
+        self.values.append(value)
+        return self.value
+
+    @property
+    def value(self):
+        # The standard deviation is only needed when a strategy reads the bands, so it is computed here
+        if len(self.values) < self.window:
+            return (math.nan, math.nan, math.nan)
+        values = np.fromiter(self.values, dtype=np.float64, count=self.window)
+        middle = values.mean()
+        width = self.deviations * values.std()
+        return (middle, middle + width, middle - width)
+
+# Indicator type -> the running computation of a spec
+INDICATOR_TYPES: Dict[str, Callable[[IndicatorSpec], object]] = {
+    "sma": lambda spec: RollingMean(spec.window),
+    "ema": lambda spec: ExponentialMean(spec.window),
+    "rsi": lambda spec: RelativeStrength(spec.window),
+    "bollinger": lambda spec: BollingerBands(spec.window, spec.deviations),
+    "atr": lambda spec: AverageTrueRange(spec.window),
+    "min": lambda spec: RollingExtreme(spec.window),
+    "max": lambda spec: RollingExtreme(spec.window, is_max=True),
+}
+SOURCES = ("high", "low", "close")
+
+def validate_spec(spec: IndicatorSpec):
+    if spec.type not in INDICATOR_TYPES:
+        raise ValueError(f"Unknown indicator type {spec.type!r}, expected one of {sorted(INDICATOR_TYPES)}")
+    if spec.source not in SOURCES:
+        raise ValueError(f"Unknown indicator source {spec.source!r}, expected one of {SOURCES}")
+    if spec.window < 1:
+        raise ValueError(f"Indicator window must be at least 1, got {spec.window}")
+
+def feed(spec: IndicatorSpec, indicator) -> Callable[[float, float, float], object]:
+    """Takes a candle's (high, low, close) to the indicator's update."""
+    if spec.type == "atr":
+        return indicator.update
+    index = SOURCES.index(spec.source)
+    return lambda *candle: indicator.update(candle[index])
+
+class IndicatorState:
+    """Running indicators for one (symbol, granularity), fed one closed candle at a time.
+
+    Shared by every StrategyManager on the same symbol and granularity. Candles at or before
+    the last seen time are ignored, so managers can all offer the same candles. Each manager
+    ``require``s the indicators its strategy declares, a spec asked for by several strategies
+    is kept once, so it costs one update per candle however many strategies read it.
+    """
+
+    def __init__(self, lookback: int = defs.CANDLE_COUNT, short_window: int = 5, long_window: int = 20):
+        self.lookback = lookback
+        self.default_specs = (
+            IndicatorSpec("sma", short_window),
+            IndicatorSpec("sma", long_window),
+            IndicatorSpec("min", lookback, source="low"),
+            IndicatorSpec("max", lookback, source="high"),
+        )
+        self.specs: Dict[IndicatorSpec, None] = dict.fromkeys(self.default_specs)  # Ordered set
+        self.lock = threading.Lock()
+        self.reset()
+
+    def require(self, indicators: Indicators) -> int:
+        """Compute the indicators of a strategy too, returns how many were not computed already."""
+        new_specs = [spec for spec in dict.fromkeys(indicators.definitions.values()) if spec not in self.specs]
+        for spec in new_specs:
+            validate_spec(spec)
+
+        with self.lock:
+            new_specs = [spec for spec in new_specs if spec not in self.specs]
+            if new_specs:
+                self.specs.update(dict.fromkeys(new_specs))
+                self._reset()  # The new indicators need the earlier candles, the next run reseeds them all
+            return len(new_specs)
+
+    def reset(self):
+        with self.lock:
+            self._reset()
+
+    def _reset(self):
+        self.indicators = {spec: INDICATOR_TYPES[spec.type](spec) for spec in self.specs}
+        self.feeds = [feed(spec, indicator) for spec, indicator in self.indicators.items()]
+        self.last_time: Optional[int] = None
+        self.close = math.nan
+        self.count = 0
+
+    def update(self, time: int, high: float, low: float, close: float) -> bool:
+        """Add a closed candle, returns False if it was already seen."""
+        with self.lock:
+            if self.last_time is not None and time <= self.last_time:
+                return False
+            self._update(time, high, low, close)
+            return True
+
+    def update_many(self, times: np.ndarray, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> int:
+        """Add the unseen candles of a consecutive run, reseeding from it if candles went missing."""
+        with self.lock:
+            if len(times) == 0:
+                return 0
+            if self.last_time is not None and times[0] > self.last_time:
+                # The run does not overlap what we have, so bars in between may be missing
+                self._reset()
+
+            start = 0 if self.last_time is None else int(np.searchsorted(times, self.last_time, side="right"))
+            for i in range(start, len(times)):
+                self._update(int(times[i]), float(highs[i]), float(lows[i]), float(closes[i]))
+            return len(times) - start
+
+    def _update(self, time: int, high: float, low: float, close: float):
+        for update in self.feeds:
+            update(high, low, close)
+        self.close = close
+        self.last_time = time
+        self.count += 1
+
+    def values(self):
+        """(short_sma, long_sma, lowest_low, highest_high, close) as of the last candle."""
+        with self.lock:
+            return tuple(self.indicators[spec].value for spec in self.default_specs) + (self.close,)
+
+    def values_for(self, indicators: Indicators) -> Dict[str, object]:
+        """Name -> value as of the last candle for each indicator a strategy declares, plus its ``close``."""
+        with self.lock:
+            values = {name: self.indicators[spec].value for name, spec in indicators.definitions.items()}
+            values["close"] = self.close
+            return values
+
+    def __repr__(self):
+        return (f"IndicatorState(lookback={self.lookback}, indicators={len(self.specs)}, count={self.count}, "
+                f"last_time={self.last_time})")
@@ -0,0 +1,279 @@
+"""Parameter sweeps of the configured strategies, ranked on walk-forward splits.
+
+    python -m strategy.optimizer                        # every configured symbol and granularity
+    python -m strategy.optimizer --symbol XAUUSD --granularity M1 --output sweep.json
+
+The "optimization" section of bot/configuration.json sets the values tried per parameter
+(short_window, long_window, lookback, profit_ratio and risk), the walk-forward splits and
+the ranking. The bars are backtested once per combination and each split's in-sample and
+out-of-sample windows are summarised from that one backtest.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from db.db import DataDB
+from models.bar_storage import BarStorage
+from models.indicators import Indicators
+from models.individual_strategy import IndividualStrategy
+from models.optimization import Optimization
+from models.sweep_result import SweepResult
+from models.backtest_result import BacktestResult
+from strategy.backtest import BacktestData, BacktestEntries, load_rates
+from strategy.strategy import decision_windows
+
+# Parameters that change the signals and stops, combinations sharing them share one BacktestEntries
+WINDOW_PARAMETERS = ("short_window", "long_window", "lookback")
+PARAMETERS = WINDOW_PARAMETERS + ("profit_ratio", "risk")
+
+# Reported for windows without a losing trade, an infinite profit factor would swamp every average and is not valid JSON
+MAX_PROFIT_FACTOR = 100.0
+
+Windows = Tuple[int, int, int]
+Split = Tuple[int, int, int]  # Open times of the first in-sample, first out-of-sample and first later bar
+
+@dataclass
+class SweepDataset:
+    """Everything a worker needs to backtest one symbol and granularity."""
+    symbol: str
+    strategy: IndividualStrategy
+    data: BacktestData
+    splits: List[Split]
+    balance: float
+    trade_tick_value: float
+    trade_tick_size: float
+    volume_step: float
+
+# Set once per worker process by the pool initializer
+_dataset: Optional[SweepDataset] = None
+
+def strategy_parameters(strategy: IndividualStrategy) -> Dict[str, float]:
+    """The strategy's own value of every parameter, used for those the sweep does not vary."""
+    windows = decision_windows(strategy.indicators)
+    if windows["lowest_low"] != windows["highest_high"]:
+        raise ValueError(f"lowest_low and highest_high need the same window to be swept as lookback, "
+                         f"got {windows['lowest_low']} and {windows['highest_high']}")
+    return {
+        "short_window": windows["short_sma"],
+        "long_window": windows["long_sma"],
+        "lookback": windows["lowest_low"],
+        "profit_ratio": strategy.profit_ratio,
+        "risk": strategy.risk,
+    }
+
+def parameter_grid(space: Dict[str, List[float]]) -> List[Dict[str, float]]:
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+def sample_parameters(space: Dict[str, List[float]], samples: int, seed: int = 0) -> List[Dict[str, float]]:
+    """``samples`` distinct combinations drawn at random from the grid, without building the grid."""
+    names = list(space)
+    shape = tuple(len(space[name]) for name in names)
+    total = int(np.prod(shape, dtype=np.int64))
+    picks = np.random.default_rng(seed).choice(total, size=min(samples, total), replace=False)
+    positions = np.unravel_index(np.sort(picks), shape)
+    return [{name: space[name][int(position[i])] for name, position in zip(names, positions)} for i in range(len(picks))]
+
+def combinations(optimization: Optimization, defaults: Dict[str, float]) -> List[Dict[str, float]]:
+    unknown = set(optimization.parameters) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown optimization parameters {sorted(unknown)}, expected some of {list(PARAMETERS)}")
+
+    space = {name: list(optimization.parameters.get(name, [defaults[name]])) for name in PARAMETERS}
+    if optimization.samples:
+        swept = sample_parameters(space, optimization.samples, optimization.seed)
+    else:
+        swept = parameter_grid(space)
+    return [parameters for parameters in swept if parameters["short_window"] < parameters["long_window"]]
+
+def walk_forward_splits(times: np.ndarray, splits: int, train_ratio: float) -> List[Split]:
+    """Rolling splits: each in-sample window is followed by an out-of-sample one, the next split starts one window later."""
+    test_bars = int(len(times) / (splits + train_ratio))
+    train_bars = int(test_bars * train_ratio)
+    if test_bars == 0 or train_bars == 0:
+        raise ValueError(f"{len(times)} bars are too few for {splits} walk-forward splits")
+
+    end_time = int(times[-1]) + 1
+    result = []
+    for split in range(splits):
+        train_start = split * test_bars
+        test_start = train_start + train_bars
+        test_end = test_start + test_bars
+        result.append((int(times[train_start]), int(times[test_start]), int(times[test_end]) if test_end < len(times) else end_time))
+    return result
+
+def group_by_windows(parameters: Iterable[Dict[str, float]]) -> Dict[Windows, List[Dict[str, float]]]:
+    groups: Dict[Windows, List[Dict[str, float]]] = {}
+    for combination in parameters:
+        windows = tuple(int(combination[name]) for name in WINDOW_PARAMETERS)
+        groups.setdefault(windows, []).append(combination)
+    return groups
+
+def window_summary(backtest: BacktestResult, start: int, end: int) -> Dict[str, float]:
+    """BacktestResult.summary() of the trades signalled between ``start`` and ``end``, profit factor capped."""
+    summary = backtest.between(start, end).summary()
+    summary["profit_factor"] = min(summary["profit_factor"], MAX_PROFIT_FACTOR)
+    return summary
+
+def init_worker(dataset: SweepDataset):
+    global _dataset
+    _dataset = dataset
+
+def evaluate_group(windows: Windows, group: List[Dict[str, float]]) -> List[SweepResult]:
+    """Backtest the combinations sharing ``windows`` on the worker's dataset."""
+    dataset = _dataset
+    short_window, long_window, lookback = windows
+    entries = BacktestEntries(dataset.data, lookback, short_window, long_window)
+
+    results = []
+    # Combinations that only differ in risk reuse the exits of the one before
+    for parameters in sorted(group, key=lambda parameters: parameters["profit_ratio"]):
+        strategy = replace(dataset.strategy, profit_ratio=parameters["profit_ratio"], risk=parameters["risk"])
+        backtest = entries.backtest(dataset.symbol, strategy, dataset.balance, dataset.trade_tick_value,
+                                    dataset.trade_tick_size, dataset.volume_step)
+        results.append(SweepResult(
+            parameters=parameters,
+            train=[window_summary(backtest, train_start, test_start) for train_start, test_start, _ in dataset.splits],
+            test=[window_summary(backtest, test_start, test_end) for _, test_start, test_end in dataset.splits],
+        ))
+    return results
+
+def rank(results: List[SweepResult], rank_by: List[str], min_trades: int) -> List[SweepResult]:
+    """Combinations with enough out-of-sample trades, best first by each ``rank_by`` metric in turn."""
+    eligible = [result for result in results if result.min_trades >= min_trades]
+    return sorted(eligible, key=lambda result: tuple(result.score(metric) for metric in rank_by), reverse=True)
+
+def walk_forward(results: List[SweepResult], metric: str, min_trades: int) -> List[Dict]:
+    """Per split, the combination that was best in-sample and how it did out of sample."""
+    report = []
+    for split in range(len(results[0].train) if results else 0):
+        eligible = [result for result in results if result.train[split]["closed"] >= min_trades] or results
+        best = max(eligible, key=lambda result: result.train[split].get(metric, 0.0))
+        report.append({"parameters": best.parameters, "train": best.train[split], "test": best.test[split]})
+    return report
+
+def sweep(
+    dataset: SweepDataset,
+    parameters: List[Dict[str, float]],
+    processes: int = 0,
+) -> List[SweepResult]:
+    """Backtest every combination of ``parameters`` on ``dataset``, spread across ``processes`` workers.
+
+    The rolling means and extremes the combinations need are computed here, before the pool
+    starts, so the workers share one copy of the bars and indicators: forked workers see the
+    parent's memory, spawned ones unpickle the dataset once each rather than per task.
+    """
+    groups = group_by_windows(parameters)
+    for short_window, long_window, lookback in groups:
+        dataset.data.sma(short_window)
+        dataset.data.sma(long_window)
+        dataset.data.lowest_low(lookback)
+        dataset.data.highest_high(lookback)
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        init_worker(dataset)
+        return [result for windows, group in groups.items() for result in evaluate_group(windows, group)]
+
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(method),
+                             initializer=init_worker, initargs=(dataset,)) as executor:
+        futures = [executor.submit(evaluate_group, windows, group) for windows, group in groups.items()]
+        return [result for future in futures for result in future.result()]
+
+def optimize(
+    mt5: MT5,
+    symbol: str,
+    strategy: IndividualStrategy,
+    optimization: Optimization,
+    rates: Optional[np.ndarray] = None,
+) -> Dict:
+    """Sweep the parameters of ``strategy`` on ``symbol``, returns the ranked combinations and the walk-forward report."""
+    started = time.perf_counter()
+    if rates is None:
+        rates = load_rates(mt5, symbol, strategy.granularity, optimization.bars)
+    symbol_info = mt5.mt5.symbol_info(symbol)
+    data = BacktestData(rates)
+    dataset = SweepDataset(
+        symbol=symbol,
+        strategy=strategy,
+        data=data,
+        splits=walk_forward_splits(data.time, optimization.splits, optimization.train_ratio),
+        balance=optimization.balance,
+        trade_tick_value=symbol_info.trade_tick_value,
+        trade_tick_size=symbol_info.trade_tick_size,
+        volume_step=symbol_info.volume_step,
+    )
+
+    parameters = combinations(optimization, strategy_parameters(strategy))
+    results = sweep(dataset, parameters, optimization.processes)
+    ranked = rank(results, optimization.rank_by, optimization.min_trades)
+    return {
+        "symbol": symbol,
+        "granularity": strategy.granularity,
+        "bars": len(rates),
+        "combinations": len(results),
+        "seconds": time.perf_counter() - started,
+        "splits": dataset.splits,
+        "ranked": [asdict(result) | {"score": {metric: result.score(metric) for metric in optimization.rank_by}}
+                   for result in ranked[:optimization.top]],
+        "walk_forward": walk_forward(results, optimization.rank_by[0], optimization.min_trades),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="./bot/configuration.json")
+    parser.add_argument("--symbol", help="Only this symbol")
+    parser.add_argument("--granularity", help="Only this granularity")
+    parser.add_argument("--output", help="Write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    with open(args.config) as f:
+        data = json.load(f)
+    optimization = Optimization(**data.get("optimization", {}))
+    bar_storage = BarStorage(**data.get("bar_storage", {}))
+
+    mt5 = MT5()
+    if not mt5.attempt_login():
+        print("Failed to login to MetaTrader.", file=sys.stderr)
+        return 1
+    if bar_storage.enabled:
+        mt5.data_db = DataDB(bar_storage.path)
+
+    reports = []
+    for symbol, strategy_configurations in data["tradable_symbols"].items():
+        if args.symbol is not None and symbol != args.symbol:
+            continue
+        for strategy_configuration in strategy_configurations:
+            if args.granularity is not None and strategy_configuration["granularity"] != args.granularity:
+                continue
+            strategy = IndividualStrategy(indicators=Indicators.from_config(strategy_configuration["indicators"]),
+                                          granularity=strategy_configuration["granularity"],
+                                          risk=strategy_configuration["risk"], profit_ratio=strategy_configuration["profit_ratio"])
+            report = optimize(mt5, symbol, strategy, optimization)
+            reports.append(report)
+
+            print(f"{symbol} {strategy.granularity}: {report['combinations']} combinations over {report['bars']} bars "
+                  f"in {report['seconds']:.1f}s")
+            for result in report["ranked"][:5]:
+                scores = ", ".join(f"{metric} {score:.3f}" for metric, score in result["score"].items())
+                print(f"  {result['parameters']}  {scores}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2, default=float)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
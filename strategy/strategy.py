@@ -1,64 +1,172 @@
-import pandas as pd
+import math
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+import numpy as np
 
 from bot.risk_management import calculate_lot_size
+from models.candles import Candles
+from models.indicators import Indicators
 from models.individual_strategy import IndividualStrategy
 from models.signal_decision import SignalDecision
+from strategy.indicator_state import IndicatorState
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Relative gap between the SMAs below which a Candles decision defers to pandas' rolling means
+SMA_TIE_TOLERANCE = 1e-9
+
+# The indicators make_decision reads and the (type, source) run_strategy and the backtests compute them as
+DECISION_INDICATORS = {
+    "short_sma": ("sma", "close"),
+    "long_sma": ("sma", "close"),
+    "lowest_low": ("min", "low"),
+    "highest_high": ("max", "high"),
+}
+
+def decision_windows(indicators: Indicators) -> Dict[str, int]:
+    """Window of each indicator make_decision reads, for code that computes them from candles rather than an IndicatorState."""
+    windows = {}
+    for name, (indicator_type, source) in DECISION_INDICATORS.items():
+        spec = indicators.definitions[name]
+        if (spec.type, spec.source) != (indicator_type, source):
+            raise ValueError(f"{name} is a {spec.type} of {spec.source}, only a {indicator_type} of {source} can be computed from candles")
+        windows[name] = spec.window
+    return windows
+
+def last_smas(close: np.ndarray, short_window: int, long_window: int):
+    """Last short and long SMA of ``close``, ordered the same way pandas' rolling means are.
+
+    Exact sums of the last closes are enough unless the two means are within rounding of
+    each other (prices on a tick grid tie exactly), then pandas' running sums break the
+    tie as run_strategy on a DataFrame would.
+    """
+    if len(close) < max(short_window, long_window):
+        return np.nan, np.nan
+
+    short_sma = math.fsum(close[-short_window:].tolist()) / short_window
+    long_sma = math.fsum(close[-long_window:].tolist()) / long_window
+    if abs(short_sma - long_sma) <= SMA_TIE_TOLERANCE * abs(long_sma):
+        import pandas as pd
+
+        series = pd.Series(close)
+        short_sma = series.rolling(window=short_window).mean().iloc[-1]
+        long_sma = series.rolling(window=long_window).mean().iloc[-1]
+    return short_sma, long_sma
 
 # Function to articulate run_strategy
 def run_strategy(
-    candle_data: pd.DataFrame,
+    candle_data: Union["pd.DataFrame", Candles],
     symbol: str,
     strategy: IndividualStrategy,
     log_message: callable,
     log_to_error: callable,
 ) -> Optional[SignalDecision]:
     try:
-        log_message(f"run_strategy: running strategy analysis", symbol)
-
-        # Initialize variables
-        signal = 0
-        sl = 0  # Stop Loss
-        tp = 0  # Take Profit
-
-        # Calculate short and long SMAs based on the trade settings
-        short_sma = candle_data['Close'].rolling(window=5).mean()
-        long_sma = candle_data['Close'].rolling(window=20).mean()
-
-        # Check for buy or sell signals
-        if short_sma.iloc[-1] > long_sma.iloc[-1]:
-            signal = 1  # Buy signal
-            order_type = "BUY_STOP"
-            sl = candle_data['Low'].min()  # Example stop loss: Lowest price in the dataset
-            tp = candle_data['Close'].iloc[-1] + (candle_data['Close'].iloc[-1] - sl) * strategy.profit_ratio  # Take profit calculation
-        elif short_sma.iloc[-1] < long_sma.iloc[-1]:
-            signal = -1  # Sell signal
-            order_type = "SELL_STOP"
-            sl = candle_data['High'].max()  # Example stop loss: Highest price in the dataset
-            tp = candle_data['Close'].iloc[-1] - (sl - candle_data['Close'].iloc[-1]) * strategy.profit_ratio  # Take profit calculation
-
-        # If a signal is generated, return a SignalDecision object
-        if signal != 0:
-            signal_decision = SignalDecision(
-                signal=signal,
-                symbol=symbol,
-                order_type=order_type,
-                current_price=candle_data['Close'].iloc[-1],
-                volume=None,
-                risk=strategy.risk,
-                take_profit=tp,
-                stop_loss=sl,
-                signal_timestamp=datetime.now()
-            )
-            
-            log_message(f"run_strategy: Signal generated for {symbol}: {signal_decision}", symbol)
-            return signal_decision
-
-        log_message(f"run_strategy: completed strategy analysis, no signal generated", symbol)
-        return None  # No trade signal generated
+        log_message("run_strategy: running strategy analysis", symbol)
+        windows = decision_windows(strategy.indicators)
+
+        if isinstance(candle_data, Candles):
+            # Only the last values are used, so average the last closes without building a DataFrame
+            close = candle_data['Close']
+            short_sma, long_sma = last_smas(close, windows["short_sma"], windows["long_sma"])
+            low, high = candle_data['Low'], candle_data['High']
+        else:
+            # Calculate short and long SMAs based on the trade settings
+            close = candle_data['Close'].to_numpy()
+            short_sma = candle_data['Close'].rolling(window=windows["short_sma"]).mean().iloc[-1]
+            long_sma = candle_data['Close'].rolling(window=windows["long_sma"]).mean().iloc[-1]
+            low, high = candle_data['Low'].to_numpy(), candle_data['High'].to_numpy()
+
+        return make_decision(
+            short_sma=short_sma,
+            long_sma=long_sma,
+            lowest_low=low[-windows["lowest_low"]:].min(),  # Stop loss of a buy: lowest price of the last candles
+            highest_high=high[-windows["highest_high"]:].max(),  # Stop loss of a sell: highest price of the last candles
+            close=close[-1],
+            symbol=symbol,
+            strategy=strategy,
+            log_message=log_message,
+        )
 
     except Exception as error:
         log_to_error(f"run_strategy: Failed running strategy for {symbol}")
         log_to_error(error)
-        raise error
\ No newline at end of file
+        raise error
+
+# Function to articulate run_strategy from running indicators instead of a candle DataFrame
+def run_strategy_from_state(
+    indicator_state: IndicatorState,
+    symbol: str,
+    strategy: IndividualStrategy,
+    log_message: callable,
+    log_to_error: callable,
+) -> Optional[SignalDecision]:
+    try:
+        log_message("run_strategy_from_state: running strategy analysis", symbol)
+
+        values = indicator_state.values_for(strategy.indicators)
+
+        return make_decision(
+            short_sma=values["short_sma"],
+            long_sma=values["long_sma"],
+            lowest_low=values["lowest_low"],
+            highest_high=values["highest_high"],
+            close=values["close"],
+            symbol=symbol,
+            strategy=strategy,
+            log_message=log_message,
+        )
+
+    except Exception as error:
+        log_to_error(f"run_strategy_from_state: Failed running strategy for {symbol}")
+        log_to_error(error)
+        raise error
+
+def make_decision(
+    short_sma: float,
+    long_sma: float,
+    lowest_low: float,
+    highest_high: float,
+    close: float,
+    symbol: str,
+    strategy: IndividualStrategy,
+    log_message: callable,
+) -> Optional[SignalDecision]:
+    # Initialize variables
+    signal = 0
+    sl = 0  # Stop Loss
+    tp = 0  # Take Profit
+
+    # Check for buy or sell signals
+    if short_sma > long_sma:
+        signal = 1  # Buy signal
+        order_type = "BUY_STOP"
+        sl = lowest_low
+        tp = close + (close - sl) * strategy.profit_ratio  # Take profit calculation
+    elif short_sma < long_sma:
+        signal = -1  # Sell signal
+        order_type = "SELL_STOP"
+        sl = highest_high
+        tp = close - (sl - close) * strategy.profit_ratio  # Take profit calculation
+
+    # If a signal is generated, return a SignalDecision object
+    if signal != 0:
+        signal_decision = SignalDecision(
+            signal=signal,
+            symbol=symbol,
+            order_type=order_type,
+            current_price=close,
+            volume=None,
+            risk=strategy.risk,
+            take_profit=tp,
+            stop_loss=sl,
+            signal_timestamp=datetime.now()
+        )
+
+        log_message("run_strategy: Signal generated for %s: %s", symbol, symbol, signal_decision)
+        return signal_decision
+
+    log_message("run_strategy: completed strategy analysis, no signal generated", symbol)
+    return None  # No trade signal generated
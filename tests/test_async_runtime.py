@@ -0,0 +1,91 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
+from bot.bot import Bot
+from db.db import DataDB
+
+
+class TestAsyncRuntime(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        with patch("bot.bot.DataDB", lambda path: DataDB(self.directory.name)):  # Keep the stored candles out of ./data
+            self.bot = Bot(mt5=MT5(terminal=SimulatedTerminal(history_days=2)))
+        self.bot.bot_config.runtime.mode = "asyncio"
+        self.bot.bot_config.sleep_time = 60  # Nothing may wait on it
+        self.bot.mt5.place_order = MagicMock(return_value=(10009,))
+        self.runner = threading.Thread(target=self.bot.run)
+
+    def tearDown(self):
+        self.bot.stop()
+        self.runner.join(timeout=5)
+
+    def start(self):
+        self.runner.start()
+        deadline = time.time() + 5
+        while (self.bot.async_runtime is None or self.bot.async_runtime.signals is None) and time.time() < deadline:
+            time.sleep(0.01)
+        self.runtime = self.bot.async_runtime
+        self.assertIsNotNone(self.runtime)
+
+    def queue_signal(self, symbol, direction=1):
+        signal_decision = MagicMock(symbol=symbol, signal=direction, enqueued_at=time.time())
+        strategy_manager = SimpleNamespace(symbol=symbol, strategy=SimpleNamespace(granularity="M1"))
+        self.runtime.loop.call_soon_threadsafe(self.runtime.signals.put_nowait, (signal_decision, strategy_manager))
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_queued_signals_are_placed_without_waiting_for_a_sleep(self):
+        self.start()
+        for symbol in ("EURUSD", "GBPUSD", "XAUUSD"):
+            self.queue_signal(symbol)
+
+        self.assertTrue(self.wait_for(lambda: self.bot.mt5.place_order.call_count == 3, timeout=2))
+        self.assertEqual(self.bot.metrics.histogram("signal_queue_wait_seconds").count, 3)
+
+    def test_stop_cancels_every_task_at_once(self):
+        self.start()
+        self.assertTrue(self.wait_for(lambda: not self.bot.first_poll_pending))
+
+        stop_requested = time.time()
+        self.bot.stop()
+        self.runner.join(timeout=5)
+
+        self.assertFalse(self.runner.is_alive())
+        self.assertLess(time.time() - stop_requested, 1)
+        self.assertIsNone(self.bot.async_runtime)
+
+    def test_entry_watchers_are_tasks_not_threads(self):
+        self.bot.bot_config.signal_management.trade_processor = True
+        self.bot.tick_multiplexer.tick_interval = 0.01
+        self.start()
+        threads = threading.active_count()
+
+        for i in range(1000):
+            self.queue_signal(("EURUSD", "GBPUSD")[i % 2], direction=0)  # Watched until the bot stops
+
+        self.assertTrue(self.wait_for(lambda: self.bot.tick_multiplexer.watcher_count() == 1000))
+        pollers = list(self.bot.tick_multiplexer.pollers.values())
+        self.assertEqual(len(pollers), 2)
+        self.assertTrue(all(isinstance(poller, asyncio.Task) for poller in pollers))
+        self.assertLessEqual(threading.active_count(), threads + self.bot.bot_config.runtime.terminal_workers)
+
+        self.bot.stop()
+        self.runner.join(timeout=5)
+        self.assertEqual(self.bot.tick_multiplexer.watcher_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from models.indicators import Indicators, IndicatorSpec
+from models.individual_strategy import IndividualStrategy
+from strategy.backtest import CrossingIndex, rolling_extreme, run_backtest
+from strategy.strategy import run_strategy
+
+
+class TestBacktest(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)])
+        self.mt5 = MT5(terminal=self.terminal)
+        self.strategy = IndividualStrategy(granularity="M1", indicators=Indicators(), risk=0.01, profit_ratio=1.5)
+
+    def test_rolling_extreme_matches_window_scan(self):
+        values = np.random.default_rng(1).random(500)
+        expected = [values[i - 49:i + 1].min() for i in range(49, 500)]
+
+        np.testing.assert_array_equal(rolling_extreme(values, 50, np.minimum)[49:], expected)
+
+    def test_crossing_index_matches_linear_scan(self):
+        rng = np.random.default_rng(2)
+        values = rng.random(1000)
+        start = rng.integers(0, 1000, 200)
+        threshold = rng.random(200) * 0.05
+
+        expected = []
+        for s, t in zip(start, threshold):
+            hits = np.flatnonzero(values[s:] <= t)
+            expected.append(s + hits[0] if len(hits) else -1)
+
+        np.testing.assert_array_equal(CrossingIndex(values).first(start, threshold), expected)
+
+    def test_signals_match_run_strategy_per_bar(self):
+        rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 600)
+        configured = IndividualStrategy(granularity="M1", risk=0.01, profit_ratio=1.5, indicators=Indicators.from_config({
+            "short_sma": {"type": "sma", "window": 3},
+            "long_sma": {"type": "sma", "window": 12},
+            "lowest_low": {"type": "min", "window": 50, "source": "low"},
+            "highest_high": {"type": "max", "window": 80, "source": "high"},
+        }))
+
+        for strategy, first_bar in ((self.strategy, 199), (configured, 79)):
+            signal_decisions = iter(run_backtest(rates, "XAUUSD", strategy).to_signal_decisions())
+            for i in range(first_bar, len(rates)):
+                live = run_strategy(self.mt5.configure_df(rates[max(i - 199, 0):i + 1]), "XAUUSD", strategy,
+                                    lambda *args: None, lambda *args: None)
+                if live is None:
+                    continue
+                backtest = next(signal_decisions)
+                self.assertEqual(
+                    (live.signal, live.current_price, live.stop_loss, live.take_profit),
+                    (backtest.signal, backtest.current_price, backtest.stop_loss, backtest.take_profit),
+                )
+
+    def test_indicators_computed_from_candles_must_be_supported(self):
+        rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 300)
+        indicators = Indicators()
+        indicators.definitions["short_sma"] = IndicatorSpec("ema", 5)
+        strategy = IndividualStrategy(granularity="M1", indicators=indicators, risk=0.01, profit_ratio=1.5)
+
+        with self.assertRaises(ValueError):
+            run_backtest(rates, "XAUUSD", strategy)
+        with self.assertRaises(ValueError):
+            run_strategy(self.mt5.configure_df(rates), "XAUUSD", strategy, lambda *args: None, lambda *args: None)
+
+    def test_trades_exit_at_stop_or_target(self):
+        rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 5000)
+        result = run_backtest(rates, "XAUUSD", self.strategy)
+        closed = result.exit_index >= 0
+
+        self.assertTrue(closed.any())
+        self.assertTrue(np.all(result.exit_index[closed] > result.fill_index[closed]))
+        self.assertTrue(np.all(
+            (result.exit_price[closed] == result.stop_loss[closed]) | (result.exit_price[closed] == result.take_profit[closed])
+        ))
+        self.assertEqual(result.summary()["closed"], int(closed.sum()))
+
+
+if __name__ == '__main__':
+    unittest.main()
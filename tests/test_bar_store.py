@@ -0,0 +1,122 @@
+import datetime as dt
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from bot.candle_manager import CandleManager
+from bot.candle_scheduler import CandleScheduler
+from bot.strategy_manager import StrategyManager
+from db.bar_store import BAR_DTYPE, BarStore
+from db.db import DataDB
+from models.indicators import Indicators
+from models.individual_strategy import IndividualStrategy
+from models.scheduling import Scheduling
+from strategy.backtest import load_rates
+
+
+def bars(times):
+    rates = np.zeros(len(times), dtype=BAR_DTYPE)
+    rates["time"] = times
+    rates["close"] = np.asarray(times, dtype=float) / 60
+    return rates
+
+
+class TestBarStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_skips_stored_times_and_range_queries(self):
+        store = BarStore(self.root)
+        self.assertEqual(store.write("XAUUSD", "M1", bars([0, 60, 120])), 3)
+        self.assertEqual(store.write("XAUUSD", "M1", bars([60, 120, 180, 180, 240])), 2)
+
+        np.testing.assert_array_equal(store.query("XAUUSD", "M1")["time"], [0, 60, 120, 180, 240])
+        np.testing.assert_array_equal(store.query("XAUUSD", "M1", start=60, end=180)["time"], [60, 120, 180])
+        np.testing.assert_array_equal(store.query("XAUUSD", "M1", end=180, count=2)["time"], [120, 180])
+        np.testing.assert_array_equal(store.query("XAUUSD", "M1", start=dt.datetime(1970, 1, 1, 0, 3))["time"], [180, 240])
+        self.assertIsInstance(store.query("XAUUSD", "M1").base, np.memmap)
+
+    def test_backfill_merges_missing_times(self):
+        store = BarStore(self.root)
+        store.write("XAUUSD", "M1", bars([120, 240]))
+        self.assertEqual(store.write("XAUUSD", "M1", bars([0, 60, 120, 180, 300])), 4)
+
+        np.testing.assert_array_equal(store.query("XAUUSD", "M1")["time"], [0, 60, 120, 180, 240, 300])
+
+    def test_reopens_and_drops_a_partial_record(self):
+        BarStore(self.root).write("XAUUSD", "M1", bars([0, 60]))
+        with open(os.path.join(self.root, "XAUUSD", "M1.bars"), "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        store = BarStore(self.root)
+        self.assertEqual(store.last_time("XAUUSD", "M1"), 60)
+        store.write("XAUUSD", "M1", bars([120]))
+        np.testing.assert_array_equal(store.query("XAUUSD", "M1")["close"], [0, 1, 2])
+
+
+class TestStoredCandles(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)], history_days=2)
+        self.mt5 = MT5(terminal=self.terminal, data_db=DataDB(self.directory.name))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_candle_manager_stores_closed_candles(self):
+        strategy = IndividualStrategy(granularity="M1", indicators=Indicators(), risk=0.01, profit_ratio=1)
+        scheduler = CandleScheduler("Etc/GMT-2", Scheduling(grace_seconds=1))
+        candle_manager = CandleManager(self.mt5, {"XAUUSD": [SimpleNamespace(strategy=strategy)]}, lambda *args: None, scheduler, backfill_bars=50)
+
+        stored = self.mt5.data_db.query_candles("XAUUSD", "M1")
+        self.assertEqual(len(stored), StrategyManager.FETCH_COUNT - 1)
+
+        self.terminal.advance(180)
+        candle_manager.update_timings(now=scheduler.broker_to_epoch(self.terminal.time()) + 1)
+
+        terminal_rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, StrategyManager.FETCH_COUNT + 3)
+        np.testing.assert_array_equal(self.mt5.data_db.query_candles("XAUUSD", "M1"), terminal_rates[:-1])
+
+    def test_stored_candles_seed_the_candle_cache(self):
+        rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 200)
+        self.mt5.data_db.write_candles("XAUUSD", "M1", rates[:-1])
+        self.terminal.advance(120)
+
+        fetched = self.mt5.fetch_rates("XAUUSD", "M1", count=200)
+
+        np.testing.assert_array_equal(fetched, self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 200))
+        self.assertEqual(self.mt5.candle_cache.stats["reloads"], 0)
+        self.assertLess(self.mt5.candle_cache.stats["bars_fetched"], 20)
+
+    def test_load_rates_reads_the_store_only_without_gaps(self):
+        rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 300)
+        self.mt5.data_db.write_candles("XAUUSD", "M1", np.delete(rates[:-1], 150))
+        self.terminal.advance(120)
+        expected = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 200)
+
+        # Two bars behind the terminal and one missing in the middle, read from the terminal and stored
+        self.terminal.copy_rates_from_pos = MagicMock(wraps=self.terminal.copy_rates_from_pos)
+        np.testing.assert_array_equal(load_rates(self.mt5, "XAUUSD", "M1", 199), expected[:-1])
+        self.assertEqual(self.terminal.copy_rates_from_pos.call_args.args[3], 200)
+
+        # The next run reads the same closed bars from the store, only the bar that dates them comes from the terminal
+        stored = load_rates(self.mt5, "XAUUSD", "M1", 199)
+        self.assertIsInstance(stored.base, np.memmap)
+        np.testing.assert_array_equal(stored, expected[:-1])
+        self.assertEqual(self.terminal.copy_rates_from_pos.call_args.args[2:], (199, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
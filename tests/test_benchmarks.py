@@ -0,0 +1,26 @@
+import unittest
+
+from benchmarks.hot_path import bench_calculate_lot_size, compare
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_compare_flags_per_bar_regressions_only(self):
+        baseline = {"fetch_candles": {"per_bar_s": 1e-5}, "run_strategy": {"per_bar_s": 1e-5}}
+        results = {
+            "fetch_candles": {"per_bar_s": 1.2e-5},
+            "run_strategy": {"per_bar_s": 2e-5},
+            "update_timings_10": {"per_bar_s": 1.0},
+        }
+
+        self.assertEqual(list(compare(results, baseline, tolerance=0.25)), ["run_strategy"])
+
+    def test_benchmark_reports_per_bar_cost(self):
+        result = bench_calculate_lot_size(repeat=5)
+
+        self.assertEqual(result["calls"], 5)
+        self.assertGreater(result["per_bar_s"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
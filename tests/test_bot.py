@@ -1,26 +1,40 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
 from unittest.mock import MagicMock, patch
 import json
 import datetime as dt
+import tempfile
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
 from bot.bot import Bot  # assuming Bot is in the 'bot' module
+from db.db import DataDB
 
 class TestBot(unittest.TestCase):
 
     def setUp(self):
         # This method will run before every test case
-        self.bot = Bot()  # Initialize the bot
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        with patch("bot.bot.DataDB", lambda path: DataDB(self.directory.name)):  # Keep the stored candles out of ./data
+            self.bot = Bot(mt5=MT5(terminal=SimulatedTerminal()))  # Initialize the bot against the simulated terminal
 
     def tearDown(self):
         # Clean up after each test
         self.bot.stop()
 
-    @patch("builtins.open", new_callable=unittest.mock.mock_open, read_data='{"risk_management": {"max_trade_percentage": 0.01}, "error_handling": {}, "logging": {}, "trade_management": {}, "signal_management": {}, "tradable_symbols": {"EURUSD": [{"granularity": "M5", "indicators": {}}]}}')
-    def test_load_settings(self, mock_file):
-        # Call the load_settings method
-        self.bot.load_settings()
+    def test_load_settings(self):
+        with open("./bot/configuration.json") as f:
+            configuration = json.load(f)
+        configuration["risk_management"]["max_trade_percentage"] = 0.02
+
+        with patch("builtins.open", new_callable=unittest.mock.mock_open, read_data=json.dumps(configuration)):
+            # Call the load_settings method
+            self.bot.load_settings()
         
         # Assert that the risk management settings are correctly loaded
-        self.assertEqual(self.bot.risk_management.max_trade_percentage, 0.01)
+        self.assertEqual(self.bot.risk_management.max_trade_percentage, 0.02)
         
         # Assert that trading symbols are correctly loaded
         self.assertIn("XAUUSD", self.bot.trading_symbols)
@@ -30,36 +44,145 @@ class TestBot(unittest.TestCase):
         # Set up some fake trading times
         self.bot.trading_times = {5, 15, 30}
 
-        # Mock the current time
-        with patch('datetime.datetime') as mock_datetime:
-            mock_datetime.now.return_value = dt.datetime(2024, 9, 16, 14, 27)
+        # Mock the current time, built before datetime is patched
+        now = dt.datetime(2024, 9, 16, 14, 27)
+        expected_interval = dt.datetime(2024, 9, 16, 14, 30)
+        with patch('bot.bot.dt.datetime') as mock_datetime:
+            mock_datetime.now.return_value = now
 
             # Call get_next_interval
             next_interval = self.bot.get_next_interval()
 
             # Expected next interval should be 14:30, because the closest 5-minute interval after 14:27 is 14:30
-            expected_interval = dt.datetime(2024, 9, 16, 14, 30)
             self.assertEqual(next_interval, expected_interval)
 
-    @patch("bot.strategy_manager.StrategyManager.generate_signal")
-    def test_process_candles(self, mock_generate_signal):
-        # Mock generate_signal to return a SignalDecision object
-        mock_generate_signal.return_value = "mock_signal"
-
-        # Set up trading symbols with a mock StrategyManager
+    def test_process_candles(self):
+        # Set up trading symbols with a mock StrategyManager whose generate_signal returns a signal
+        mock_signal = MagicMock(signal=1)
         mock_strategy_manager = MagicMock()
-        self.bot.trading_symbols = {"EURUSD": [mock_strategy_manager]}
-
-        # Call process_candles with triggered symbols
+        mock_strategy_manager.generate_signal.return_value = mock_signal
+        mock_strategy_manager.strategy.granularity = "M1"
+        hourly_strategy_manager = MagicMock()
+        hourly_strategy_manager.strategy.granularity = "H1"
+        self.bot.trading_symbols = {"EURUSD": [mock_strategy_manager, hourly_strategy_manager]}
+
+        # Call process_candles with triggered symbols, only the M1 candle has closed
+        self.bot.candle_manager.triggered_pairs = {"EURUSD_M1"}
         self.bot.process_candles(["EURUSD"])
 
-        # Assert that the generate_signal method was called
+        # Assert that the generate_signal method was called, and not for the strategy whose candle is still open
         mock_strategy_manager.generate_signal.assert_called_once()
+        hourly_strategy_manager.generate_signal.assert_not_called()
 
         # Assert that a signal was added to the current_signals queue
         self.assertEqual(self.bot.current_signals.qsize(), 1)
-        self.assertEqual(self.bot.current_signals.get(), "mock_signal")
+        self.assertEqual(self.bot.current_signals.get(), (mock_signal, mock_strategy_manager))
+
 
+    def strategy_manager(self, generate_signal):
+        strategy_manager = MagicMock(symbol="EURUSD")
+        strategy_manager.strategy.granularity = "M1"
+        strategy_manager.generate_signal.side_effect = generate_signal
+        return strategy_manager
+
+    def test_evaluation_deadline_starts_when_the_evaluation_does(self):
+        self.bot.bot_config.signal_management.evaluation_timeout = 0.25
+        self.bot.strategy_executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.bot.strategy_executor.shutdown)
+        signal = MagicMock(signal=1)
+        self.bot.trading_symbols = {"EURUSD": [self.strategy_manager(lambda: time.sleep(0.15) or signal) for _ in range(2)]}
+
+        # Together the evaluations outlast the timeout, each on its own does not
+        self.bot.candle_manager.triggered_pairs = {"EURUSD_M1"}
+        self.bot.process_candles(["EURUSD"])
+
+        self.assertEqual(self.bot.current_signals.qsize(), 2)
+        self.assertEqual(self.bot.metrics.counter("evaluations_timed_out").value, 0)
+
+    def test_overrunning_evaluation_is_dropped_and_counted_when_it_returns(self):
+        self.bot.bot_config.signal_management.evaluation_timeout = 0.1
+        self.bot.log_to_error = MagicMock()
+        released = threading.Event()
+        slow = self.strategy_manager(lambda: released.wait() and MagicMock(signal=1))
+        fast = self.strategy_manager(lambda: MagicMock(signal=1))
+        self.bot.trading_symbols = {"EURUSD": [slow, fast]}
+
+        self.bot.candle_manager.triggered_pairs = {"EURUSD_M1"}
+        self.bot.process_candles(["EURUSD"])
+
+        self.assertEqual(self.bot.current_signals.qsize(), 1)
+        self.assertIs(self.bot.current_signals.get()[1], fast)
+        self.assertEqual(self.bot.metrics.counter("evaluations_timed_out").value, 1)
+        self.assertEqual(self.bot.overdue_evaluations, 1)
+
+        released.set()
+        self.bot.strategy_executor.shutdown(wait=True)
+        self.assertEqual(self.bot.metrics.counter("evaluations_late").value, 1)
+        self.assertEqual(self.bot.overdue_evaluations, 0)
+        self.assertTrue(self.bot.current_signals.empty())
+
+    def test_run_stops_cleanly_when_monitoring_fails_to_start(self):
+        self.bot.log_to_error = MagicMock()
+        with patch.object(self.bot, "start_monitoring", side_effect=OSError("Address already in use")):
+            self.bot.run()
+
+        self.bot.log_to_error.assert_called_once_with("run: Critical error in main thread: Address already in use")
+        self.assertFalse(self.bot.is_running)
+
+    def test_signals_over_max_concurrent_trades_are_skipped(self):
+        self.bot.risk_management.max_concurrent_trades = 1
+        self.bot.daily_pnl_ledger.snapshot_path = None  # Keep the snapshot out of ./state
+        self.bot.place_signal = MagicMock()
+        strategy_manager = MagicMock()
+        strategy_manager.strategy.granularity = "M1"
+        signal_decision = MagicMock(symbol="XAUUSD", enqueued_at=None)
+
+        self.bot.dispatch_signal(signal_decision, strategy_manager)
+        self.bot.place_signal.assert_called_once_with(signal_decision, "M1")
+        self.assertEqual(self.bot.orders_in_flight, 0)
+
+        terminal = self.bot.mt5.mt5
+        terminal.order_send({"action": terminal.TRADE_ACTION_DEAL, "symbol": "XAUUSD", "volume": 0.1,
+                             "type": terminal.ORDER_TYPE_BUY, "comment": "XAUUSD_M1"})
+        self.bot.dispatch_signal(signal_decision, strategy_manager)
+        with patch("bot.bot.process_place_order") as process_place_order:
+            self.bot.place_watched_entry(MagicMock(symbol="XAUUSD", granularity="M1"))
+
+        self.bot.place_signal.assert_called_once()
+        process_place_order.assert_not_called()
+
+    def test_candle_to_enqueue_is_only_observed_for_triggered_pairs(self):
+        strategy_manager = MagicMock(symbol="XAUUSD")
+        strategy_manager.strategy.granularity = "M1"
+        histogram = self.bot.metrics.histogram("candle_to_enqueue_seconds")
+        observed = histogram.count
+
+        self.bot.candle_manager.triggered_pairs = {"XAUUSD_H1"}  # Another granularity of the symbol closed
+        self.bot.stamp_signal(MagicMock(), strategy_manager)
+        self.assertEqual(histogram.count, observed)
+
+        self.bot.candle_manager.triggered_pairs = {"XAUUSD_M1"}
+        self.bot.stamp_signal(MagicMock(), strategy_manager)
+        self.assertEqual(histogram.count, observed + 1)
+
+    def test_trade_manager_runs_a_cycle(self):
+        trade_manager = self.bot.trade_manager
+        trade_manager.log_to_error = MagicMock()
+        self.bot.daily_pnl_ledger.snapshot_path = None  # Keep the snapshot out of ./state
+        terminal = self.bot.mt5.mt5
+        terminal.order_send({"action": terminal.TRADE_ACTION_DEAL, "symbol": "XAUUSD", "volume": 0.1,
+                             "type": terminal.ORDER_TYPE_BUY, "comment": "XAUUSD_M1"})
+        terminal.advance(60)
+
+        # One pass of the loop the trade manager thread runs
+        with patch("bot.trade_manager.time.sleep", side_effect=lambda _: trade_manager.stop_trade_manager()):
+            trade_manager.run_trade_manager()
+
+        trade_manager.log_to_error.assert_not_called()
+        ledger = self.bot.daily_pnl_ledger
+        self.assertIsNotNone(ledger.day)
+        self.assertEqual(list(ledger.floating_by_strategy), ["XAUUSD_M1"])
+        self.assertTrue(trade_manager.track_daily_loss())
 
     # @patch('api.metatrader_api.MT5')
     # def test_mt5_interaction(self, mock_mt5):
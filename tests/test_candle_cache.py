@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+
+
+class TestCandleCache(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)])
+        self.cached = MT5(terminal=self.terminal)
+        self.uncached = MT5(terminal=self.terminal, cache_candles=False)
+
+    def assert_same_rates(self, granularity="M1", count=201):
+        np.testing.assert_array_equal(
+            self.cached.fetch_rates("XAUUSD", granularity, count),
+            self.uncached.fetch_rates("XAUUSD", granularity, count),
+        )
+
+    def test_delta_fetch_matches_full_fetch(self):
+        self.assert_same_rates()
+        for _ in range(300):
+            self.terminal.advance(60)
+            self.assert_same_rates()
+            self.assert_same_rates("H1", 20)
+
+        stats = self.cached.candle_cache.stats
+        self.assertEqual(stats["reloads"], 2)
+        self.assertLess(stats["bars_fetched"], 301 * 201 / 20)
+
+    def test_forming_candle_is_refreshed(self):
+        self.assert_same_rates()
+        self.terminal.advance(20)
+        self.assert_same_rates()
+        self.terminal.advance(20)
+        self.assert_same_rates()
+
+    def test_gap_is_filled(self):
+        self.assert_same_rates()
+        self.terminal.advance(90 * 60)
+        self.assert_same_rates()
+
+    def test_repaint_triggers_reload(self):
+        self.assert_same_rates()
+        # Change the last closed candle, the one a delta fetch checks against
+        rates = self.terminal.symbols["XAUUSD"].rates
+        index = np.searchsorted(rates["time"], self.terminal.time()) - 1
+        rates["close"][index] += 1
+
+        self.terminal.advance(60)
+        self.assert_same_rates()
+        self.assertEqual(self.cached.candle_cache.stats["reloads"], 2)
+
+    def test_views_are_read_only(self):
+        view = self.cached.fetch_rates("XAUUSD", "M1", 10)
+        with self.assertRaises(ValueError):
+            view["close"][0] = 0
+
+
+if __name__ == '__main__':
+    unittest.main()
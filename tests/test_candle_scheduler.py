@@ -0,0 +1,68 @@
+import datetime as dt
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
+from bot.candle_manager import CandleManager
+from bot.candle_scheduler import CandleScheduler
+from models.scheduling import Scheduling
+
+
+def broker_time(*args):
+    return int((dt.datetime(*args) - dt.datetime(1970, 1, 1)).total_seconds())
+
+
+class TestCandleScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = CandleScheduler("Etc/GMT-2", Scheduling(grace_seconds=1, retry_seconds=2, max_retry_seconds=10))
+
+    def test_deadline_is_candle_close_in_epoch_time(self):
+        self.scheduler.schedule("XAUUSD", "M5", broker_time(2024, 1, 2, 10, 0))
+
+        self.assertEqual(self.scheduler.next_deadline(), broker_time(2024, 1, 2, 8, 5) + 1)
+
+    def test_weekend_close_moves_to_monday(self):
+        # 2024-01-05 is a Friday
+        self.assertEqual(self.scheduler.next_close("M1", broker_time(2024, 1, 5, 23, 59)), broker_time(2024, 1, 8))
+        self.assertEqual(self.scheduler.next_close("H4", broker_time(2024, 1, 5, 16, 0)), broker_time(2024, 1, 5, 20, 0))
+
+    def test_only_due_pairs_are_popped(self):
+        self.scheduler.schedule("XAUUSD", "M1", broker_time(2024, 1, 2, 10, 0))
+        self.scheduler.schedule("EURUSD", "H4", broker_time(2024, 1, 2, 8, 0))
+
+        self.assertEqual(self.scheduler.due(broker_time(2024, 1, 2, 8, 0, 30)), [])
+        self.assertEqual(self.scheduler.due(broker_time(2024, 1, 2, 8, 1, 1)), [("XAUUSD", "M1")])
+
+    def test_retry_backs_off_up_to_max(self):
+        for tries, delay in [(1, 2), (2, 4), (3, 8), (4, 10)]:
+            self.scheduler.retry("XAUUSD", "M1", tries, now=100)
+            self.assertEqual(self.scheduler.next_deadline(), 100 + delay)
+            self.scheduler.due(1000)
+
+    def test_candle_manager_polls_pairs_as_they_close(self):
+        terminal = SimulatedTerminal(utc_offset_hours=2)
+        mt5 = MT5(terminal=terminal)
+        mt5.query_historic_data = MagicMock(wraps=mt5.query_historic_data)
+        trading_symbols = {
+            "XAUUSD": [SimpleNamespace(strategy=SimpleNamespace(granularity="M1"))],
+            "EURUSD": [SimpleNamespace(strategy=SimpleNamespace(granularity="H4"))],
+        }
+        candle_manager = CandleManager(mt5, trading_symbols, lambda *args: None, self.scheduler)
+        mt5.query_historic_data.reset_mock()
+
+        triggered = []
+        for _ in range(8 * 60):
+            terminal.advance(60)
+            triggered += candle_manager.update_timings(now=terminal.time() - 7200 + 1)
+
+        polled = [call.args[0] for call in mt5.query_historic_data.call_args_list]
+        self.assertEqual(polled.count("XAUUSD"), 8 * 60)
+        self.assertEqual(polled.count("EURUSD"), 2)
+        self.assertEqual(triggered.count("EURUSD"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
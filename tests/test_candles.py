@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from models.candles import Candles
+from models.indicators import Indicators
+from models.individual_strategy import IndividualStrategy
+from strategy.strategy import run_strategy
+
+
+def decision(signal_decision):
+    if signal_decision is None:
+        return None
+    return (signal_decision.signal, signal_decision.current_price, signal_decision.stop_loss, signal_decision.take_profit)
+
+
+class TestCandles(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)])
+        self.mt5 = MT5(terminal=self.terminal)
+        self.rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 600)
+
+    def test_columns_are_views_of_the_rates(self):
+        candles = Candles(self.rates)
+
+        self.assertTrue(np.shares_memory(candles['Close'], self.rates))
+        self.assertTrue(np.shares_memory(candles.Time, self.rates))
+        self.assertEqual(candles.Time[-1], np.datetime64(int(self.rates["time"][-1]), "s"))
+        self.assertEqual(len(candles[-2:]), 2)
+
+    def test_to_df_matches_the_pandas_conversion(self):
+        candles = Candles(self.rates)
+
+        # What configure_df built before it went through Candles
+        expected = pd.DataFrame(self.rates)
+        expected.time = pd.to_datetime(expected.time, unit="s")
+        expected.rename(columns={"time": "Time", "open": "Open", "high": "High", "close": "Close", "low": "Low",
+                                 "tick_volume": "Volume", "real_volume": "_Volume", "spread": "Spread"}, inplace=True)
+
+        pd.testing.assert_frame_equal(candles.to_df(), expected)
+        self.assertIs(candles.to_df(), candles.to_df())
+
+    def test_run_strategy_decisions_match_dataframe(self):
+        strategy = IndividualStrategy(granularity="M1", indicators=Indicators(), risk=0.01, profit_ratio=1)
+        ignore = lambda *args: None
+
+        for i in range(199, len(self.rates)):
+            window = self.rates[i - 199:i + 1]
+            from_df = run_strategy(self.mt5.configure_df(window), "XAUUSD", strategy, ignore, ignore)
+            from_candles = run_strategy(Candles(window), "XAUUSD", strategy, ignore, ignore)
+
+            self.assertEqual(decision(from_df), decision(from_candles))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import calendar
+import datetime as dt
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from bot.daily_pnl_ledger import DailyPnLLedger
+
+
+class TestDailyPnLLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)],
+                                          start_time=dt.datetime(2024, 1, 2, 10), history_days=2)
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.directory.name, "daily_pnl.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def now(self):
+        return int(self.terminal.time())
+
+    def round_trip(self, comment):
+        opened = self.terminal.order_send({"action": 1, "symbol": "XAUUSD", "volume": 0.1, "type": 0, "comment": comment})
+        self.terminal.advance(120)
+        self.terminal.order_send({"action": 1, "symbol": "XAUUSD", "volume": 0.1, "type": 1, "position": opened.order})
+
+    def test_update_only_reads_deals_after_the_last_ticket(self):
+        ledger = DailyPnLLedger(self.terminal, "Etc/GMT-2")
+        self.round_trip("XAUUSD_M1")
+        ledger.update(self.now())
+
+        with patch.object(DailyPnLLedger, "add_deal", autospec=True, side_effect=DailyPnLLedger.add_deal) as add_deal:
+            self.assertEqual(ledger.update(self.now()), ledger.realized)
+            add_deal.assert_not_called()
+
+            self.round_trip("XAUUSD_H1")
+            ledger.update(self.now())
+            self.assertEqual(add_deal.call_count, 2)
+
+        closed = [deal.profit for deal in self.terminal.deals]
+        self.assertAlmostEqual(ledger.realized, sum(closed))
+        self.assertAlmostEqual(ledger.realized_by_strategy["XAUUSD_M1"], closed[1])
+        self.assertAlmostEqual(ledger.realized_by_strategy["XAUUSD_H1"], closed[3])
+        self.assertAlmostEqual(ledger.realized_by_symbol["XAUUSD"], sum(closed))
+        self.assertEqual(ledger.position_strategies, {})
+
+    def test_floating_pnl_counts_against_the_limit(self):
+        ledger = DailyPnLLedger(self.terminal, "Etc/GMT-2")
+        self.assertTrue(ledger.within_limit(0.03))
+
+        self.terminal.order_send({"action": 1, "symbol": "XAUUSD", "volume": 0.1, "type": 0, "comment": "XAUUSD_M1"})
+        self.terminal.advance(600)
+        ledger.update(self.now())
+
+        self.assertAlmostEqual(ledger.floating, self.terminal.positions_get()[0].profit)
+        self.assertEqual(ledger.floating_by_strategy, {"XAUUSD_M1": ledger.floating})
+        self.assertEqual(ledger.start_balance, 10000.0)
+        loss = -(ledger.realized + ledger.floating)
+        self.assertEqual(ledger.within_limit(0.03), loss < 300)
+        self.assertFalse(ledger.within_limit(loss / 10000.0))
+
+    def test_resets_at_the_broker_day_boundary(self):
+        ledger = DailyPnLLedger(self.terminal, "Etc/GMT-2")
+        self.round_trip("XAUUSD_M1")
+        ledger.update(self.now())
+        self.assertNotEqual(ledger.realized, 0.0)
+
+        self.terminal.set_time(dt.datetime(2024, 1, 3, 0, 0, 30))
+        ledger.update(self.now())
+
+        self.assertEqual(ledger.day, dt.date(2024, 1, 3))
+        self.assertEqual(ledger.realized, 0.0)
+        self.assertEqual(ledger.start_balance, self.terminal.account_info().balance)
+
+    def test_broker_now_is_in_the_broker_timezone(self):
+        ledger = DailyPnLLedger(self.terminal, "Etc/GMT-2")
+        expected = calendar.timegm(dt.datetime.now(dt.timezone.utc).timetuple()) + 2 * 3600
+        self.assertLessEqual(abs(ledger.broker_now() - expected), 2)
+
+    def test_snapshot_resumes_the_same_day_only(self):
+        ledger = DailyPnLLedger(self.terminal, "Etc/GMT-2", self.snapshot_path)
+        self.round_trip("XAUUSD_M1")
+        ledger.update(self.now())
+
+        restarted = DailyPnLLedger(self.terminal, "Etc/GMT-2", self.snapshot_path)
+        self.assertEqual(restarted.to_dict(), ledger.to_dict())
+        with patch.object(DailyPnLLedger, "add_deal", autospec=True) as add_deal:
+            restarted.update(self.now())
+            add_deal.assert_not_called()
+
+        self.terminal.set_time(dt.datetime(2024, 1, 3, 9))
+        restarted.update(self.now())
+        self.assertEqual(restarted.day, dt.date(2024, 1, 3))
+        self.assertEqual(restarted.realized, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from models.indicators import Indicators
+from models.individual_strategy import IndividualStrategy
+from strategy.backtest import run_backtest
+from strategy.indicator_state import IndicatorState, RollingExtreme, RollingMean
+from strategy.strategy import run_strategy_from_state
+
+
+class TestIndicatorState(unittest.TestCase):
+
+    def test_rolling_mean_is_bit_identical_to_pandas(self):
+        rng = np.random.default_rng(0)
+        series = [
+            2000 * np.exp(np.cumsum(rng.normal(0, 1e-3, 5000))),
+            np.concatenate((np.full(40, 1.1), rng.random(100), np.full(30, 0.3))),
+            -rng.random(300),
+        ]
+        for values in series:
+            for window in (5, 20):
+                rolling_mean = RollingMean(window)
+                result = [rolling_mean.update(value) for value in values]
+                np.testing.assert_array_equal(result, pd.Series(values).rolling(window).mean().to_numpy())
+
+    def test_rolling_extreme_matches_pandas(self):
+        values = np.random.default_rng(1).random(1000)
+        lowest, highest = RollingExtreme(200), RollingExtreme(200, is_max=True)
+
+        np.testing.assert_array_equal([lowest.update(v) for v in values],
+                                      pd.Series(values).rolling(200, min_periods=1).min().to_numpy())
+        np.testing.assert_array_equal([highest.update(v) for v in values],
+                                      pd.Series(values).rolling(200, min_periods=1).max().to_numpy())
+
+    def test_duplicate_candles_are_ignored_and_gaps_reseed(self):
+        state = IndicatorState(lookback=3, short_window=1, long_window=2)
+        times = np.array([60, 120, 180])
+        prices = np.array([1.0, 2.0, 3.0])
+
+        self.assertEqual(state.update_many(times, prices, prices, prices), 3)
+        self.assertEqual(state.update_many(times[1:], prices[1:], prices[1:], prices[1:]), 0)
+        self.assertFalse(state.update(180, 9.0, 9.0, 9.0))
+
+        state.update_many(np.array([600, 660]), np.array([5.0, 6.0]), np.array([5.0, 6.0]), np.array([5.0, 6.0]))
+        self.assertEqual(state.values(), (6.0, 5.5, 5.0, 6.0, 6.0))
+
+    def test_decisions_match_backtest(self):
+        terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)])
+        rates = terminal.copy_rates_from_pos("XAUUSD", terminal.TIMEFRAME_M1, 0, 1000)
+        strategy = IndividualStrategy(granularity="M1", indicators=Indicators(), risk=0.01, profit_ratio=2)
+        expected = iter(run_backtest(rates, "XAUUSD", strategy).to_signal_decisions())
+
+        state = IndicatorState()
+        for i, rate in enumerate(rates):
+            state.update(int(rate["time"]), rate["high"], rate["low"], rate["close"])
+            if i < 199:
+                continue
+            decision = run_strategy_from_state(state, "XAUUSD", strategy, lambda *args: None, lambda *args: None)
+            if decision is None:
+                continue
+            backtest = next(expected)
+            self.assertEqual(
+                (decision.signal, decision.current_price, decision.stop_loss, decision.take_profit),
+                (backtest.signal, backtest.current_price, backtest.stop_loss, backtest.take_profit),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
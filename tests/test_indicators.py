@@ -0,0 +1,90 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from bot.strategy_manager import StrategyManager
+from models.indicators import IndicatorSpec, Indicators
+from models.individual_strategy import IndividualStrategy
+from strategy.indicator_state import IndicatorState, INDICATOR_TYPES
+
+
+def wilder(values, window):
+    result = np.full(len(values), np.nan)
+    for i in range(window - 1, len(values)):
+        result[i] = values[:window].mean() if i == window - 1 else (result[i - 1] * (window - 1) + values[i]) / window
+    return result
+
+
+def run(spec, high, low, close):
+    indicator = INDICATOR_TYPES[spec.type](spec)
+    if spec.type == "atr":
+        return np.array([indicator.update(*candle) for candle in zip(high, low, close)])
+    return np.array([indicator.update(value) for value in close])
+
+
+class TestIndicators(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.close = 2000 * np.exp(np.cumsum(rng.normal(0, 1e-3, 500)))
+        self.high = self.close + rng.random(500)
+        self.low = self.close - rng.random(500)
+
+    def test_indicators_match_their_reference_definitions(self):
+        close = pd.Series(self.close)
+        np.testing.assert_allclose(run(IndicatorSpec("ema", 20), self.high, self.low, self.close),
+                                   close.ewm(span=20, adjust=False, min_periods=20).mean(), rtol=1e-12)
+
+        change = np.diff(self.close)
+        gains, losses = wilder(np.maximum(change, 0), 14), wilder(np.maximum(-change, 0), 14)
+        np.testing.assert_allclose(run(IndicatorSpec("rsi", 14), self.high, self.low, self.close)[1:],
+                                   100 - 100 / (1 + gains / losses), rtol=1e-9)
+
+        previous_close = np.concatenate(([np.nan], self.close[:-1]))
+        true_range = np.fmax(self.high - self.low, np.fmax(np.abs(self.high - previous_close), np.abs(self.low - previous_close)))
+        np.testing.assert_allclose(run(IndicatorSpec("atr", 14), self.high, self.low, self.close), wilder(true_range, 14), rtol=1e-9)
+
+        bands = np.array(run(IndicatorSpec("bollinger", 20, deviations=2.5), self.high, self.low, self.close).tolist())
+        middle, width = close.rolling(20).mean(), 2.5 * close.rolling(20).std(ddof=0)
+        np.testing.assert_allclose(bands, np.column_stack((middle, middle + width, middle - width)), rtol=1e-9)
+
+    def test_strategies_on_a_pair_share_one_computation_per_spec(self):
+        state = IndicatorState()
+        strategy_managers = []
+        for i in range(10):
+            indicators = Indicators.from_config({f"trend_{i}": {"type": "sma", "window": 20}, "atr": {"type": "atr", "window": 14}})
+            strategy = IndividualStrategy(granularity="M1", indicators=indicators, risk=0.01, profit_ratio=1)
+            strategy_managers.append(StrategyManager("XAUUSD", strategy, SimpleNamespace(), print, print, indicator_state=state))
+
+        # SMA(20) is already long_sma, so ten strategies add only the ATR
+        self.assertEqual(len(state.specs), 5)
+        state.update_many(np.arange(500) * 60, self.high, self.low, self.close)
+
+        values = state.values_for(strategy_managers[3].strategy.indicators)
+        self.assertEqual(values["trend_3"], values["long_sma"])
+        self.assertEqual(values["atr"], state.indicators[IndicatorSpec("atr", 14)].value)
+        self.assertEqual(values["close"], self.close[-1])
+
+    def test_new_indicators_reseed_from_the_next_run(self):
+        state = IndicatorState()
+        times = np.arange(500) * 60
+        state.update_many(times, self.high, self.low, self.close)
+
+        self.assertEqual(state.require(Indicators.from_config({"long_sma": {"type": "ema", "window": 20}})), 1)
+        self.assertIsNone(state.last_time)
+        self.assertEqual(state.update_many(times, self.high, self.low, self.close), 500)
+        self.assertEqual(state.require(Indicators.from_config({"long_sma": {"type": "ema", "window": 20}})), 0)
+
+    def test_unknown_indicators_are_rejected_at_load_time(self):
+        state = IndicatorState()
+        with self.assertRaises(ValueError):
+            state.require(Indicators.from_config({"macd": {"type": "macd", "window": 12}}))
+        with self.assertRaises(ValueError):
+            state.require(Indicators.from_config({"open_sma": {"type": "sma", "window": 5, "source": "open"}}))
+        self.assertEqual(len(state.specs), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
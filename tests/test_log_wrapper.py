@@ -0,0 +1,66 @@
+import logging
+import tempfile
+import threading
+import time
+import unittest
+
+from core.log_wrapper import LogQueue, LogWrapper
+
+
+class BlockingHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.unblock = threading.Event()
+        self.records = []
+
+    def emit(self, record):
+        self.unblock.wait(5)
+        self.records.append(record.getMessage())
+
+
+class TestLogWrapper(unittest.TestCase):
+
+    def setUp(self):
+        self.path = LogWrapper.PATH
+        self.directory = tempfile.TemporaryDirectory()
+        LogWrapper.PATH = self.directory.name
+
+    def tearDown(self):
+        LogWrapper.PATH = self.path
+        self.directory.cleanup()
+
+    def test_queued_records_are_formatted_and_written_on_flush(self):
+        log_queue = LogQueue(batch_size=64, flush_interval=0.01)
+        log = LogWrapper("test_queued_log", log_queue=log_queue, level=logging.INFO)
+
+        for i in range(100):
+            log.logger.info("order %s placed", i)
+        log.logger.debug("filtered %s", object())
+        self.assertTrue(log_queue.flush())
+
+        with open(log.filename) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 101)  # Including the LogWrapper initialized line
+        self.assertTrue(lines[-1].endswith("order 99 placed"))
+        self.assertLess(log_queue.stats["batches"], 101)
+        log_queue.stop()
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        log_queue = LogQueue(max_size=2, flush_interval=0.01)
+        handler = BlockingHandler()
+        record = lambda i: logging.LogRecord("test", logging.INFO, __file__, 0, "record %s", (i,), None)
+
+        log_queue.put([handler], record(0))
+        time.sleep(0.1)  # The writer is now blocked writing the first record
+        for i in range(1, 5):
+            log_queue.put([handler], record(i))
+
+        self.assertEqual(log_queue.stats["dropped"], 2)
+        handler.unblock.set()
+        log_queue.stop()
+        self.assertEqual(handler.records, ["record 0", "record 1", "record 2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
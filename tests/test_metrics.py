@@ -0,0 +1,57 @@
+import threading
+import unittest
+import urllib.request
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
+from core.metrics import Histogram, Metrics, MetricsServer
+
+class TestMetrics(unittest.TestCase):
+
+    def test_percentile_returns_bucket_upper_bound(self):
+        histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+        for value in (0.05, 0.5, 0.5, 0.5, 20.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.percentile(0.5), 1.0)
+        self.assertEqual(histogram.percentile(1.0), 20.0)
+
+    def test_observe_from_threads(self):
+        metrics = Metrics()
+
+        def observe():
+            for _ in range(1000):
+                metrics.observe("latency", 0.01)
+
+        threads = [threading.Thread(target=observe) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(metrics.histogram("latency").count, 4000)
+
+    def test_stages_are_exported(self):
+        mt5 = MT5(terminal=SimulatedTerminal())
+        mt5.fetch_candles("EURUSD", "M5", print)
+        mt5.metrics.inc("errors")
+        mt5.metrics.gauge("signal_queue_depth", lambda: 3)
+
+        server = MetricsServer(mt5.metrics, port=0)
+        server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+                body = response.read().decode()
+        finally:
+            server.stop()
+
+        self.assertIn("bot_fetch_candles_seconds_count 1", body)
+        self.assertIn("bot_configure_df_seconds_count 1", body)
+        self.assertIn('bot_fetch_candles_seconds_bucket{le="+Inf"} 1', body)
+        self.assertIn("bot_errors_total 1", body)
+        self.assertIn("bot_signal_queue_depth 3.0", body)
+        self.assertIn("fetch_candles_seconds n=1", mt5.metrics.summary())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from models.indicators import Indicators, IndicatorSpec
+from models.individual_strategy import IndividualStrategy
+from models.optimization import Optimization
+from models.sweep_result import SweepResult
+from strategy.backtest import BacktestData, load_rates, run_backtest
+from strategy.optimizer import (MAX_PROFIT_FACTOR, SweepDataset, combinations, optimize, rank, sample_parameters,
+                                strategy_parameters, sweep, walk_forward_splits, window_summary)
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)])
+        self.mt5 = MT5(terminal=self.terminal)
+        self.rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 8000)
+        self.strategy = IndividualStrategy(granularity="M1", indicators=Indicators(), risk=0.01, profit_ratio=1.5)
+
+    def test_walk_forward_splits_follow_each_other(self):
+        times = np.arange(1000) * 60
+        splits = walk_forward_splits(times, splits=4, train_ratio=3.0)
+
+        self.assertEqual(splits[0], (0, 426 * 60, 568 * 60))
+        for (train_start, test_start, test_end), following in zip(splits, splits[1:]):
+            self.assertLess(train_start, test_start)
+            self.assertEqual(following[1], test_end)  # Out-of-sample windows are back to back
+        self.assertLessEqual(splits[-1][2], times[-1] + 1)
+
+    def test_combinations_fill_in_the_strategy_values(self):
+        defaults = strategy_parameters(self.strategy)
+        grid = combinations(Optimization(parameters={"short_window": [5, 30], "profit_ratio": [1.0, 2.0]}), defaults)
+        self.assertEqual(len(grid), 2)  # A short window of 30 is not below the long window of 20
+        self.assertEqual(grid[0], {"short_window": 5, "long_window": 20, "lookback": 200, "profit_ratio": 1.0, "risk": 0.01})
+
+        space = {"short_window": list(range(10)), "profit_ratio": list(range(10))}
+        samples = sample_parameters(space, 30, seed=1)
+        self.assertEqual(len({tuple(sample.values()) for sample in samples}), 30)
+
+        with self.assertRaises(ValueError):
+            combinations(Optimization(parameters={"sma": [5]}), defaults)
+
+        for name, spec in (("short_sma", IndicatorSpec("ema", 5)), ("highest_high", IndicatorSpec("max", 50, source="high"))):
+            indicators = Indicators()
+            indicators.definitions[name] = spec
+            with self.assertRaises(ValueError):
+                strategy_parameters(IndividualStrategy(granularity="M1", indicators=indicators, risk=0.01, profit_ratio=1.5))
+
+    def test_sweep_matches_individual_backtests_in_and_out_of_process(self):
+        info = self.terminal.symbol_info("XAUUSD")
+        data = BacktestData(self.rates)
+        dataset = SweepDataset("XAUUSD", self.strategy, data, walk_forward_splits(data.time, 2, 2.0), 10000.0,
+                               info.trade_tick_value, info.trade_tick_size, info.volume_step)
+        parameters = combinations(Optimization(parameters={"long_window": [20, 40], "profit_ratio": [1.0, 2.0],
+                                                           "risk": [0.01, 0.02]}), strategy_parameters(self.strategy))
+
+        results = sweep(dataset, parameters, processes=1)
+        self.assertEqual(len(results), 8)
+        for result in results:
+            strategy = IndividualStrategy(granularity="M1", indicators=Indicators(), risk=result.parameters["risk"],
+                                          profit_ratio=result.parameters["profit_ratio"])
+            backtest = run_backtest(self.rates, "XAUUSD", strategy, long_window=result.parameters["long_window"], balance=10000.0,
+                                    trade_tick_value=info.trade_tick_value, trade_tick_size=info.trade_tick_size,
+                                    volume_step=info.volume_step)
+            _, test_start, test_end = dataset.splits[1]
+            self.assertEqual(result.test[1], window_summary(backtest, test_start, test_end))
+
+        pooled = sweep(dataset, parameters, processes=2)
+        key = lambda result: tuple(result.parameters.values())
+        self.assertEqual([result.test for result in sorted(pooled, key=key)], [result.test for result in sorted(results, key=key)])
+
+    def test_rank_needs_trades_in_every_test_window(self):
+        results = [
+            SweepResult({"profit_ratio": 1.0}, test=[{"closed": 50, "total_r": 1.0}, {"closed": 50, "total_r": 3.0}]),
+            SweepResult({"profit_ratio": 2.0}, test=[{"closed": 50, "total_r": 4.0}, {"closed": 5, "total_r": 9.0}]),
+            SweepResult({"profit_ratio": 3.0}, test=[{"closed": 50, "total_r": 3.0}, {"closed": 50, "total_r": 2.0}]),
+        ]
+
+        ranked = rank(results, ["total_r"], min_trades=30)
+        self.assertEqual([result.parameters["profit_ratio"] for result in ranked], [3.0, 1.0])
+
+    def test_optimize_reports_ranked_combinations_and_walk_forward(self):
+        optimization = Optimization(parameters={"short_window": [3, 5], "profit_ratio": [1.0, 2.0]}, splits=3,
+                                    min_trades=1, processes=1, top=3)
+        report = optimize(self.mt5, "XAUUSD", self.strategy, optimization, rates=self.rates)
+
+        self.assertEqual(report["combinations"], 4)
+        self.assertLessEqual(len(report["ranked"]), 3)
+        scores = [result["score"]["total_r"] for result in report["ranked"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(report["walk_forward"]), 3)
+
+    def test_windows_without_losses_report_a_finite_profit_factor(self):
+        backtest = MagicMock()
+        backtest.between.return_value.summary.return_value = {"closed": 3, "profit_factor": float("inf")}
+        self.assertEqual(window_summary(backtest, 0, 60)["profit_factor"], MAX_PROFIT_FACTOR)
+
+    def test_load_rates_fails_without_bars(self):
+        mt5 = MT5(terminal=self.terminal)
+        mt5.query_historic_data = MagicMock(return_value=None)
+        with self.assertRaises(ValueError):
+            load_rates(mt5, "XAUUSD", "M1", 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import datetime as dt
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.resampler import Resampler, aggregate
+from api.simulated_terminal import SimulatedTerminal
+from bot.candle_manager import CandleManager
+from bot.candle_scheduler import CandleScheduler
+from models.scheduling import Scheduling
+
+
+class CountingTerminal(SimulatedTerminal):
+    """Counts the rate queries per timeframe."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.queries = {}
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        self.queries[timeframe] = self.queries.get(timeframe, 0) + 1
+        return super().copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+
+def manager(granularity):
+    return SimpleNamespace(strategy=SimpleNamespace(granularity=granularity))
+
+
+class TestResampler(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = CountingTerminal(history_days=10)
+        self.mt5 = MT5(terminal=self.terminal)
+        self.mt5.resampler = Resampler()
+
+    def terminal_rates(self, timeframe, count):
+        return SimulatedTerminal.copy_rates_from_pos(self.terminal, "XAUUSD", timeframe, 0, count)
+
+    def test_aggregation_matches_the_broker_bars(self):
+        base = self.terminal_rates(self.terminal.TIMEFRAME_M1, 10000)[:-1]
+        for timeframe, seconds in ((self.terminal.TIMEFRAME_M15, 900), (self.terminal.TIMEFRAME_H4, 14400), (self.terminal.TIMEFRAME_D1, 86400)):
+            expected = self.terminal_rates(timeframe, 5000)
+            bars = aggregate(base, seconds)[1:]  # The first period is cut short by the start of the run
+            np.testing.assert_array_equal(bars[:-1], expected[np.isin(expected["time"], bars["time"])][:len(bars) - 1])
+
+        shifted = aggregate(base, 14400, offset=3600)
+        self.assertTrue(np.all(shifted["time"] % 14400 == 3600))
+
+    def test_higher_granularities_follow_the_base_series(self):
+        self.mt5.resampler.register("XAUUSD", ["H1", "M1", "H4"])
+        self.assertIsNone(self.mt5.resampler.base_of("XAUUSD", "M1"))
+        self.assertEqual(self.mt5.resampler.base_of("XAUUSD", "H4"), "M1")
+
+        for _ in range(40):
+            for granularity, timeframe in (("H1", self.terminal.TIMEFRAME_H1), ("H4", self.terminal.TIMEFRAME_H4)):
+                np.testing.assert_array_equal(self.mt5.fetch_rates("XAUUSD", granularity, 201), self.terminal_rates(timeframe, 201))
+            self.terminal.advance(17 * 60)
+
+        # One query each to seed, every other bar came from the M1 candle cache
+        self.assertEqual(self.terminal.queries[self.terminal.TIMEFRAME_H1], 1)
+        self.assertEqual(self.terminal.queries[self.terminal.TIMEFRAME_H4], 1)
+
+    def test_missing_base_bars_reseed(self):
+        self.mt5.resampler.register("XAUUSD", ["M1", "H1"])
+        self.mt5.fetch_rates("XAUUSD", "H1", 201)
+        self.terminal.advance(3 * 86400)
+
+        np.testing.assert_array_equal(self.mt5.fetch_rates("XAUUSD", "H1", 201), self.terminal_rates(self.terminal.TIMEFRAME_H1, 201))
+        self.assertEqual(self.mt5.metrics.counters["resample_seeds"].value, 2)
+
+    def test_resampled_pairs_close_with_their_base_pair(self):
+        self.mt5.resampler.register("XAUUSD", ["M1", "M5"])
+        scheduler = CandleScheduler("Etc/GMT-2", Scheduling(grace_seconds=0))  # The terminal runs at UTC+2
+        candle_manager = CandleManager(self.mt5, {"XAUUSD": [manager("M1"), manager("M5")]}, lambda *args: None, scheduler)
+        self.assertEqual(scheduler.scheduled, {("XAUUSD", "M1")})
+        opened = candle_manager.timings["XAUUSD_M5"].last_time
+        m5_queries = self.terminal.queries.get(self.terminal.TIMEFRAME_M5, 0)
+
+        for _ in range(5):
+            self.terminal.advance(60)
+            self.assertEqual(candle_manager.update_timings(now=scheduler.broker_to_epoch(self.terminal.time())), ["XAUUSD"])
+
+        self.assertEqual(candle_manager.timings["XAUUSD_M5"].last_time, opened + dt.timedelta(minutes=5))
+        self.assertEqual(self.terminal.queries.get(self.terminal.TIMEFRAME_M5, 0), m5_queries)
+
+
+if __name__ == "__main__":
+    unittest.main()
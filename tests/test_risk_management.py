@@ -0,0 +1,51 @@
+import datetime as dt
+import unittest
+from unittest.mock import MagicMock
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+from bot.risk_management import calculate_lot_size, calculate_lot_sizes
+from models.signal_decision import SignalDecision
+
+
+def signal(symbol, current_price, stop_loss, risk=0.01):
+    return SignalDecision(symbol=symbol, signal=1, order_type="BUY_STOP", current_price=current_price, volume=None,
+                          risk=risk, take_profit=current_price * 1.01, stop_loss=stop_loss,
+                          signal_timestamp=dt.datetime(2024, 1, 2))
+
+
+class TestRiskManagement(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(symbols=[
+            SimulatedSymbol("EURUSD", start_price=1.1, digits=5),
+            SimulatedSymbol("XAUUSD", start_price=2000, digits=2, volume_step=0.1),
+        ])
+        self.mt5 = MT5(terminal=self.terminal)
+        self.terminal.symbol_info = MagicMock(wraps=self.terminal.symbol_info)
+        self.terminal.account_info = MagicMock(wraps=self.terminal.account_info)
+
+    def test_specs_and_balance_are_reused(self):
+        for _ in range(5):
+            volume, tick_size, decimals = calculate_lot_size(self.mt5, signal("EURUSD", 1.1, 1.099), MagicMock(), MagicMock())
+
+        self.assertEqual(self.terminal.symbol_info.call_count, 1)
+        self.assertEqual(self.terminal.account_info.call_count, 1)
+        self.assertEqual(decimals, 5)
+
+        self.mt5.symbol_cache.invalidate_account()
+        calculate_lot_size(self.mt5, signal("EURUSD", 1.1, 1.099), MagicMock(), MagicMock())
+        self.assertEqual(self.terminal.account_info.call_count, 2)
+
+    def test_batch_matches_single(self):
+        signals = [signal("EURUSD", 1.1, 1.099), signal("XAUUSD", 2000, 1990, risk=0.02), signal("EURUSD", 1.1, 1.0975)]
+        volumes, decimals = calculate_lot_sizes(self.mt5, signals)
+
+        for i, signal_decision in enumerate(signals):
+            volume, _, price_decimals = calculate_lot_size(self.mt5, signal_decision, MagicMock(), MagicMock())
+            self.assertEqual(volumes[i], volume)
+            self.assertEqual(decimals[i], price_decimals)
+
+
+if __name__ == '__main__':
+    unittest.main()
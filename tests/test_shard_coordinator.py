@@ -0,0 +1,143 @@
+import os
+import queue
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
+from bot.bot import Bot
+from bot.shard_coordinator import ShardCoordinator, shard_symbols
+from core.log_wrapper import LogWrapper
+from db.db import DataDB
+
+
+class TestShardCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(history_days=2)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        # Keep the stored candles and the logs out of the working tree, the workers are given the same directories
+        for patcher in (patch("bot.bot.DataDB", lambda path: DataDB(os.path.join(self.directory.name, "bars"))),
+                        patch.object(LogWrapper, "PATH", os.path.join(self.directory.name, "logs"))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.bot = Bot(mt5=MT5(terminal=self.terminal))
+        self.bot.mt5.place_order = MagicMock(return_value=(10009,))
+
+    def tearDown(self):
+        self.bot.stop()
+
+    def test_shards_balance_strategies(self):
+        trading_symbols = {"A": [1, 2, 3], "B": [1, 2], "C": [1, 2], "D": [1], "E": [1]}
+
+        shards = shard_symbols(trading_symbols, 2)
+
+        self.assertEqual(sorted(sum(shards, [])), ["A", "B", "C", "D", "E"])
+        self.assertEqual(sorted(sum(len(trading_symbols[symbol]) for symbol in shard) for shard in shards), [4, 5])
+        self.assertEqual(shard_symbols(trading_symbols, 10), [["A"], ["B"], ["C"], ["D"], ["E"]])
+
+    def test_worker_forwards_orders_to_the_coordinator(self):
+        symbol = next(iter(self.bot.trading_symbols))
+        orders = queue.Queue()
+        worker = Bot(mt5=MT5(terminal=self.terminal), symbols=[symbol], shard=0, order_queue=orders)
+        worker.mt5.place_order = MagicMock()
+        try:
+            strategy_manager = worker.trading_symbols[symbol][0]
+            signal_decision = MagicMock(symbol=symbol, enqueued_at=None)
+
+            worker.dispatch_signal(signal_decision, strategy_manager)
+
+            self.assertEqual(list(worker.trading_symbols), [symbol])
+            self.assertFalse(worker.is_coordinator)
+            self.assertIn("main_shard0", worker.logs["main"].logger.name)
+            self.assertNotEqual(worker.logs[symbol].filename, self.bot.logs[symbol].filename)
+            worker.mt5.place_order.assert_not_called()
+            forwarded, granularity, _ = orders.get_nowait()
+            self.assertIs(forwarded, signal_decision)
+            self.assertEqual(granularity, strategy_manager.strategy.granularity)
+        finally:
+            worker.stop()
+
+    def test_coordinator_enforces_account_wide_limits(self):
+        coordinator = ShardCoordinator(self.bot, processes=2)
+        signal_decision = MagicMock(symbol="XAUUSD")
+
+        self.assertTrue(coordinator.handle_order(signal_decision, "M1", time.time()))
+        self.bot.mt5.place_order.assert_called_once()
+        self.assertEqual(self.bot.mt5.place_order.call_args.args[6], "XAUUSD_M1")
+
+        max_trades = self.bot.risk_management.max_concurrent_trades
+        self.terminal.positions_get = MagicMock(return_value=[MagicMock()] * max_trades)
+        self.assertFalse(coordinator.handle_order(signal_decision, "M1"))
+
+        self.terminal.positions_get = MagicMock(return_value=())
+        self.bot.daily_pnl_ledger.within_limit = MagicMock(return_value=False)
+        self.assertFalse(coordinator.handle_order(signal_decision, "M1"))
+        self.assertEqual(self.bot.mt5.place_order.call_count, 1)
+
+    def test_coordinator_publishes_candles_to_the_workers(self):
+        coordinator = ShardCoordinator(self.bot, processes=2)
+        self.addCleanup(coordinator.shared_candles.close)
+        symbol = coordinator.shards[0][0]
+        coordinator.workers[0] = MagicMock()  # Alive
+        # Attaching from the creating process would unregister the segments from its resource tracker, a worker
+        # process opens SharedCandles(prefix) instead
+        worker = Bot(mt5=MT5(terminal=self.terminal), symbols=[symbol], shard=0, order_queue=queue.Queue(),
+                     shared_candles=coordinator.shared_candles, candle_queue=coordinator.candle_queues[0])
+        try:
+            self.assertIsNone(worker.mt5.data_db)  # The coordinator stores the candles it publishes
+            self.assertEqual(worker.candle_manager.symbols_list, [])  # Nor does the worker poll the terminal
+            strategy_manager = worker.trading_symbols[symbol][0]
+            self.assertIs(strategy_manager.shared_candles, worker.shared_candles)
+            granularity = strategy_manager.strategy.granularity
+            worker.mt5.fetch_rates = MagicMock(side_effect=AssertionError("fetched from the terminal"))
+            strategy_manager.generate_signal = MagicMock(wraps=strategy_manager.generate_signal)
+
+            # Nothing is evaluated until the coordinator has published
+            worker.CANDLE_QUEUE_WAIT = 0.01
+            self.terminal.advance(60)
+            self.assertEqual(worker.poll_candles(), 0.0)
+            strategy_manager.generate_signal.assert_not_called()
+
+            coordinator.publish_candles(now=self.bot.candle_scheduler.broker_to_epoch(self.terminal.time()) + 1)
+            self.assertIn(f"{symbol}_{granularity}", self.bot.candle_manager.triggered_pairs)
+            worker.CANDLE_QUEUE_WAIT = 5
+            worker.poll_candles()
+
+            strategy_manager.generate_signal.assert_called_once()
+            self.assertEqual(worker.candle_manager.triggered_pairs, {f"{symbol}_{granularity}"})
+            expected = self.terminal.copy_rates_from_pos(symbol, worker.mt5.set_query_timeframe(granularity), 1, 1)
+            self.assertEqual(strategy_manager.indicator_state.last_time, int(expected["time"][0]))
+        finally:
+            worker.stop()
+
+    def test_restarted_worker_appends_to_its_logs(self):
+        coordinator = ShardCoordinator(self.bot, processes=2)
+        coordinator.context = MagicMock()
+        coordinator.start_worker(0)
+        self.assertEqual(coordinator.context.Process.call_args.kwargs["args"][6], "w")
+
+        coordinator.workers[0].is_alive.return_value = False
+        self.bot.bot_config.sharding.restart_workers = True
+        coordinator.check_workers()
+        self.assertEqual(coordinator.context.Process.call_count, 2)
+        self.assertEqual(coordinator.context.Process.call_args.kwargs["args"][6], "a")
+
+    @patch.dict(os.environ, {"SIMULATED_TERMINAL": "true"})
+    def test_workers_start_and_stop(self):
+        coordinator = ShardCoordinator(self.bot, processes=2)
+        for shard in range(len(coordinator.shards)):
+            coordinator.start_worker(shard)
+        self.assertTrue(all(worker.is_alive() for worker in coordinator.workers))
+
+        coordinator.stop(timeout=15)
+        self.assertTrue(os.path.exists(os.path.join(LogWrapper.PATH, "main_shard0.log")))
+
+        self.assertEqual([worker.exitcode for worker in coordinator.workers], [0] * len(coordinator.workers))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.shared_candles import SharedCandles, TornRead
+from api.simulated_terminal import SimulatedTerminal
+from bot.strategy_manager import StrategyManager
+from db.bar_store import BAR_DTYPE
+from models.indicators import Indicators
+from models.individual_strategy import IndividualStrategy
+
+
+def bars(first, count):
+    rates = np.zeros(count, dtype=BAR_DTYPE)
+    rates["time"] = np.arange(first, first + count) * 60
+    rates["close"] = np.arange(first, first + count, dtype=float)
+    return rates
+
+
+def last_close(prefix, results):
+    reader = SharedCandles(prefix)
+    try:
+        results.put(reader.read("XAUUSD", "M1", lambda rates: float(rates["close"][-1])))
+    finally:
+        reader.close()
+
+
+class TestSharedCandles(unittest.TestCase):
+
+    def setUp(self):
+        self.prefix = f"test{os.getpid()}"
+        self.writer = SharedCandles(self.prefix, create=True, capacity=10)
+
+    def tearDown(self):
+        self.writer.close()
+
+    def test_readers_see_the_latest_window_in_place(self):
+        reader = SharedCandles(self.prefix)
+        self.assertIsNone(reader.read("XAUUSD", "M1", len))
+
+        self.writer.publish("XAUUSD", "M1", bars(0, 4))
+        views = []
+        self.assertEqual(reader.read("XAUUSD", "M1", lambda rates: views.append(rates) or len(rates)), 4)
+        self.assertFalse(views[0].flags.writeable)
+        sequence = reader.sequence("XAUUSD", "M1")
+
+        self.writer.publish("XAUUSD", "M1", bars(0, 25))
+        np.testing.assert_array_equal(reader.read("XAUUSD", "M1", lambda rates: rates["close"].copy()), np.arange(15, 25))
+        self.assertEqual(reader.read("XAUUSD", "M1", len, count=3), 3)
+        self.assertGreater(reader.sequence("XAUUSD", "M1"), sequence)
+        reader.close()
+
+    def test_closed_since_copies_only_the_new_candles(self):
+        self.writer.publish("XAUUSD", "M1", bars(0, 10))
+
+        closed = self.writer.closed_since("XAUUSD", "M1", 7 * 60)
+
+        np.testing.assert_array_equal(closed["time"], [7 * 60, 8 * 60])  # The forming candle is left out
+        self.assertEqual(len(self.writer.closed_since("XAUUSD", "M1", None)), 9)
+
+    def test_overlapping_write_is_retried_and_a_stuck_writer_detected(self):
+        self.writer.publish("XAUUSD", "M1", bars(0, 10))
+        segment = self.writer.segment("XAUUSD", "M1")
+        calls = []
+
+        def read_during_write(rates):
+            calls.append(float(rates["close"][-1]))
+            if len(calls) == 1:
+                segment.write(bars(1, 10))  # The writer lands between the reader's two sequence checks
+            return calls[-1]
+
+        self.assertEqual(segment.read(read_during_write), 10.0)
+        self.assertEqual(calls, [9.0, 10.0])
+
+        segment.header[0] += 1  # A write in progress
+        with self.assertRaises(TornRead):
+            segment.read(len, retries=10)
+        segment.header[0] += 1
+
+    def test_other_processes_read_without_copying_through_a_pipe(self):
+        self.writer.publish("XAUUSD", "M1", bars(0, 10))
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+
+        reader = context.Process(target=last_close, args=(self.prefix, results))
+        reader.start()
+        reader.join(30)
+
+        self.assertEqual(reader.exitcode, 0)
+        self.assertEqual(results.get(timeout=1), 9.0)
+
+    def test_strategy_manager_reads_published_candles(self):
+        terminal = SimulatedTerminal(history_days=2)
+        writer_mt5 = MT5(terminal=terminal)
+        writer_mt5.shared_candles = SharedCandles(f"{self.prefix}s", create=True)
+        reader = SharedCandles(f"{self.prefix}s")
+        reader_mt5 = MT5(terminal=terminal)
+        reader_mt5.fetch_rates = MagicMock(side_effect=reader_mt5.fetch_rates)
+        strategy = IndividualStrategy(granularity="M1", indicators=Indicators(), risk=0.01, profit_ratio=1)
+        strategy_manager = StrategyManager("XAUUSD", strategy, reader_mt5, lambda *args: None, lambda *args: None,
+                                           shared_candles=reader)
+        try:
+            writer_mt5.fetch_rates("XAUUSD", "M1", count=StrategyManager.FETCH_COUNT)
+            strategy_manager.generate_signal()
+            terminal.advance(60)
+            writer_mt5.fetch_rates("XAUUSD", "M1", count=StrategyManager.FETCH_COUNT)
+            strategy_manager.generate_signal()
+
+            reader_mt5.fetch_rates.assert_not_called()
+            closed = terminal.copy_rates_from_pos("XAUUSD", terminal.TIMEFRAME_M1, 0, 2)[0]
+            self.assertEqual(strategy_manager.indicator_state.last_time, closed["time"])
+            self.assertEqual(strategy_manager.indicator_state.count, StrategyManager.FETCH_COUNT)
+
+            strategy_manager.generate_signal()  # Nothing new published, falls back to the terminal
+            reader_mt5.fetch_rates.assert_called_once()
+        finally:
+            reader.close()
+            writer_mt5.shared_candles.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
+from bot.bot import Bot
+from db.db import DataDB
+
+
+class TestSignalExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        with patch("bot.bot.DataDB", lambda path: DataDB(self.directory.name)):  # Keep the stored candles out of ./data
+            self.bot = Bot(mt5=MT5(terminal=SimulatedTerminal()))
+        self.bot.mt5.place_order = MagicMock(return_value=(10009,))
+        self.bot.is_running = True
+
+    def tearDown(self):
+        self.bot.stop()
+
+    def signal(self, symbol):
+        signal_decision = MagicMock(symbol=symbol, enqueued_at=time.time())
+        return (signal_decision, MagicMock())
+
+    def test_burst_is_dispatched_without_waiting_for_sleep_time(self):
+        self.assertGreaterEqual(self.bot.bot_config.sleep_time, 1)
+        executor = threading.Thread(target=self.bot.run_signal_executor)
+        executor.start()
+
+        for symbol in ("EURUSD", "GBPUSD", "XAUUSD"):
+            self.bot.current_signals.put(self.signal(symbol))
+
+        deadline = time.time() + 1
+        while self.bot.mt5.place_order.call_count < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        self.bot.stop()
+        executor.join(timeout=1)
+
+        self.assertEqual(self.bot.mt5.place_order.call_count, 3)
+        self.assertFalse(executor.is_alive())
+        self.assertEqual(self.bot.metrics.histogram("signal_queue_wait_seconds").count, 3)
+
+    def test_batch_is_capped(self):
+        self.bot.bot_config.signal_management.dispatch_batch_size = 2
+        for symbol in ("EURUSD", "GBPUSD", "XAUUSD"):
+            self.bot.current_signals.put(self.signal(symbol))
+
+        self.assertEqual(len(self.bot.next_signal_batch()), 2)
+        self.assertEqual(len(self.bot.next_signal_batch()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+
+import numpy as np
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal
+
+
+class TestSimulatedTerminal(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)])
+        self.mt5 = MT5(terminal=self.terminal)
+
+    def test_login(self):
+        self.assertTrue(self.mt5.attempt_login())
+
+    def test_bars_are_deterministic(self):
+        other = SimulatedTerminal(symbols=[SimulatedSymbol("XAUUSD", start_price=2000, digits=2)])
+        other.advance(3 * 86400)
+        self.terminal.advance(86400)
+        self.terminal.advance(2 * 86400)
+
+        rates = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 0, 5000)
+        other_rates = other.copy_rates_from_pos("XAUUSD", other.TIMEFRAME_M1, 0, 5000)
+        np.testing.assert_array_equal(rates, other_rates)
+
+    def test_higher_timeframes_aggregate_m1(self):
+        m1 = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_M1, 1, 60)
+        h1 = self.terminal.copy_rates_from_pos("XAUUSD", self.terminal.TIMEFRAME_H1, 1, 1)[0]
+
+        self.assertEqual(h1["time"], m1["time"][0])
+        self.assertEqual(h1["open"], m1["open"][0])
+        self.assertEqual(h1["close"], m1["close"][-1])
+        self.assertEqual(h1["high"], m1["high"].max())
+        self.assertEqual(h1["low"], m1["low"].min())
+
+    def test_fetch_candles_sees_new_bar_after_advance(self):
+        before = self.mt5.fetch_candles("XAUUSD", "M1", print, count=2)
+        self.terminal.advance(60)
+        after = self.mt5.fetch_candles("XAUUSD", "M1", print, count=2)
+
+        self.assertEqual(after.Time.iloc[0], before.Time.iloc[-1])
+
+    def test_forming_bar_only_holds_prices_up_to_the_clock(self):
+        terminal = self.terminal
+        forming = terminal.copy_rates_from_pos("XAUUSD", terminal.TIMEFRAME_M1, 0, 1)[0]
+        h1 = terminal.copy_rates_from_pos("XAUUSD", terminal.TIMEFRAME_H1, 0, 1)[0]
+        self.assertEqual(forming["time"], terminal.time())
+        for bar in (forming, h1):
+            self.assertEqual((bar["high"], bar["low"], bar["close"]), (bar["open"],) * 3)
+
+        terminal.advance(30)
+        bid = terminal.symbol_info_tick("XAUUSD").bid
+        forming = terminal.copy_rates_from_pos("XAUUSD", terminal.TIMEFRAME_M1, 0, 1)[0]
+        self.assertEqual(forming["close"], bid)
+        self.assertEqual(forming["high"], max(forming["open"], bid))
+        self.assertEqual(forming["low"], min(forming["open"], bid))
+
+        # Once the minute is over its whole range shows
+        terminal.advance(30)
+        closed = terminal.copy_rates_from_pos("XAUUSD", terminal.TIMEFRAME_M1, 1, 1)[0]
+        stored = terminal._base_rates("XAUUSD")
+        np.testing.assert_array_equal(closed, stored[stored["time"] == closed["time"]][0])
+
+    def test_forming_bar_follows_recorded_ticks(self):
+        terminal = self.terminal
+        now = int(terminal.time())
+        ticks = np.zeros(3, dtype=[("time_msc", "i8"), ("bid", "f8")])
+        ticks["time_msc"] = [now * 1000 + 1000, now * 1000 + 2000, now * 1000 + 40000]
+        ticks["bid"] = [2005.0, 1995.0, 2100.0]
+        terminal.load_ticks("XAUUSD", ticks)
+
+        terminal.advance(10)
+        forming = terminal.copy_rates_from_pos("XAUUSD", terminal.TIMEFRAME_M1, 0, 1)[0]
+        self.assertEqual(forming["close"], 1995.0)
+        self.assertEqual(forming["high"], max(forming["open"], 2005.0))
+        self.assertEqual(forming["low"], min(forming["open"], 1995.0))
+        self.assertEqual(forming["tick_volume"], 2)
+
+    def test_pending_order_fills_and_closes(self):
+        tick = self.terminal.symbol_info_tick("XAUUSD")
+        result = self.mt5.place_order(
+            "BUY_STOP", "XAUUSD", 0.1, tick.ask + 0.5, tick.ask - 3, tick.ask + 3, "test",
+            log_message=lambda *args: None, log_to_error=lambda *args: None,
+        )
+        self.assertEqual(result[0], self.terminal.TRADE_RETCODE_DONE)
+        self.assertEqual(self.mt5.get_open_orders(), [result.order])
+
+        self.terminal.advance(86400)
+        deals = self.terminal.history_deals_get(0, self.terminal.time())
+
+        self.assertEqual(self.terminal.orders_get(), ())
+        self.assertEqual(self.terminal.positions_get(), ())
+        self.assertEqual([deal.entry for deal in deals], [self.terminal.DEAL_ENTRY_IN, self.terminal.DEAL_ENTRY_OUT])
+        self.assertAlmostEqual(self.terminal.account_info().balance, 10000.0 + deals[-1].profit)
+
+    def test_invalid_volume_is_rejected(self):
+        tick = self.terminal.symbol_info_tick("XAUUSD")
+        result = self.terminal.order_send({
+            "action": self.terminal.TRADE_ACTION_PENDING,
+            "symbol": "XAUUSD",
+            "volume": 0.015,
+            "type": self.terminal.ORDER_TYPE_BUY_STOP,
+            "price": tick.ask + 1,
+        })
+        self.assertEqual(result.retcode, self.terminal.TRADE_RETCODE_INVALID_VOLUME)
+
+
+if __name__ == '__main__':
+    unittest.main()
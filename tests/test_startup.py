@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, generous for a slow CI machine, the point is to catch an eager heavy import
+IMPORT_BUDGET_SECONDS = 1.5
+FIRST_POLL_BUDGET_SECONDS = 5.0
+
+# Only loaded when their feature is turned on
+LAZY_MODULES = ("google.cloud.logging", "grpc", "pandas", "MetaTrader5", "pymongo")
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started_at = time.perf_counter()
+import bot.bot
+print(json.dumps({"seconds": time.perf_counter() - started_at, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+FIRST_POLL_SCRIPT = """
+import json, tempfile, time
+from unittest.mock import patch
+started_at = time.perf_counter()
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
+from bot.bot import Bot
+from db.db import DataDB
+with tempfile.TemporaryDirectory() as directory, patch("bot.bot.DataDB", lambda path: DataDB(directory)):
+    bot = Bot(mt5=MT5(terminal=SimulatedTerminal(history_days=2)), started_at=started_at)
+    bot.poll_candles()
+    bot.stop()
+print(json.dumps({"stages": bot.startup_report.stages, "total": bot.startup_report.total_seconds}))
+"""
+
+
+def run(script):
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_import_skips_optional_dependencies_within_budget(self):
+        report = run(IMPORT_SCRIPT)
+
+        self.assertEqual(report["loaded"], [])
+        self.assertLess(report["seconds"], IMPORT_BUDGET_SECONDS)
+
+    def test_first_poll_within_budget(self):
+        report = run(FIRST_POLL_SCRIPT)
+
+        self.assertEqual(list(report["stages"]), ["imports", "login", "settings", "logs", "dedupe", "load", "schedule", "managers", "first_poll"])
+        self.assertLess(report["total"], FIRST_POLL_BUDGET_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
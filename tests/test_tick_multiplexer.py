@@ -0,0 +1,69 @@
+import datetime as dt
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from bot.tick_multiplexer import TickMultiplexer
+from models.candles import Candles
+from models.signal_decision import SignalDecision
+
+
+def signal(symbol, direction):
+    return SignalDecision(symbol=symbol, signal=direction, order_type="BUY_STOP" if direction == 1 else "SELL_STOP",
+                          current_price=1.0, volume=0.1, risk=0.01, take_profit=1.1, stop_loss=0.9,
+                          signal_timestamp=dt.datetime(2024, 1, 2))
+
+
+class TestTickMultiplexer(unittest.TestCase):
+
+    def setUp(self):
+        self.mt5 = MagicMock()
+        self.mt5.mt5.symbol_info_tick.return_value = SimpleNamespace(time=600, ask=1.0)
+        self.mt5.fetch_candle_data.return_value = Candles(np.array([(1.2, 0.8), (1.05, 0.95)], dtype=[("high", "f8"), ("low", "f8")]))
+        self.running = True
+        self.triggered = []
+        self.manager = SimpleNamespace(strategy=SimpleNamespace(granularity="M5"))
+
+    def multiplexer(self, **kwargs):
+        return TickMultiplexer(self.mt5, lambda: self.running, self.triggered.append, MagicMock(), MagicMock(),
+                               tick_interval=0.01, **kwargs)
+
+    def wait_until_idle(self, multiplexer):
+        deadline = time.time() + 5
+        while multiplexer.pollers and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_watchers_on_one_symbol_share_a_poller(self):
+        multiplexer = self.multiplexer()
+        for _ in range(200):
+            multiplexer.watch(signal("EURUSD", 1), self.manager)
+
+        self.assertEqual(len(multiplexer.pollers), 1)
+        self.mt5.mt5.symbol_info_tick.return_value = SimpleNamespace(time=610, ask=1.1)
+        self.wait_until_idle(multiplexer)
+
+        self.assertEqual(len(self.triggered), 200)
+        self.assertEqual(multiplexer.watcher_count(), 0)
+        self.assertLess(self.mt5.mt5.symbol_info_tick.call_count, 50)
+        self.assertEqual(self.mt5.fetch_candle_data.call_count, 1)
+
+    def test_watchers_expire_and_stop_with_the_bot(self):
+        multiplexer = self.multiplexer()
+        expiring = multiplexer.watch(signal("EURUSD", -1), self.manager)
+        expiring.expires_at = time.time()
+        multiplexer.watch(signal("GBPUSD", -1), self.manager)
+        time.sleep(0.05)
+        self.assertEqual(multiplexer.watcher_count(), 1)
+
+        self.running = False
+        self.wait_until_idle(multiplexer)
+
+        self.assertEqual(self.triggered, [])
+        self.assertEqual(multiplexer.watcher_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import datetime as dt
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+import unittest
+
+import numpy as np
+
+from api.simulated_terminal import SimulatedSymbol, SimulatedTerminal, TICKS_DTYPE
+from api.tick_recorder import RecordingTerminal, TickRecorder
+from api.tick_replay import TickReplay
+from db.tick_store import INDEX_EVERY, TICK_DTYPE, TickStore
+
+
+def ticks(times):
+    recorded = np.zeros(len(times), dtype=TICK_DTYPE)
+    recorded["time_msc"] = times
+    recorded["bid"] = np.asarray(times, dtype=float) / 1000
+    recorded["ask"] = recorded["bid"] + 0.5
+    recorded["volume"] = 1
+    return recorded
+
+
+class TestTickStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_query_through_the_sparse_index(self):
+        store = TickStore(self.root)
+        times = np.arange(3 * INDEX_EVERY + 10) * 10
+        store.append("XAUUSD", ticks(times[:INDEX_EVERY + 5]))
+        store.append("XAUUSD", ticks(times[INDEX_EVERY + 5:]))
+        self.assertEqual(store.append("XAUUSD", ticks([0, 10])), 0)  # Older than what is stored
+
+        self.assertEqual(len(store.file("XAUUSD").index), 4)
+        queried = store.query("XAUUSD", 20_000, 30_000)
+        np.testing.assert_array_equal(queried["time_msc"], times[(times >= 20_000) & (times <= 30_000)])
+        self.assertEqual(store.symbols(), ["XAUUSD"])
+
+        # A crash mid-append leaves a partial record and an index out of step, both are repaired on open
+        path = os.path.join(self.root, "XAUUSD.ticks")
+        with open(path, "ab") as f:
+            f.write(b"\0" * 7)
+        os.remove(f"{path}.idx")
+        reopened = TickStore(self.root)
+        self.assertEqual(reopened.file("XAUUSD").count, len(times))
+        np.testing.assert_array_equal(reopened.query("XAUUSD", 20_000, 30_000), queried)
+
+    def test_recorder_skips_repeated_ticks_and_flushes_full_buffers(self):
+        terminal = SimulatedTerminal([SimulatedSymbol("XAUUSD", start_price=2000.0, digits=2)], start_time=dt.datetime(2024, 1, 2, 10))
+        start = int(terminal.clock)
+        minutes = np.arange(start - 3600, start + 3600, 60)
+        recorded = np.zeros(len(minutes) * 4, dtype=TICKS_DTYPE)
+        recorded["time_msc"] = np.repeat(minutes * 1000, 4) + np.tile([0, 15_000, 30_000, 45_000], len(minutes))
+        recorded["bid"] = 2000 + np.arange(len(recorded)) * 0.01
+        terminal.load_ticks("XAUUSD", recorded)
+
+        recorder = TickRecorder(TickStore(self.root), buffer_ticks=8, flush_interval=60)
+        recording = RecordingTerminal(terminal, recorder)
+        for _ in range(20):
+            recording.symbol_info_tick("XAUUSD")
+            recording.symbol_info_tick("XAUUSD")  # Unchanged, not recorded again
+            terminal.advance(15)
+        self.assertEqual(recorder.stats["recorded"], 20)
+        self.assertEqual(recorder.stats["repeated"], 20)
+        self.assertEqual(recorder.store.file("XAUUSD").count, 16)  # Two full buffers written
+
+        recorder.flush()
+        stored = TickStore(self.root).query("XAUUSD")
+        self.assertEqual(len(stored), 20)
+        self.assertEqual(recording.symbol_info("XAUUSD").name, "XAUUSD")  # Passed through
+
+    def test_recording_from_many_threads_loses_no_ticks(self):
+        written = []
+
+        class SlowStore:
+            def append(self, symbol, ticks):
+                time.sleep(0.001)  # Records carry on while a full buffer is written
+                written.extend(ticks["time_msc"].tolist())
+
+        recorder = TickRecorder(SlowStore(), buffer_ticks=2, flush_interval=60)
+        errors = []
+
+        def record(thread):
+            try:
+                for i in range(200):
+                    recorder.record("XAUUSD", SimpleNamespace(time_msc=thread * 1000 + i, bid=1.0, ask=1.5, last=0.0, volume=1))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=record, args=(thread,)) for thread in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        recorder.flush()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(written), [thread * 1000 + i for thread in range(4) for i in range(200)])
+
+    def test_replay_serves_ticks_at_the_replay_clock(self):
+        store = TickStore(self.root)
+        store.append("XAUUSD", ticks(np.arange(1000) * 100 + 1_000_000))
+
+        replay = TickReplay(store, speed=None)
+        self.assertEqual(replay.symbol_info_tick("XAUUSD").time_msc, 1_000_000)
+        replay.advance(0.25)
+        self.assertEqual(replay.symbol_info_tick("XAUUSD").time_msc, 1_000_200)
+        replay.set_time(1_050_050)
+        tick = replay.symbol_info_tick("XAUUSD")
+        self.assertEqual((tick.time_msc, tick.bid, tick.ask), (1_050_000, 1050.0, 1050.5))
+        replay.set_time(999_999)
+        self.assertIsNone(replay.symbol_info_tick("XAUUSD"))
+
+        accelerated = TickReplay(store, speed=1000)
+        time.sleep(0.02)
+        self.assertGreaterEqual(accelerated.symbol_info_tick("XAUUSD").time_msc, 1_020_000)
+        self.assertEqual(len(replay.copy_ticks_range("XAUUSD", 1_000, 1_001)), 11)
+        self.assertEqual(len(replay.copy_ticks_range("XAUUSD", dt.datetime(1970, 1, 1, 0, 16, 40),
+                                                     dt.datetime(1970, 1, 1, 0, 16, 41))), 11)
+
+    def test_batch_replay_reads_millions_of_ticks_per_second(self):
+        store = TickStore(self.root)
+        total = 2_000_000
+        store.append("XAUUSD", ticks(np.arange(total)))
+        replay = TickReplay(TickStore(self.root))
+
+        started = time.perf_counter()
+        seen = 0
+        checksum = 0.0
+        for batch in replay.batches("XAUUSD"):
+            seen += len(batch)
+            checksum += float(batch["bid"].sum())
+        elapsed = time.perf_counter() - started
+        self.assertEqual(seen, total)
+        self.assertAlmostEqual(checksum, float(np.arange(total).sum()) / 1000, places=0)
+        self.assertGreater(total / elapsed, 1_000_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from bot.trade_manager import TradeManager, trailing_stops
+from models.risk_management import RiskManagement
+from models.trade_management import TradeManagement
+
+
+def position(ticket, symbol, buy, price_open, sl):
+    return SimpleNamespace(ticket=ticket, symbol=symbol, type=0 if buy else 1, price_open=price_open, sl=sl, tp=0.0)
+
+
+class TestTradeManager(unittest.TestCase):
+
+    def test_trailing_stops_only_tighten_by_more_than_min_step(self):
+        new_stop_loss = trailing_stops(
+            is_buy=np.array([True, True, True, False, False]),
+            price_open=np.array([100.0, 100.0, 100.0, 100.0, 100.0]),
+            stop_loss=np.array([99.0, 101.95, 0.0, 101.0, 0.0]),
+            current_price=np.array([103.0, 103.0, 100.5, 97.0, 97.0]),
+            trail=0.01,
+            min_step=0.001,
+        )
+
+        np.testing.assert_array_equal(new_stop_loss, [102.0, np.nan, np.nan, 98.0, 98.0])
+
+    def test_monitor_reads_one_tick_per_symbol(self):
+        mt5 = MagicMock()
+        mt5.mt5.POSITION_TYPE_BUY = 0
+        mt5.get_open_positions.return_value = [
+            position(i, "XAUUSD" if i % 2 else "EURUSD", True, 100.0, 99.0) for i in range(100)
+        ]
+        mt5.mt5.symbol_info_tick.side_effect = lambda symbol: SimpleNamespace(bid=103.0 if symbol == "XAUUSD" else 100.2, ask=103.1)
+        mt5.symbol_cache.spec.return_value = SimpleNamespace(digits=2)
+        mt5.modify_position.return_value = True
+
+        risk_management = RiskManagement(0.01, 0.01, 1, 3, 0.03)
+        trade_manager = TradeManager(mt5, risk_management, MagicMock(), MagicMock(), MagicMock(),
+                                     TradeManagement(trailing_stop=True, partial_close=False))
+
+        self.assertEqual(trade_manager.monitor_open_trades(), 50)
+        self.assertEqual(mt5.mt5.symbol_info_tick.call_count, 2)
+        mt5.modify_position.assert_any_call(1, "XAUUSD", 102.0, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from api.metatrader_api import MT5
+from api.simulated_terminal import SimulatedTerminal
+from bot.candle_manager import CandleManager
+from bot.candle_scheduler import CandleScheduler
+from bot.strategy_manager import StrategyManager
+from models.indicators import Indicators
+from models.individual_strategy import IndividualStrategy
+from models.scheduling import Scheduling
+
+
+def strategy(granularity):
+    return SimpleNamespace(strategy=IndividualStrategy(granularity=granularity, indicators=Indicators(), risk=0.01, profit_ratio=1))
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        self.terminal = SimulatedTerminal(history_days=2)
+        self.mt5 = MT5(terminal=self.terminal)
+        self.terminal.copy_rates_from_pos = MagicMock(wraps=self.terminal.copy_rates_from_pos)
+        self.scheduler = CandleScheduler("Etc/GMT-2", Scheduling(warm_start_workers=4))
+
+    def test_loads_each_distinct_pair_once(self):
+        trading_symbols = {
+            f"SYM{i:03d}": [strategy("M1"), strategy("M1"), strategy("M5")] for i in range(20)
+        }
+
+        candle_manager = CandleManager(self.mt5, trading_symbols, lambda *args: None, self.scheduler)
+
+        report = candle_manager.startup_report
+        self.assertEqual(report.pairs, 40)
+        self.assertEqual(report.duplicate_pairs, 20)
+        self.assertEqual(self.terminal.copy_rates_from_pos.call_count, 40)
+        self.assertEqual(list(report.stages), ["dedupe", "load", "schedule"])
+        self.assertIn("40 pairs", str(report))
+        self.assertEqual(len(candle_manager.timings), 40)
+        self.assertEqual(len(self.scheduler.heap), 40)
+
+    def test_warm_start_fills_the_candle_cache(self):
+        candle_manager = CandleManager(self.mt5, {"XAUUSD": [strategy("M1")]}, lambda *args: None, self.scheduler)
+        self.terminal.copy_rates_from_pos.reset_mock()
+        self.terminal.advance(60)
+
+        strategy_manager = StrategyManager("XAUUSD", candle_manager.trading_symbols["XAUUSD"][0].strategy, self.mt5,
+                                           lambda *args: None, lambda *args: None)
+        strategy_manager.generate_signal()
+
+        self.assertEqual(self.mt5.candle_cache.stats["reloads"], 1)
+        self.assertLess(sum(call.args[3] for call in self.terminal.copy_rates_from_pos.call_args_list), 10)
+
+    def test_failed_pairs_are_reported(self):
+        copy_rates_from_pos = self.terminal.copy_rates_from_pos.side_effect
+        self.terminal.copy_rates_from_pos.side_effect = lambda symbol, *args: None if symbol == "MISSING" else copy_rates_from_pos(symbol, *args)
+
+        with self.assertRaises(ValueError) as context:
+            CandleManager(self.mt5, {"XAUUSD": [strategy("M1")], "MISSING": [strategy("M1")]}, lambda *args: None, self.scheduler)
+        self.assertIn("MISSING_M1", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,7 @@ def granularity_to_minutes(granularity: str) -> int:
         'H1': 60,
         'H4': 240,
         'D': 1440,  # 24 hours * 60 minutes
+        'D1': 1440,
         'W': 10080, # 7 days * 24 hours * 60 minutes
         'M': 43200  # 30 days * 24 hours * 60 minutes (approximation)
     }